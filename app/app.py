@@ -1,27 +1,58 @@
 import requests
 from flask_cors import CORS
-from flask import Flask, request, render_template, send_file, jsonify, session
+from flask import Flask, request, render_template, send_file, jsonify, session, Response, stream_with_context
 
 import os
 import json
+import tempfile
+import itertools
+
 import pandas as pd
 
-from utils.profile_report import profile_report
 from utils.categorize_columns import cat_c
-import utils.global_store as global_store
 from utils.secret_key import generate_secret_key
+from utils.storage import convert_upload, export_csv
+from utils.dataset_cache import dataset_cache
+
+from pre_processing.model_registry import model_registry
+from pre_processing.model_store import DEFAULT_PREDICT_CHUNKSIZE, artifact_store, predict_batches
+from pre_processing.modules.instrumentation import metrics_registry
+from pre_processing.modules.rule_based_cleaning import compile_rules
 
-from pre_processing.models import classification_standard, regression_standard, train_predict_regression,visualize_results,train_predict_classification
+from .tasks import run_model_pipeline, compare_models_pipeline, generate_profile
+from .jobs import JobManager, JobQueueFull
+from .workspace import WorkspaceManager, WorkspaceQuotaExceeded
 
 app = Flask(__name__)
 CORS(app)  
 
-UPLOAD_FOLDER = os.path.join(os.getcwd(), "app", "uploads")
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+WORKSPACE_FOLDER = os.environ.get("DATADOME_WORKSPACE_ROOT", os.path.join(os.getcwd(), "app", "workspaces"))
+app.config["WORKSPACE_FOLDER"] = WORKSPACE_FOLDER
 app.config['SESSION_PERMANENT'] = False
 
-app.secret_key = generate_secret_key()
+# A shared key lets several processes behind a load balancer read each other's sessions
+app.secret_key = os.environ.get("DATADOME_SECRET_KEY") or generate_secret_key()
+
+job_manager = JobManager(max_workers=int(os.environ.get("DATADOME_JOB_WORKERS", 2)))
+workspace_manager = WorkspaceManager(
+    WORKSPACE_FOLDER,
+    ttl_seconds=int(os.environ.get("DATADOME_WORKSPACE_TTL", 24 * 60 * 60)),
+    quota_bytes=int(os.environ.get("DATADOME_WORKSPACE_QUOTA_MB", 1024)) * 1024 ** 2,
+    in_use=job_manager.active_owners,
+)
+
+VALID_MODELS = model_registry.names()
+
+def current_workspace():
+    """
+    Workspace of the current request: the X-Workspace-ID header for API
+    clients, otherwise the session's, created on first use.
+    """
+    workspace = workspace_manager.get(request.headers.get("X-Workspace-ID") or session.get("workspace_id"))
+    if workspace is None:
+        workspace = workspace_manager.create()
+    session["workspace_id"] = workspace.id
+    return workspace
 
 @app.route("/")
 def index():
@@ -36,24 +67,47 @@ def upload_file():
     if file.filename == "":
         return "No selected file", 400
 
-    file_path = os.path.join(app.config["UPLOAD_FOLDER"], "user_data.csv")
-    file.save(file_path)
+    workspace = current_workspace()
+    try:
+        workspace.check_quota(request.content_length or 0, replacing=workspace.dataset_file)
+    except WorkspaceQuotaExceeded as e:
+        return str(e), 413
+    file.save(workspace.upload_path)
+    convert_upload(workspace.upload_path, workspace.dataset_path)
 
     return render_template("profile.html")
 
 @app.route("/generate", methods=["POST"])
 def generateFile():
-    profile_report("app/uploads/user_data.csv")
-    return send_file(r"..\output\profile_report.html", as_attachment=False)
+    workspace = current_workspace()
+    try:
+        generate_profile(workspace.dataset_file, workspace.profile_path, **profile_options())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return send_file(workspace.profile_path, as_attachment=False)
+
+def profile_options():
+    """
+    Profiling options from the query string, form or JSON body: mode
+    ('full' or 'summary'), sample_size (rows, 0 for all) and stratify (a column).
+    """
+    fields = {**request.args, **request.form, **(request.get_json(silent=True) or {})}
+    options = {}
+    if fields.get("mode"):
+        options["mode"] = fields["mode"]
+    if fields.get("sample_size") not in (None, ""):
+        try:
+            options["sample_size"] = int(fields["sample_size"])
+        except (TypeError, ValueError):
+            raise ValueError("sample_size must be an integer.")
+    if fields.get("stratify"):
+        options["stratify"] = fields["stratify"]
+    return options
 
 @app.route("/attribute_cleaning")
 def attribute_cleaning():
-    df = pd.read_csv("app/uploads/user_data.csv")
-
-    categorized = cat_c(df)
-    categorical_data = {}
-    for col in categorized["categorical"]:
-        categorical_data[col] = df[col].dropna().unique().tolist()
+    categorized, categorical_data = dataset_cache.derive(current_workspace().dataset_file, "attribute_columns",
+                                                         categorize_attributes)
     return render_template("attribute_cleaning.html", 
                            columns = categorical_data,
                            numeric=categorized["numeric"], 
@@ -61,6 +115,13 @@ def attribute_cleaning():
                            datetime=categorized["datetime"], 
                            categorical_data=categorical_data)
 
+def categorize_attributes(df):
+    categorized = cat_c(df)
+    categorical_data = {}
+    for col in categorized["categorical"]:
+        categorical_data[col] = df[col].dropna().unique().tolist()
+    return categorized, categorical_data
+
 @app.route("/models")
 def models():
     return render_template("models.html")
@@ -71,41 +132,297 @@ def run_model():
     data = request.get_json()
     model_name = data.get("model_name")
 
-    valid_models = ["linear_regression", "decision_tree", "random_forest", "svm", "knn", "logistic_regression", "gradient_boosting", "xgboost"]
-    if model_name not in valid_models:
+    if model_name not in VALID_MODELS:
         return jsonify({"error": "Invalid model selection."}), 400
     
     # Retrieve result_array from session
     result_array = session.get("result_array")
     print(result_array[2])
 
-    data_csv = r"app\uploads\user_data.csv"
+    workspace = current_workspace()
 
-    results = {}
-
-    if(result_array[1] == "prediction"):
-        results, y_test, y_test_pred = train_predict_regression(data_csv, model_name,target = result_array[2])
-        un_results, un_y_test, un_y_test_pred = regression_standard(data_csv, model_name,target = result_array[2])
-    elif(result_array[1] == "classification"):
-        results, y_test, y_test_pred = train_predict_classification(data_csv, model_name,target = result_array[2])
-        un_results, un_y_test, un_y_test_pred = classification_standard(data_csv, model_name,target = result_array[2])
-    else:
-        pass
-    
+    try:
+        results = run_model_pipeline(workspace.dataset_file, model_name, task=result_array[1], target=result_array[2],
+                                     **workspace_pipeline_options(workspace), **evaluation_options(data))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     print(results)
-    
-    visualize_results(
-        un_results=un_results,
-        un_y_test=un_y_test,    
-        un_y_pred=un_y_test_pred,
-        pros_results= results,
-        pros_test=y_test,
-        pros_pred=y_test_pred,
-        save_path= r"app\static\metrics.jpeg"
-    )
 
     return jsonify(results)
 
+# Cross-validation settings accepted by /run_model, with their types
+EVALUATION_FIELDS = {"cv": int, "search": str, "n_iter": int, "time_budget": float}
+
+def evaluation_options(data):
+    """
+    Cross-validation options from a /run_model body: cv (folds, at least 2),
+    search ('none', 'grid', 'random' or 'halving'), n_iter (random search
+    candidates) and time_budget (seconds).
+    """
+    options = {}
+    for name, kind in EVALUATION_FIELDS.items():
+        if data.get(name) in (None, ""):
+            continue
+        try:
+            options[name] = kind(data[name])
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be of type {kind.__name__}.")
+    if "cv" in options and options["cv"] < 2:
+        raise ValueError("cv must be at least 2.")
+    if "cv" not in options and options.get("search", "none") != "none":
+        raise ValueError("search requires cv.")
+    return options
+
+def selected_models(data):
+    """
+    Model names requested for a comparison; all models when none are given.
+    Returns None if any name is invalid.
+    """
+    model_names = data.get("model_names") or VALID_MODELS
+    if any(name not in VALID_MODELS for name in model_names):
+        return None
+    return list(dict.fromkeys(model_names))
+
+@app.route("/compare_models", methods=["POST"])
+def compare_models():
+    model_names = selected_models(request.get_json(silent=True) or {})
+    if model_names is None:
+        return jsonify({"error": "Invalid model selection."}), 400
+
+    result_array = session.get("result_array")
+    if not result_array:
+        return jsonify({"error": "No task selected."}), 400
+
+    workspace = current_workspace()
+    leaderboard = compare_models_pipeline(workspace.dataset_file, model_names, task=result_array[1],
+                                          target=result_array[2], gen_syn_data=workspace.get_state("checkbox", 0),
+                                          output_dir=workspace.output_dir, rules_path=workspace.rules_path)
+    return jsonify(leaderboard)
+
+def workspace_pipeline_options(workspace):
+    return {
+        "save_path": workspace.metrics_path,
+        "gen_syn_data": workspace.get_state("checkbox", 0),
+        "output_dir": workspace.output_dir,
+        "rules_path": workspace.rules_path,
+    }
+
+# Datasets are stored columnar; CSV is only produced when one is downloaded
+DOWNLOADS = {
+    "dataset": lambda workspace: workspace.dataset_file,
+    "cleaned": lambda workspace: os.path.join(workspace.output_dir, "clean_user_data"),
+    "synthetic": lambda workspace: os.path.join(workspace.output_dir, "synthetic"),
+}
+
+@app.route("/workspace/download/<name>.csv")
+def download_csv(name):
+    if name not in DOWNLOADS:
+        return "Unknown dataset", 404
+    workspace = current_workspace()
+    path = DOWNLOADS[name](workspace)
+    candidates = [path] if os.path.splitext(path)[1] else [path + ".parquet", path + ".csv"]
+    path = next((candidate for candidate in candidates if os.path.exists(candidate)), None)
+    if path is None:
+        return "Dataset not available yet", 404
+    csv_path = export_csv(path, os.path.join(workspace.output_dir, f"{name}_export.csv"))
+    return send_file(csv_path, as_attachment=True, download_name=f"{name}.csv")
+
+@app.route("/workspace/metrics.jpeg")
+def workspace_metrics():
+    workspace = current_workspace()
+    if not os.path.exists(workspace.metrics_path):
+        return "No metrics rendered yet", 404
+    return send_file(workspace.metrics_path, mimetype="image/jpeg")
+
+@app.route("/metrics")
+def metrics():
+    # Prometheus scrape endpoint: per-stage timings and row counts of all pipeline runs
+    return metrics_registry.render(), 200, {"Content-Type": "text/plain; version=0.0.4"}
+
+#___________________________________________________________________________________________________________________________________
+# Prediction: score new rows with a model trained in this workspace (see the "Artifact ID" of a run)
+
+@app.route("/predict/models", methods=["GET"])
+def list_model_artifacts():
+    return jsonify(artifact_store(current_workspace().output_dir).list())
+
+def prediction_input(chunksize):
+    """
+    Batches of rows from the request and the input format. CSV and NDJSON
+    bodies (or uploaded files) are parsed chunk by chunk; a JSON array, or
+    an object with a "rows" array, is parsed whole and then chunked.
+    """
+    if "file" in request.files:
+        # Form files are closed when the view returns, before the response
+        # is streamed, so the upload is parsed from a temporary copy
+        upload = request.files["file"]
+        kind = "ndjson" if upload.filename.endswith((".ndjson", ".jsonl")) else "csv"
+        fd, stream = tempfile.mkstemp(dir=current_workspace().uploads_dir, suffix=".predict")
+        os.close(fd)
+        upload.save(stream)
+    else:
+        mimetype = request.mimetype
+        stream = request.stream
+        kind = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson",
+                "application/json": "json"}.get(mimetype)
+
+    if kind in ("csv", "ndjson"):
+        return read_chunks(stream, kind, chunksize), kind
+    if kind == "json":
+        data = request.get_json()
+        rows = pd.DataFrame(data["rows"] if isinstance(data, dict) else data)
+        return (rows.iloc[start:start + chunksize] for start in range(0, len(rows), chunksize)), kind
+    raise ValueError("Send CSV (text/csv), NDJSON (application/x-ndjson) or JSON (application/json) rows.")
+
+def read_chunks(source, kind, chunksize):
+    try:
+        if kind == "csv":
+            reader = pd.read_csv(source, chunksize=chunksize)
+        else:
+            reader = pd.read_json(source, lines=True, chunksize=chunksize)
+        with reader:
+            yield from reader
+    finally:
+        if isinstance(source, str):
+            os.remove(source)
+
+def serialize_predictions(scored_batches, output_format):
+    for number, scored in enumerate(scored_batches):
+        if output_format == "csv":
+            yield scored.to_csv(index=False, header=number == 0)
+        else:
+            yield scored.to_json(orient="records", lines=True, date_format="iso")
+
+@app.route("/predict/<artifact_id>", methods=["POST"])
+def predict(artifact_id):
+    """
+    Stream predictions for the posted rows, one chunk of ?chunksize rows at a
+    time. The response is CSV or NDJSON (?format=, default: the input format)
+    with the input columns and a "prediction" column (?include_input=0 for
+    predictions only).
+    """
+    try:
+        artifact = artifact_store(current_workspace().output_dir).load(artifact_id)
+    except KeyError:
+        return jsonify({"error": "Unknown model artifact."}), 404
+
+    try:
+        chunksize = int(request.args.get("chunksize", DEFAULT_PREDICT_CHUNKSIZE))
+        if chunksize < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "chunksize must be a positive integer."}), 400
+    include_input = request.args.get("include_input", "1") != "0"
+
+    try:
+        batches, input_format = prediction_input(chunksize)
+        scored = predict_batches(artifact, batches, include_input=include_input)
+        # Score the first chunk before streaming, so bad input still gets a 400
+        first = list(itertools.islice(scored, 1))
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify({"error": f"Could not score the input: {e}"}), 400
+
+    output_format = request.args.get("format", "csv" if input_format == "csv" else "ndjson")
+    if output_format not in ("csv", "ndjson"):
+        return jsonify({"error": "format must be 'csv' or 'ndjson'."}), 400
+    body = serialize_predictions(itertools.chain(first, scored), output_format)
+    mimetype = "text/csv" if output_format == "csv" else "application/x-ndjson"
+    return Response(stream_with_context(body), mimetype=mimetype)
+
+#___________________________________________________________________________________________________________________________________
+# Background jobs: submit returns a job ID at once, clients poll /jobs/<id> and fetch /jobs/<id>/result
+
+@app.route("/jobs/run_model", methods=["POST"])
+def submit_run_model():
+    data = request.get_json()
+    model_name = data.get("model_name")
+
+    if model_name not in VALID_MODELS:
+        return jsonify({"error": "Invalid model selection."}), 400
+
+    result_array = session.get("result_array")
+    if not result_array:
+        return jsonify({"error": "No task selected."}), 400
+
+    try:
+        evaluation = evaluation_options(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    workspace = current_workspace()
+    try:
+        job_id = job_manager.submit(
+            "run_model", run_model_pipeline, workspace.dataset_file, model_name, owner=workspace.id,
+            task=result_array[1], target=result_array[2], **workspace_pipeline_options(workspace), **evaluation
+        )
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 429
+    return jsonify({"job_id": job_id}), 202
+
+@app.route("/jobs/compare_models", methods=["POST"])
+def submit_compare_models():
+    model_names = selected_models(request.get_json(silent=True) or {})
+    if model_names is None:
+        return jsonify({"error": "Invalid model selection."}), 400
+
+    result_array = session.get("result_array")
+    if not result_array:
+        return jsonify({"error": "No task selected."}), 400
+
+    workspace = current_workspace()
+    try:
+        job_id = job_manager.submit(
+            "compare_models", compare_models_pipeline, workspace.dataset_file, model_names, owner=workspace.id,
+            task=result_array[1], target=result_array[2], gen_syn_data=workspace.get_state("checkbox", 0),
+            output_dir=workspace.output_dir, rules_path=workspace.rules_path
+        )
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 429
+    return jsonify({"job_id": job_id}), 202
+
+@app.route("/jobs/generate", methods=["POST"])
+def submit_generate():
+    workspace = current_workspace()
+    try:
+        job_id = job_manager.submit("generate", generate_profile, workspace.dataset_file, workspace.profile_path,
+                                    owner=workspace.id, **profile_options())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 429
+    return jsonify({"job_id": job_id}), 202
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    if job_manager.get(job_id, owner=current_workspace().id) is None:
+        return jsonify({"error": "Unknown job."}), 404
+    status = job_manager.status(job_id)
+    if status is None:
+        return jsonify({"error": "Unknown job."}), 404
+    return jsonify(status)
+
+@app.route("/jobs/<job_id>/result", methods=["GET"])
+def job_result(job_id):
+    job = job_manager.get(job_id, owner=current_workspace().id)
+    if job is None:
+        return jsonify({"error": "Unknown job."}), 404
+    status = job_manager.status(job_id)
+    if status["state"] in ("queued", "running"):
+        return jsonify(status), 202
+    if status["state"] != "done":
+        return jsonify(status), 409 if status["state"] == "cancelled" else 500
+
+    result = job_manager.result(job_id)
+    if job["kind"] == "generate":
+        return send_file(os.path.abspath(result), as_attachment=False)
+    return jsonify(result)
+
+@app.route("/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    if job_manager.get(job_id, owner=current_workspace().id) is None or not job_manager.cancel(job_id):
+        return jsonify({"error": "Job is unknown or already finished."}), 404
+    return jsonify(job_manager.status(job_id))
+
 #_______________________________________________________________________________________________________________________________________--
  
 @app.route("/fetch-dataset", methods=["POST"])
@@ -117,28 +434,51 @@ def fetch_dataset():
     if not dataset_url:
         return jsonify({"success": False, "error": "No URL provided"}), 400
 
+    workspace = current_workspace()
+    filename = os.path.basename(workspace.upload_path)
+    partial_path = workspace.upload_path + ".part"
+
     try:
         response = requests.get(dataset_url, stream=True)
         response.raise_for_status()  # Raises error for HTTP failures
 
-        filename = "user_data.csv"
-        filepath = os.path.join(os.getcwd(),"app","uploads", filename)
-
-        with open(filepath, "wb") as file:
+        with open(partial_path, "wb") as file:
+            written = 0
             for chunk in response.iter_content(chunk_size=8192):
+                written += len(chunk)
+                if written % (1 << 20) < len(chunk):
+                    workspace.check_quota(replacing=workspace.dataset_file)
                 file.write(chunk)
+        # The loop checks once per MB, so the tail of the download is checked here
+        workspace.check_quota(replacing=workspace.dataset_file)
+        os.replace(partial_path, workspace.upload_path)
+        convert_upload(workspace.upload_path, workspace.dataset_path)
 
         return jsonify({"success": True, "filename": filename})
 
+    except WorkspaceQuotaExceeded as e:
+        return jsonify({"success": False, "error": str(e)}), 413
+
     except requests.exceptions.RequestException as e:
         print("Request failed:", str(e))  # Debugging: Print error
         return jsonify({"success": False, "error": str(e)}), 500
+
+    finally:
+        # Only a failed download leaves the partial file behind
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
     
 @app.route('/save-file', methods=['POST'])
 def save_file():
     try:
         json_data = request.get_json()
-        file_path = r"output/submitted_data.json"
+        file_path = current_workspace().rules_path
+
+        # Reject rules the pipeline could not compile before they are stored
+        try:
+            compile_rules(json_data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Write the JSON data to a file
         with open(file_path, 'w') as f:
@@ -175,7 +515,7 @@ def checkbox_data():
     data = request.get_json()
     generate_value = data.get("generate", 0) 
 
-    global_store.global_data["checkbox"] = generate_value  
+    current_workspace().set_state("checkbox", generate_value)
     print(f"Checkbox Value Received: {generate_value}")
     
     return jsonify({"message": "Checkbox value received", "value": generate_value})
@@ -0,0 +1,155 @@
+import time
+import uuid
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class ProgressReporter:
+    """
+    Picklable progress callback handed to job functions. Each call records a
+    (stage, fraction) event in a manager dict shared with the Flask process,
+    and raises JobCancelled once the job has been cancelled, so cancellation
+    takes effect at the next stage boundary.
+    """
+
+    def __init__(self, job_id, events, cancelled):
+        self.job_id = job_id
+        self.events = events
+        self.cancelled = cancelled
+
+    def __call__(self, stage, fraction=None):
+        if self.cancelled.get(self.job_id):
+            raise JobCancelled(f"Job {self.job_id} was cancelled.")
+        event = {'stage': stage, 'fraction': fraction, 'time': time.time()}
+        # Manager proxies only see reassignment, not in-place appends
+        self.events[self.job_id] = self.events.get(self.job_id, []) + [event]
+
+
+class JobManager:
+    """
+    Runs long requests (model runs, profiling, synthesis) on a process pool
+    and tracks them by job ID.
+
+    At most max_workers jobs run at once and at most max_queued wait behind
+    them; submit raises JobQueueFull beyond that. The pool and its manager
+    process are only started on the first submit.
+    """
+
+    def __init__(self, max_workers=2, max_queued=8, max_finished=100):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _start(self):
+        if self._executor is None:
+            # spawn: torch/matplotlib state in the Flask process is not fork-safe
+            context = multiprocessing.get_context('spawn')
+            self._manager = context.Manager()
+            self._events = self._manager.dict()
+            self._cancelled = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+    def submit(self, kind, func, *args, owner=None, **kwargs):
+        """
+        Queue func(*args, progress=..., **kwargs) and return its job ID.
+        owner identifies who may query the job (e.g. a workspace ID).
+        """
+        with self._lock:
+            self._start()
+            active = sum(not job['future'].done() for job in self._jobs.values())
+            if active >= self.max_workers + self.max_queued:
+                raise JobQueueFull("Too many jobs are queued, try again later.")
+
+            job_id = uuid.uuid4().hex
+            self._events[job_id] = []
+            reporter = ProgressReporter(job_id, self._events, self._cancelled)
+            future = self._executor.submit(func, *args, progress=reporter, **kwargs)
+            self._jobs[job_id] = {'kind': kind, 'owner': owner, 'future': future, 'submitted': time.time()}
+            self._prune()
+        return job_id
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job['future'].done()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+            self._events.pop(job_id, None)
+            self._cancelled.pop(job_id, None)
+
+    def get(self, job_id, owner=None):
+        """
+        Return the job record, or None if it is unknown or owned by someone else.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job['owner'] != owner:
+            return None
+        return job
+
+    def active_owners(self):
+        """
+        Return the owners of jobs that are queued or running.
+        """
+        with self._lock:
+            return {job['owner'] for job in self._jobs.values() if not job['future'].done()}
+
+    def status(self, job_id):
+        """
+        Return the job's state ('queued', 'running', 'done', 'failed',
+        'cancelled') with its progress events, or None for an unknown ID.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        future = job['future']
+        events = self._events.get(job_id, [])
+        error = None
+
+        if future.cancelled() or future.done() and isinstance(future.exception(), JobCancelled):
+            state = 'cancelled'
+        elif future.done():
+            error = future.exception()
+            state = 'failed' if error else 'done'
+        else:
+            state = 'running' if events or future.running() else 'queued'
+
+        return {
+            'job_id': job_id,
+            'kind': job['kind'],
+            'state': state,
+            'submitted': job['submitted'],
+            'progress': events[-1] if events else None,
+            'events': events,
+            'error': str(error) if error else None,
+        }
+
+    def result(self, job_id):
+        return self._jobs[job_id]['future'].result()
+
+    def cancel(self, job_id):
+        """
+        Cancel a job: queued jobs never start, running jobs stop at their
+        next progress call. Returns False for unknown or finished jobs.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job['future'].done():
+            return False
+        self._cancelled[job_id] = True
+        job['future'].cancel()
+        return True
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._manager.shutdown()
+            self._executor = None
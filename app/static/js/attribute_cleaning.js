@@ -9,19 +9,20 @@ document.addEventListener("DOMContentLoaded", function () {
         let jsonData = {};
 
         formData.forEach((value, key) => {
-            let colName = key.replace(/([^]*)$/, '');
+            let colName = key.replace(/_(floor|ceil|category|start|end)$/, '');
+            if (value === "") return;
 
-            if (key.endsWith("_floor") || key.endsWith("_ceil")) {
-                if (!jsonData[colName]) jsonData[colName] = [];
-                jsonData[colName].push(value);
+            // Rules use the explicit forms of compile_rules: {min, max} and {forbidden: [...]}
+            if (key.endsWith("_floor") || key.endsWith("_start")) {
+                jsonData[colName] = Object.assign(jsonData[colName] || {}, { min: value });
             }
-            else if (key.endsWith("_category")) {
-                if (!jsonData[colName]) jsonData[colName] = [];
-                jsonData[colName].push(value);
+            else if (key.endsWith("_ceil") || key.endsWith("_end")) {
+                jsonData[colName] = Object.assign(jsonData[colName] || {}, { max: value });
             }
-            else if (key.endsWith("_start") || key.endsWith("_end")) {
-                if (!jsonData[colName]) jsonData[colName] = [];
-                jsonData[colName].push(value);
+            else if (key.endsWith("_category")) {
+                if (!jsonData[colName]) jsonData[colName] = {};
+                if (!jsonData[colName].forbidden) jsonData[colName].forbidden = [];
+                jsonData[colName].forbidden.push(value);
             }
         });
 
@@ -0,0 +1,66 @@
+from utils.lazy_import import LazyModule
+from pre_processing.modules.pre_processing_utils import no_progress
+from pre_processing.modules.rule_based_cleaning import RULES_PATH
+
+# Work behind /run_model and /generate, kept free of Flask request state so it
+# can run either inline or in a JobManager worker process. The pipeline and
+# profiling modules are imported on the first task, not with the app.
+models = LazyModule('pre_processing.models')
+profiling = LazyModule('utils.profile_report')
+
+def run_model_pipeline(data_csv, model_name, task, target, save_path, gen_syn_data=None, output_dir="output",
+                       rules_path=RULES_PATH, progress=no_progress, **evaluation):
+    """
+    Train the selected model on the cleaned data and on the conventional
+    baseline, render the comparison chart and return the results dict.
+    Intermediate files go to output_dir. evaluation (cv, search, n_iter,
+    time_budget) enables cross-validation and hyperparameter search.
+    """
+    options = {"gen_syn_data": gen_syn_data, "progress": progress, "output_dir": output_dir, "rules_path": rules_path,
+               **evaluation}
+    if task == "prediction":
+        results, y_test, y_test_pred = models.train_predict_regression(data_csv, model_name, target=target, **options)
+        progress("baseline", 0.8)
+        un_results, un_y_test, un_y_test_pred = models.regression_standard(data_csv, model_name, target=target)
+    elif task == "classification":
+        results, y_test, y_test_pred = models.train_predict_classification(data_csv, model_name, target=target, **options)
+        progress("baseline", 0.8)
+        un_results, un_y_test, un_y_test_pred = models.classification_standard(data_csv, model_name, target=target)
+    else:
+        raise ValueError(f"Unknown task '{task}'.")
+
+    progress("visualize", 0.9)
+    models.visualize_results(
+        un_results=un_results,
+        un_y_test=un_y_test,    
+        un_y_pred=un_y_test_pred,
+        pros_results= results,
+        pros_test=y_test,
+        pros_pred=y_test_pred,
+        save_path= save_path
+    )
+    progress("done", 1.0)
+
+    return results
+
+
+def compare_models_pipeline(data_csv, model_names, task, target, gen_syn_data=None, output_dir="output",
+                            rules_path=RULES_PATH, progress=no_progress):
+    """
+    Train every selected model on one cleaned split and return the leaderboard.
+    """
+    if task not in ("prediction", "classification"):
+        raise ValueError(f"Unknown task '{task}'.")
+    return models.train_all_models(data_csv, model_names, task, target, gen_syn_data=gen_syn_data, progress=progress,
+                            output_dir=output_dir, rules_path=rules_path)
+
+
+def generate_profile(input_file_path, output_path, progress=no_progress, **options):
+    """
+    Build the profiling report and return the path of the rendered HTML.
+    options (mode, sample_size, stratify) go to utils.profile_report.
+    """
+    progress("profile", 0.0)
+    profiling.profile_report(input_file_path, output_path, **options)
+    progress("done", 1.0)
+    return output_path
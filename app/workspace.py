@@ -0,0 +1,166 @@
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import threading
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_QUOTA_BYTES = 1024 ** 3
+CLEANUP_INTERVAL_SECONDS = 10 * 60
+
+_WORKSPACE_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class WorkspaceQuotaExceeded(Exception):
+    pass
+
+
+class Workspace:
+    """
+    Isolated storage for one session or dataset: its upload, rule file,
+    pipeline outputs and small state such as the synthetic-data checkbox.
+    """
+
+    def __init__(self, workspace_id, root, quota_bytes):
+        self.id = workspace_id
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.uploads_dir = os.path.join(root, 'uploads')
+        self.output_dir = os.path.join(root, 'output')
+        os.makedirs(self.uploads_dir, exist_ok=True)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    @property
+    def upload_path(self):
+        return os.path.join(self.uploads_dir, 'user_data.csv')
+
+    @property
+    def dataset_path(self):
+        """
+        Columnar working copy of the upload (see utils.storage.convert_upload).
+        """
+        return os.path.join(self.uploads_dir, 'user_data.feather')
+
+    @property
+    def dataset_file(self):
+        """
+        The file pipeline stages should read: the columnar working copy, or
+        the raw upload if it could not be converted.
+        """
+        return self.dataset_path if os.path.exists(self.dataset_path) else self.upload_path
+
+    @property
+    def rules_path(self):
+        return os.path.join(self.output_dir, 'submitted_data.json')
+
+    @property
+    def metrics_path(self):
+        return os.path.join(self.output_dir, 'metrics.jpeg')
+
+    @property
+    def profile_path(self):
+        return os.path.join(self.output_dir, 'profile_report.html')
+
+    @property
+    def _state_path(self):
+        return os.path.join(self.root, 'state.json')
+
+    def get_state(self, key, default=None):
+        try:
+            with open(self._state_path) as f:
+                return json.load(f).get(key, default)
+        except (OSError, ValueError):
+            return default
+
+    def set_state(self, key, value):
+        try:
+            with open(self._state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state[key] = value
+        with open(self._state_path, 'w') as f:
+            json.dump(state, f)
+
+    def touch(self):
+        os.utime(self.root)
+
+    def size(self):
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, filename))
+                except OSError:
+                    pass
+        return total
+
+    def check_quota(self, incoming_bytes=0, replacing=None):
+        """
+        Raise WorkspaceQuotaExceeded if adding incoming_bytes (replacing the
+        file at `replacing`, if any) would exceed the workspace quota.
+        """
+        current = self.size()
+        if replacing and os.path.exists(replacing):
+            current -= os.path.getsize(replacing)
+        if current + incoming_bytes > self.quota_bytes:
+            raise WorkspaceQuotaExceeded(
+                f"Workspace quota of {self.quota_bytes // (1024 ** 2)} MB exceeded."
+            )
+
+
+class WorkspaceManager:
+    """
+    Creates and looks up workspaces under base_dir and removes those unused
+    for longer than ttl_seconds. Cleanup runs at most once per
+    CLEANUP_INTERVAL_SECONDS, piggybacking on workspace lookups. in_use, if
+    given, returns the IDs of workspaces that jobs are still writing to;
+    cleanup skips them however old they are.
+    """
+
+    def __init__(self, base_dir, ttl_seconds=DEFAULT_TTL_SECONDS, quota_bytes=DEFAULT_QUOTA_BYTES, in_use=None):
+        self.base_dir = base_dir
+        self.ttl_seconds = ttl_seconds
+        self.quota_bytes = quota_bytes
+        self.in_use = in_use or set
+        self._last_cleanup = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(base_dir, exist_ok=True)
+
+    def create(self):
+        return self.get(uuid.uuid4().hex)
+
+    def get(self, workspace_id):
+        """
+        Return the workspace for an ID, creating its directories if needed.
+        Returns None for IDs that are not valid workspace IDs.
+        """
+        if not workspace_id or not _WORKSPACE_ID.match(workspace_id):
+            return None
+        self._maybe_cleanup()
+        workspace = Workspace(workspace_id, os.path.join(self.base_dir, workspace_id), self.quota_bytes)
+        workspace.touch()
+        return workspace
+
+    def _maybe_cleanup(self):
+        with self._lock:
+            if time.time() - self._last_cleanup < CLEANUP_INTERVAL_SECONDS:
+                return
+            self._last_cleanup = time.time()
+        self.cleanup()
+
+    def cleanup(self):
+        """
+        Remove workspaces whose last use is older than the TTL, except those
+        in use by a job.
+        """
+        cutoff = time.time() - self.ttl_seconds
+        in_use = self.in_use()
+        for name in os.listdir(self.base_dir):
+            root = os.path.join(self.base_dir, name)
+            if name in in_use:
+                continue
+            if _WORKSPACE_ID.match(name) and os.path.isdir(root) and os.stat(root).st_mtime < cutoff:
+                shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,70 @@
+"""
+Compare row throughput of the legacy per-row MD5 deduplication against the
+columnar hashing engine.
+
+Usage: python -m benchmarks.bench_duplicates --rows 100000 1000000
+"""
+import argparse
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from pre_processing.modules.duplicate_detection import detect_duplicates
+
+
+def make_frame(n_rows, duplicate_fraction=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'id': rng.integers(0, n_rows, n_rows),
+        'value': rng.normal(size=n_rows).round(3),
+        'category': rng.choice(['a', 'b', 'c', 'd'], n_rows),
+        'text': rng.choice(['ab', 'c', 'a', 'bc', None], n_rows),
+    })
+    n_duplicates = int(n_rows * duplicate_fraction)
+    if n_duplicates:
+        df.iloc[-n_duplicates:] = df.iloc[:n_duplicates].to_numpy()
+    return df
+
+
+def legacy_duplicates(df):
+    def hash_row(row):
+        row_str = ''.join(str(x) for x in row)
+        return hashlib.md5(row_str.encode()).hexdigest()
+
+    row_hash = df.apply(hash_row, axis=1)
+    return row_hash.duplicated(keep=False).to_numpy()
+
+
+def columnar_duplicates(df):
+    duplicate_mask, _ = detect_duplicates(df)
+    return duplicate_mask
+
+
+def time_rows_per_sec(func, df):
+    start = time.perf_counter()
+    func(df)
+    elapsed = time.perf_counter() - start
+    return len(df) / elapsed, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--skip-legacy-above', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'engine':>10} {'seconds':>10} {'rows/sec':>14}")
+    for n_rows in args.rows:
+        df = make_frame(n_rows)
+        engines = [('columnar', columnar_duplicates)]
+        if n_rows <= args.skip_legacy_above:
+            engines.insert(0, ('md5', legacy_duplicates))
+        for name, func in engines:
+            rate, elapsed = time_rows_per_sec(func, df)
+            print(f"{n_rows:>10} {name:>10} {elapsed:>10.3f} {rate:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Compare imputation error and runtime of the numeric imputation strategies.
+
+Values are removed completely at random from correlated columns, imputed, and
+scored by RMSE against the removed values (in standard-deviation units).
+
+Usage: python -m benchmarks.bench_imputation --rows 10000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from pre_processing.modules.imputation import IMPUTATION_STRATEGIES, create_imputer
+
+# Exact strategies are skipped above these sizes; they would run for hours
+MAX_ROWS = {'knn': 100_000, 'iterative': 1_000_000}
+
+
+def make_matrix(n_rows, n_cols=6, missing_rate=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(n_rows, 2))
+    weights = rng.normal(size=(2, n_cols))
+    complete = latent @ weights + 0.3 * rng.normal(size=(n_rows, n_cols))
+    complete = (complete - complete.mean(axis=0)) / complete.std(axis=0)
+    mask = rng.random((n_rows, n_cols)) < missing_rate
+    observed = complete.copy()
+    observed[mask] = np.nan
+    return complete, observed, mask
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--strategies', nargs='+', default=list(IMPUTATION_STRATEGIES))
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'strategy':>12} {'seconds':>10} {'rmse':>8}")
+    for n_rows in args.rows:
+        complete, observed, mask = make_matrix(n_rows)
+        for name in args.strategies:
+            if n_rows > MAX_ROWS.get(name, float('inf')):
+                print(f"{n_rows:>10} {name:>12} {'skipped':>10}")
+                continue
+            start = time.perf_counter()
+            imputed = create_imputer(observed, name).fit_transform(observed)
+            elapsed = time.perf_counter() - start
+            rmse = np.sqrt(np.mean((imputed[mask] - complete[mask]) ** 2))
+            print(f"{n_rows:>10} {name:>12} {elapsed:>10.2f} {rmse:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Time each stage of the cleaning pipeline and the full main() at several
+scales, on tables from benchmarks.datagen. With --chunksize,
+main_streaming() is run instead.
+
+Per-stage figures come from the 'performance' section the pipeline writes to
+profiling_report.json; the total is timed around the pipeline call. Results
+are saved as JSON. With --compare, a previous results file is used as the
+baseline: stages that slowed down by more than --threshold are listed and
+the exit status is 1, so the benchmark can gate a CI job.
+
+Usage:
+    python -m benchmarks.bench_pipeline --rows 10000 100000 1000000 --save results.json
+    python -m benchmarks.bench_pipeline --rows 10000 100000 --compare results.json
+    python -m benchmarks.bench_pipeline --rows 10000000 --chunksize 500000
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datagen import add_spec_arguments, spec_from_args, write_table
+from pre_processing.main import main as run_pipeline
+from pre_processing.streaming import main_streaming
+
+# Stages faster than this are too noisy to flag as regressions
+MIN_SECONDS = 0.05
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_scale(spec, file_format, chunksize, repeat, **pipeline_options):
+    """
+    Generate one table (written chunk by chunk, see datagen.write_table) and
+    run the pipeline on it repeat times, keeping the fastest run of each
+    stage.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_path = os.path.join(work_dir, f'bench{file_format}')
+        write_table(spec, data_path)
+        output_dir = os.path.join(work_dir, 'output')
+        os.makedirs(output_dir)
+
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            if chunksize:
+                _, report, _ = main_streaming(data_path, output_dir, chunksize=chunksize, **pipeline_options)
+            else:
+                _, report, _ = run_pipeline(data_path, output_dir, **pipeline_options)
+            total = time.perf_counter() - start
+            stages = {record['stage']: record for record in report['performance']['stages']}
+            if best is None:
+                best = {'total_seconds': total, 'stages': stages}
+                continue
+            best['total_seconds'] = min(best['total_seconds'], total)
+            for name, record in stages.items():
+                if record['wall_seconds'] < best['stages'][name]['wall_seconds']:
+                    best['stages'][name] = record
+
+    best['rows'] = spec.rows
+    best['peak_rss_bytes'] = max((record['stage_peak_rss_bytes'] or 0) for record in best['stages'].values()) or None
+    return best
+
+
+def print_results(results):
+    print(f"{'rows':>10} {'stage':>16} {'seconds':>10} {'rows/sec':>14}")
+    for result in results:
+        for name, record in result['stages'].items():
+            rate = (record['rows_in'] or result['rows']) / record['wall_seconds'] if record['wall_seconds'] else 0
+            print(f"{result['rows']:>10} {name:>16} {record['wall_seconds']:>10.3f} {rate:>14,.0f}")
+        print(f"{result['rows']:>10} {'main()':>16} {result['total_seconds']:>10.3f} "
+              f"{result['rows'] / result['total_seconds']:>14,.0f}")
+
+
+def compare(baseline, results, threshold):
+    """
+    Print the time ratio of every stage against the baseline run at the same
+    size and return the regressions beyond threshold.
+    """
+    baseline_by_rows = {result['rows']: result for result in baseline['results']}
+    regressions = []
+    print(f"\n{'rows':>10} {'stage':>16} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for result in results:
+        old = baseline_by_rows.get(result['rows'])
+        if old is None:
+            continue
+        pairs = [(name, old['stages'][name]['wall_seconds'], record['wall_seconds'])
+                 for name, record in result['stages'].items() if name in old['stages']]
+        pairs.append(('main()', old['total_seconds'], result['total_seconds']))
+        for name, before, after in pairs:
+            ratio = after / before if before else float('inf')
+            flag = ''
+            if ratio > 1 + threshold and max(before, after) >= MIN_SECONDS:
+                flag = '  REGRESSION'
+                regressions.append({'rows': result['rows'], 'stage': name, 'baseline': before,
+                                    'current': after, 'ratio': ratio})
+            print(f"{result['rows']:>10} {name:>16} {before:>10.3f} {after:>10.3f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=['.csv', '.feather'], default='.csv',
+                        help="File format handed to the pipeline")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Run the streaming pipeline with this chunk size (needed for 10M rows)")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per scale; the fastest is kept")
+    parser.add_argument('--synthesis', action='store_true', help="Include the synthetic data stage")
+    parser.add_argument('--save', help="Write results to this JSON file")
+    parser.add_argument('--compare', help="Baseline results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="Relative slowdown reported as a regression (0.1 = 10%%)")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    results = []
+    for n_rows in args.rows:
+        spec = spec_from_args(args, n_rows, args.seed)
+        print(f"Running {n_rows} rows...", flush=True)
+        results.append(run_scale(spec, args.format, args.chunksize, args.repeat,
+                                 gen_syn_data=args.synthesis))
+    print_results(results)
+
+    run = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': environment(),
+        'spec': {name: value for name, value in spec.to_dict().items() if name != 'rows'},
+        'format': args.format,
+        'chunksize': args.chunksize,
+        'results': results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('spec') != run['spec']:
+            print("Warning: baseline was generated with a different table spec")
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
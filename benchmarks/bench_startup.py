@@ -0,0 +1,77 @@
+"""
+Measure cold import time and memory of the app and pipeline entry points.
+
+Each target is imported in a fresh interpreter, as when the server starts or
+a job worker is spawned. The benchmark reports the median wall time, the
+peak RSS, which heavy libraries got loaded (they should load on first use,
+not on import), and with --top the slowest imports from -X importtime.
+
+Usage: python -m benchmarks.bench_startup --repeat 5 --top 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+TARGETS = ['app.app', 'app.tasks', 'pre_processing.main', 'pre_processing.models']
+HEAVY_MODULES = ['torch', 'sdv', 'ydata_profiling', 'matplotlib', 'seaborn', 'sklearn', 'xgboost']
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {target}
+seconds = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    'seconds': seconds,
+    'peak_rss_bytes': peak if sys.platform == 'darwin' else peak * 1024,
+    'loaded': [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def probe(target, importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', PROBE.format(target=target, heavy=HEAVY_MODULES)]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def slowest_imports(importtime_log, top):
+    """
+    Parse -X importtime output into (cumulative microseconds, module), slowest first.
+    """
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--targets', nargs='+', default=TARGETS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=0, help="Show the N slowest imports of each target")
+    args = parser.parse_args()
+
+    print(f"{'target':>24} {'seconds':>9} {'peak_mb':>9}  heavy modules loaded")
+    for target in args.targets:
+        runs = [probe(target)[0] for _ in range(args.repeat)]
+        seconds = statistics.median(run['seconds'] for run in runs)
+        peak_mb = max(run['peak_rss_bytes'] for run in runs) / 1024 ** 2
+        loaded = ', '.join(runs[0]['loaded']) or '-'
+        print(f"{target:>24} {seconds:>9.3f} {peak_mb:>9.1f}  {loaded}")
+        if args.top:
+            _, log = probe(target, importtime=True)
+            for cumulative, name in slowest_imports(log, args.top):
+                print(f"{'':>24} {cumulative / 1e6:>9.3f}  {name}")
+
+
+if __name__ == '__main__':
+    main()
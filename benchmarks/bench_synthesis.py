@@ -0,0 +1,84 @@
+"""
+Compare fit time, sample time and fidelity of the synthesizer backends.
+
+Data is a mix of correlated numeric columns and a categorical column that
+depends on them, plus an imbalanced binary label. Fidelity is measured by
+the mean Kolmogorov-Smirnov statistic over numeric columns, the mean total
+variation distance over categorical columns and the mean absolute difference
+between the real and synthetic correlation matrices (lower is better for all).
+SMOTE deliberately shifts samples towards the minority label (see yes%), so
+its fidelity figures measure that shift rather than a modelling error.
+
+Usage: python -m benchmarks.bench_synthesis --rows 1000 10000 100000
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import ks_2samp
+
+from pre_processing.modules.synthesizer_store import SynthesizerStore
+from pre_processing.modules.synthesizers import SYNTHESIZER_BACKENDS, create_synthesizer
+
+# CTGAN is skipped above this size; it would run for many minutes on CPU
+MAX_ROWS = {'ctgan': 10_000}
+
+
+def make_frame(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(n_rows, 2))
+    frame = pd.DataFrame({
+        'x1': latent[:, 0] * 10 + 50,
+        'x2': np.exp(latent[:, 0] * 0.5 + latent[:, 1] * 0.3),
+        'x3': rng.integers(0, 100, n_rows) + latent[:, 1] * 5,
+    })
+    frame['segment'] = np.where(latent[:, 1] > 0.5, 'high', np.where(latent[:, 1] < -0.5, 'low', 'mid'))
+    frame['label'] = np.where(latent[:, 0] > 1.2, 'yes', 'no')
+    return frame
+
+
+def fidelity(real, synthetic, numeric, categorical):
+    ks = np.mean([ks_2samp(real[column], synthetic[column]).statistic for column in numeric])
+    tvd = np.mean([
+        0.5 * real[column].value_counts(normalize=True).subtract(
+            synthetic[column].value_counts(normalize=True), fill_value=0).abs().sum()
+        for column in categorical
+    ])
+    correlation_gap = np.abs(real[numeric].corr().to_numpy() - synthetic[numeric].corr().to_numpy()).mean()
+    return ks, tvd, correlation_gap
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--backends', nargs='+', default=list(SYNTHESIZER_BACKENDS))
+    parser.add_argument('--fraction', type=float, default=0.2)
+    args = parser.parse_args()
+
+    numeric, categorical = ['x1', 'x2', 'x3'], ['segment', 'label']
+    print(f"{'rows':>8} {'backend':>16} {'fit_s':>8} {'sample_s':>9} {'ks':>6} {'tvd':>6} {'corr':>6} {'yes%':>6}")
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = SynthesizerStore(store_dir)
+        for n_rows in args.rows:
+            real = make_frame(n_rows)
+            num_rows = int(n_rows * args.fraction)
+            for backend in args.backends:
+                if n_rows > MAX_ROWS.get(backend, float('inf')):
+                    continue
+                synthesizer = create_synthesizer(backend, df=real, target='label', store=store)
+                start = time.perf_counter()
+                synthesizer.fit(real, categorical, target='label')
+                fit_seconds = time.perf_counter() - start
+                start = time.perf_counter()
+                synthetic = synthesizer.sample(num_rows)
+                sample_seconds = time.perf_counter() - start
+                ks, tvd, correlation_gap = fidelity(real, synthetic, numeric, categorical)
+                positive_share = 100 * (synthetic['label'] == 'yes').mean()
+                print(f"{n_rows:>8} {backend:>16} {fit_seconds:>8.2f} {sample_seconds:>9.3f} "
+                      f"{ks:>6.3f} {tvd:>6.3f} {correlation_gap:>6.3f} {positive_share:>6.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""
+Generate synthetic tables that look like the uploads the pipeline cleans.
+
+Columns are a mix of numeric, categorical and datetime columns. Numeric
+columns share a latent factor so imputation and outlier detection have
+structure to find. On top of the clean table, the generator injects
+missing values, exact duplicate rows, outliers and "dirty" numeric strings
+(thousands separators, currency signs, padding and placeholders such as
+'n/a'), each at a configurable rate.
+
+Tables larger than --chunk-rows are generated and written chunk by chunk,
+so generating 10M rows does not need the whole table in memory.
+
+Usage: python -m benchmarks.datagen --rows 100000 --out data.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.storage import PARQUET_COMPRESSION
+
+DIRTY_PLACEHOLDERS = np.array(['n/a', '-', '?', 'unknown'], dtype=object)
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+class TableSpec:
+    """
+    Shape and defect rates of a generated table. Rates are fractions of
+    rows (duplicates) or of cells (everything else).
+    """
+
+    def __init__(self, rows=10_000, numeric=6, categorical=3, datetime=1,
+                 missing_rate=0.05, duplicate_rate=0.02, dirty_rate=0.01,
+                 dirty_columns=1, outlier_rate=0.01, cardinality=12, seed=0):
+        self.rows = rows
+        self.numeric = numeric
+        self.categorical = categorical
+        self.datetime = datetime
+        self.missing_rate = missing_rate
+        self.duplicate_rate = duplicate_rate
+        self.dirty_rate = dirty_rate
+        self.dirty_columns = min(dirty_columns, numeric)
+        self.outlier_rate = outlier_rate
+        self.cardinality = cardinality
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def _dirty_strings(values, rng):
+    """
+    Render numbers the way spreadsheets export them: with separators,
+    currency signs or padding, or as a placeholder instead of a number.
+    """
+    styles = rng.integers(0, 4, len(values))
+    rendered = np.empty(len(values), dtype=object)
+    for style, template in enumerate(('{:,.2f}', '${:.2f}', ' {:.3f} ')):
+        mask = styles == style
+        rendered[mask] = [template.format(value) for value in values[mask]]
+    placeholders = styles == 3
+    rendered[placeholders] = rng.choice(DIRTY_PLACEHOLDERS, placeholders.sum())
+    return rendered
+
+
+def _make_chunk(spec, n_rows, rng):
+    latent = rng.normal(size=n_rows)
+    columns = {}
+
+    for i in range(spec.numeric):
+        values = 50 + 10 * (0.7 * latent + 0.3 * rng.normal(size=n_rows)) * (i + 1)
+        n_outliers = int(n_rows * spec.outlier_rate)
+        if n_outliers:
+            idx = rng.choice(n_rows, n_outliers, replace=False)
+            values[idx] += rng.choice([-1, 1], n_outliers) * 15 * values.std()
+        columns[f'num_{i}'] = values.round(3)
+
+    # Zipf-like category frequencies, the usual shape of real categoricals
+    weights = 1 / np.arange(1, spec.cardinality + 1)
+    weights /= weights.sum()
+    for i in range(spec.categorical):
+        vocabulary = np.array([f'cat{i}_{k}' for k in range(spec.cardinality)], dtype=object)
+        columns[f'cat_{i}'] = vocabulary[rng.choice(spec.cardinality, n_rows, p=weights)]
+
+    start = np.datetime64('2015-01-01')
+    for i in range(spec.datetime):
+        offsets = rng.integers(0, 10 * 365 * 24 * 3600, n_rows).astype('timedelta64[s]')
+        columns[f'date_{i}'] = start + offsets
+
+    df = pd.DataFrame(columns)
+
+    for i in range(spec.dirty_columns):
+        column = f'num_{i}'
+        n_dirty = int(n_rows * spec.dirty_rate)
+        if n_dirty:
+            idx = rng.choice(n_rows, n_dirty, replace=False)
+            values = df[column].to_numpy(dtype=object)
+            values[idx] = _dirty_strings(df[column].to_numpy()[idx], rng)
+            df[column] = values
+
+    if spec.missing_rate:
+        for column in df.columns:
+            mask = rng.random(n_rows) < spec.missing_rate
+            if mask.any():
+                if df[column].dtype.kind in 'iuf':
+                    df[column] = df[column].mask(mask)
+                else:
+                    df.loc[mask, column] = None
+
+    n_duplicates = int(n_rows * spec.duplicate_rate)
+    if n_duplicates:
+        # Replace the tail with copies of earlier rows, then shuffle them in
+        rows = np.concatenate([np.arange(n_rows - n_duplicates), rng.choice(n_rows - n_duplicates, n_duplicates)])
+        df = df.iloc[rng.permutation(rows)].reset_index(drop=True)
+
+    return df
+
+
+def make_table(spec):
+    """
+    Build a DataFrame following spec.
+    """
+    return _make_chunk(spec, spec.rows, np.random.default_rng(spec.seed))
+
+
+def iter_table(spec, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Yield the table as DataFrames of at most chunk_rows rows. A table that
+    fits in one chunk is make_table(spec); larger ones are generated per
+    chunk with their own seed, so duplicates are copies of rows within the
+    same chunk.
+    """
+    if spec.rows <= chunk_rows:
+        yield make_table(spec)
+        return
+    offset = 0
+    for number, start in enumerate(range(0, spec.rows, chunk_rows)):
+        n_rows = min(chunk_rows, spec.rows - start)
+        chunk = _make_chunk(spec, n_rows, np.random.default_rng([spec.seed, number]))
+        chunk.index = pd.RangeIndex(offset, offset + n_rows)
+        offset += n_rows
+        yield chunk
+
+
+def _as_text(chunk, columns):
+    """
+    Store the dirty numeric columns as strings, as a CSV round trip would:
+    Arrow columns cannot mix numbers and strings.
+    """
+    chunk = chunk.copy()
+    for column in columns:
+        values = chunk[column]
+        chunk[column] = values.where(values.isna(), values.astype(str))
+    return chunk
+
+
+def write_table(spec, path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Generate the table and write it to path (.csv, .parquet or .feather)
+    one chunk at a time; returns the number of rows written.
+    """
+    rows, writer, schema = 0, None, None
+    dirty = [f'num_{i}' for i in range(spec.dirty_columns)] if spec.dirty_rate else []
+    try:
+        for chunk in iter_table(spec, chunk_rows):
+            if path.endswith('.csv'):
+                chunk.to_csv(path, mode='w' if rows == 0 else 'a', header=rows == 0, index=False)
+            else:
+                table = pa.Table.from_pandas(_as_text(chunk, dirty), schema=schema, preserve_index=False)
+                if writer is None:
+                    schema = table.schema
+                    if path.endswith('.parquet'):
+                        writer = pq.ParquetWriter(path, table.schema, compression=PARQUET_COMPRESSION)
+                    elif path.endswith(('.feather', '.arrow')):
+                        writer = pa.ipc.new_file(path, table.schema)
+                    else:
+                        raise ValueError(f"Unsupported file format: {os.path.basename(path)}")
+                writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def add_spec_arguments(parser):
+    """
+    Add one command-line option per TableSpec field (except rows and seed).
+    """
+    defaults = TableSpec()
+    for name, value in defaults.to_dict().items():
+        if name in ('rows', 'seed'):
+            continue
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+
+
+def spec_from_args(args, rows, seed=0):
+    fields = {name: getattr(args, name) for name in TableSpec().to_dict() if hasattr(args, name)}
+    fields.update(rows=rows, seed=seed)
+    return TableSpec(**fields)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True, help="Output file (.csv, .parquet or .feather)")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="Rows generated and written at a time")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    rows = write_table(spec_from_args(args, args.rows, args.seed), args.out, args.chunk_rows)
+    print(f"Wrote {rows} rows to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
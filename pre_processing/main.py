@@ -1,54 +1,109 @@
 import os
 import json
 
-from .modules.data_loader import load_and_preprocess_dataset
+from .modules.data_loader import load_and_preprocess_dataset, infer_dataset_types
 from .modules.data_cleaner import DataCleaner
 from .modules.data_imputer import DataImputer
 from .modules.report_generator import ReportGenerator
-from .modules.pre_processing_utils import convert_to_serializable
+from .modules.column_stats import ColumnStats
+from .modules.pre_processing_utils import convert_to_serializable, no_progress
 from .modules.synthetic import generate_synthetic_data
-from .modules.rule_based_cleaning import rule_based_cleaning
+from .modules.instrumentation import StageProfiler, add_performance_section
+from .modules.rule_based_cleaning import RuleEngine, load_rules
+from utils.storage import write_output
 
 import warnings 
 warnings.filterwarnings('ignore') 
 
-def main(file_path, output_dir = 'output', gen_syn_data=False, target=None, task=None):
+def main(file_path, output_dir = 'output', gen_syn_data=False, target=None, task=None, sample_size=100_000, outlier_backend='auto', imputation_strategy='auto', synthesis_backend='auto', rules_path=None, progress=None):
+    """
+    Run the cleaning pipeline in memory and return (processed_df, profiling_report, schema).
 
-    data_cleaner = DataCleaner()
+    Files larger than RAM go through streaming.main_streaming instead, which
+    returns the path of the cleaned CSV in place of the DataFrame.
+    sample_size bounds the rows type inference looks at. outlier_backend
+    names the outlier detection backend ('auto' picks one by row count, see
+    outlier_detection.select_outlier_backend)
+    and imputation_strategy the numeric imputation strategy ('auto' picks the
+    most accurate one within budget, see imputation.select_imputation_strategy).
+    synthesis_backend picks the synthetic data backend ('auto' chooses by size
+    and, for classification, class balance; see synthesizers.create_synthesizer).
+    rules_path names a JSON rules file (see rule_based_cleaning.compile_rules);
+    rows violating a rule are dropped after type inference and the per-rule
+    violation counts go to the 'rules' section of the report.
+    progress(stage, fraction) is called as each stage starts. Per-stage
+    timings and memory go to the 'performance' section of profiling_report.json.
+    """
+    progress = progress or no_progress
+    data_cleaner = DataCleaner(imputation_strategy=imputation_strategy)
     data_imputer = DataImputer()
     report_generator = ReportGenerator()
+    profiler = StageProfiler(progress)
 
-    original_df, initial_report = load_and_preprocess_dataset(file_path)
+    with profiler.stage('load', 0.0) as stage:
+        original_df, initial_report = load_and_preprocess_dataset(file_path)
+        stage['rows_out'] = len(original_df)
 
-    # original_df = rule_based_cleaning(original_df,r"app\uploads\submitted_data.json")
-    
-    processed_df,column_dtype = data_cleaner.infer_and_validate_column_types(original_df)
-    processed_df = data_cleaner.identify_duplicate_rows(processed_df)
-    data_cleaner.detect_missing_values(processed_df)
+    with profiler.stage('type_inference', 0.1, rows_in=len(original_df)) as stage:
+        processed_df,column_dtype = infer_dataset_types(file_path, original_df, data_cleaner, sample_size=sample_size)
+        stage['rows_out'] = len(processed_df)
+
+    # Rules see typed values, as in the streaming pipeline
+    rule_engine = RuleEngine(load_rules(rules_path)) if rules_path and os.path.exists(rules_path) else None
+    if rule_engine is not None:
+        with profiler.stage('rules', 0.12, rows_in=len(processed_df)) as stage:
+            processed_df = rule_engine.apply(processed_df)
+            stage['rows_out'] = len(processed_df)
+
+    with profiler.stage('imputation', 0.15, rows_in=len(processed_df)) as stage:
+        processed_df = data_cleaner.fill_missing(processed_df, column_dtype)
+        stage['rows_out'] = len(processed_df)
+    with profiler.stage('deduplication', 0.3, rows_in=len(processed_df)) as stage:
+        processed_df = data_cleaner.identify_duplicate_rows(processed_df)
+        stage['rows_out'] = len(processed_df)
+    with profiler.stage('missing_values', 0.45, rows_in=len(processed_df)) as stage:
+        data_cleaner.detect_missing_values(processed_df)
+        stage['rows_out'] = len(processed_df)
         
-    # Impute missing values
-    processed_df = data_imputer.impute_missing_values(processed_df,column_dtype)
+    # Remove outliers
+    with profiler.stage('outliers', 0.5, rows_in=len(processed_df)) as stage:
+        processed_df = data_imputer.impute_missing_values(processed_df,column_dtype, backend=outlier_backend)
+        stage['rows_out'] = len(processed_df)
 
     # Generate report
-    profiling_report = report_generator.generate_profiling_report(
-        original_df, processed_df, data_cleaner, data_imputer
-    )
     profiling_report_path = os.path.join(output_dir, 'profiling_report.json')
-    with open(profiling_report_path, 'w') as f:
-        json.dump({
-            'initial_report': initial_report,
-            'profiling_report': profiling_report
-        }, f, indent=4, default=convert_to_serializable)
+    with profiler.stage('report', 0.7):
+        # Shared with synthesis, which starts from the same frame
+        column_stats = ColumnStats(processed_df)
+        profiling_report = report_generator.generate_profiling_report(
+            original_df, processed_df, data_cleaner, data_imputer, column_stats=column_stats
+        )
+        if rule_engine is not None:
+            profiling_report['rules'] = rule_engine.report
+        with open(profiling_report_path, 'w') as f:
+            json.dump({
+                'initial_report': initial_report,
+                'profiling_report': profiling_report
+            }, f, indent=4, default=convert_to_serializable)
 
     # Generate synthetic data
-    if gen_syn_data: processed_df = generate_synthetic_data(processed_df, output_dir)
+    if gen_syn_data:
+        with profiler.stage('synthesis', 0.75, rows_in=len(processed_df)) as stage:
+            processed_df = generate_synthetic_data(processed_df, output_dir, schema=column_dtype,
+                                                   backend=synthesis_backend, column_stats=column_stats,
+                                                   target=target if task == 'classification' else None)
+            stage['rows_out'] = len(processed_df)
         
-    processed_dataset_path = os.path.join(output_dir, f'clean_{os.path.basename(file_path)}')
-    processed_df.to_csv(processed_dataset_path, index=False)
+    with profiler.stage('write', 0.95, rows_in=len(processed_df)):
+        dataset_name = os.path.splitext(os.path.basename(file_path))[0]
+        write_output(processed_df, os.path.join(output_dir, f'clean_{dataset_name}'))
+
+    profiling_report['performance'] = profiler.report()
+    add_performance_section(profiling_report_path, profiling_report['performance'])
     
-    return processed_df, profiling_report
+    return processed_df, profiling_report, column_dtype
 
 
 if __name__ == "__main__":
     file_path = r"app\uploads\user_data.csv"
-    processed_data, report = main(file_path)
\ No newline at end of file
+    processed_data, report, schema = main(file_path)
\ No newline at end of file
@@ -0,0 +1,88 @@
+import inspect
+import threading
+from collections import OrderedDict
+
+from utils.lazy_import import import_object, module_available
+
+DEFAULT_FITTED_MODELS = 16
+
+
+class ModelRegistry:
+    """
+    Builds a fresh estimator per call from registered factories, so concurrent
+    requests never fit the same object. Each entry holds a factory (usually
+    the estimator class) and its default hyperparameters. A factory given as
+    a dotted path ('sklearn.svm.SVR') is imported on first use, so listing
+    the models does not import every estimator library.
+    """
+
+    def __init__(self):
+        self._factories = {}
+
+    def register(self, name, factory, **default_params):
+        self._factories[name] = (factory, default_params)
+
+    def names(self):
+        return list(self._factories)
+
+    def __contains__(self, name):
+        return name in self._factories
+
+    def create(self, name, n_jobs=None, **params):
+        """
+        Return a new, unfitted estimator. params override the registered
+        defaults; n_jobs is passed only to estimators that accept it.
+        """
+        if name not in self._factories:
+            raise ValueError(f"Unknown model '{name}'. Choose from: {', '.join(self._factories)}")
+        factory, default_params = self._factories[name]
+        if isinstance(factory, str):
+            factory = import_object(factory)
+            self._factories[name] = (factory, default_params)
+        params = {**default_params, **params}
+        if n_jobs is not None and 'n_jobs' in inspect.signature(factory).parameters:
+            params['n_jobs'] = n_jobs
+        return factory(**params)
+
+
+class FittedModelCache:
+    """
+    Thread-safe LRU of fitted estimators, keyed by whatever identifies the fit
+    (dataset key, model name, hyperparameters). Cached models are only used
+    for prediction and must not be refitted.
+    """
+
+    def __init__(self, max_entries=DEFAULT_FITTED_MODELS):
+        self.max_entries = max_entries
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+            return model
+
+    def put(self, key, model):
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_entries:
+                self._models.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+model_registry = ModelRegistry()
+model_registry.register("linear_regression", "sklearn.linear_model.LinearRegression")
+model_registry.register("decision_tree", "sklearn.tree.DecisionTreeRegressor", random_state=42)
+model_registry.register("random_forest", "sklearn.ensemble.RandomForestRegressor", random_state=42)
+model_registry.register("svm", "sklearn.svm.SVR")
+model_registry.register("knn", "sklearn.neighbors.KNeighborsRegressor")
+model_registry.register("logistic_regression", "sklearn.linear_model.LogisticRegression")
+model_registry.register("gradient_boosting", "sklearn.ensemble.GradientBoostingRegressor", random_state=42)
+if module_available("xgboost"):
+    model_registry.register("xgboost", "xgboost.XGBRegressor")
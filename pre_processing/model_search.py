@@ -0,0 +1,263 @@
+import math
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.model_selection import KFold, StratifiedKFold, ParameterGrid, ParameterSampler
+
+from pre_processing.model_registry import model_registry
+
+SEARCH_STRATEGIES = ('none', 'grid', 'random', 'halving')
+DEFAULT_FOLDS = 5
+DEFAULT_N_ITER = 10
+DEFAULT_TIME_BUDGET = 120    # seconds
+HALVING_FACTOR = 3
+MIN_HALVING_ROWS = 20
+DEFAULT_CACHED_FOLDS = 8
+
+# Hyperparameters searched per registered model; registry defaults apply to the rest
+SEARCH_SPACES = {
+    "linear_regression": {"fit_intercept": [True, False]},
+    "decision_tree": {"max_depth": [None, 3, 5, 10, 20], "min_samples_leaf": [1, 2, 5, 10]},
+    "random_forest": {"n_estimators": [50, 100, 200], "max_depth": [None, 5, 10, 20],
+                      "min_samples_leaf": [1, 2, 5], "max_features": [1.0, "sqrt"]},
+    "svm": {"C": [0.1, 1, 10, 100], "gamma": ["scale", 0.01, 0.1, 1], "epsilon": [0.01, 0.1, 0.5]},
+    "knn": {"n_neighbors": [3, 5, 7, 11, 15], "weights": ["uniform", "distance"]},
+    "logistic_regression": {"C": [0.01, 0.1, 1, 10, 100]},
+    "gradient_boosting": {"n_estimators": [50, 100, 200], "learning_rate": [0.03, 0.1, 0.3], "max_depth": [2, 3, 5]},
+    "xgboost": {"n_estimators": [100, 300], "learning_rate": [0.03, 0.1, 0.3], "max_depth": [3, 6, 9]},
+}
+
+
+class FoldCache:
+    """
+    In-memory LRU of cross-validation folds as contiguous arrays, keyed by the
+    dataset key and split settings, so every candidate and every model
+    searched on the same data shares one set of fold matrices. Large arrays
+    are memory-mapped into the worker processes by joblib, not copied.
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHED_FOLDS):
+        self.max_entries = max_entries
+        self._folds = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, X, y, task, n_splits, random_state=42):
+        cache_key = (key, task, n_splits, random_state, len(X))
+        with self._lock:
+            folds = self._folds.get(cache_key)
+            if folds is not None:
+                self._folds.move_to_end(cache_key)
+                return folds
+
+        X, y = np.ascontiguousarray(X, dtype=float), np.ravel(np.asarray(y))
+        if task == "classification" and np.unique(y, return_counts=True)[1].min() >= n_splits:
+            splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+        else:
+            splitter = KFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+        folds = [(X[train], y[train], X[valid], y[valid]) for train, valid in splitter.split(X, y)]
+        with self._lock:
+            self._folds[cache_key] = folds
+            self._folds.move_to_end(cache_key)
+            while len(self._folds) > self.max_entries:
+                self._folds.popitem(last=False)
+        return folds
+
+    def clear(self):
+        with self._lock:
+            self._folds.clear()
+
+
+fold_cache = FoldCache()
+
+
+def candidate_params(model_name, strategy, n_iter=DEFAULT_N_ITER, random_state=42):
+    """
+    Parameter sets to try, the registry defaults ({}) first so a search cut
+    short by its time budget always has a baseline.
+    """
+    space = SEARCH_SPACES.get(model_name, {})
+    if strategy == 'none' or not space:
+        return [{}]
+    if strategy == 'grid':
+        candidates = list(ParameterGrid(space))
+    else:
+        grid_size = len(ParameterGrid(space))
+        candidates = list(ParameterSampler(space, n_iter=min(n_iter, grid_size), random_state=random_state))
+    return [{}] + [params for params in candidates if params]
+
+
+def _evaluate_fold(model_name, params, X_train, y_train, X_valid, n_rows=None):
+    model = model_registry.create(model_name, n_jobs=1, **params)
+    if n_rows is not None:
+        X_train, y_train = X_train[:n_rows], y_train[:n_rows]
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    y_pred = model.predict(X_valid)
+    return y_pred, fit_seconds, time.perf_counter() - start
+
+
+def _safe_evaluate_fold(*args, **kwargs):
+    try:
+        return _evaluate_fold(*args, **kwargs)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+def _rung_rows(entry):
+    return math.inf if entry["Training Rows"] is None else entry["Training Rows"]
+
+
+def _summarise(fold_metrics):
+    """
+    Mean and standard deviation across folds of every scalar metric.
+    """
+    names = [name for name, value in fold_metrics[0].items() if np.isscalar(value)]
+    return {
+        name: {"mean": float(np.mean([m[name] for m in fold_metrics])),
+               "std": float(np.std([m[name] for m in fold_metrics]))}
+        for name in names
+    }
+
+
+class ModelSearch:
+    """
+    k-fold cross-validation of one model over a set of hyperparameter
+    candidates, with (candidate, fold) fits run on a process pool.
+
+    score_folds(y_true, y_pred) turns one fold's validation predictions into
+    a metrics dict in the target's original units; score_name is the metric
+    ranked on (higher is better). strategy 'halving' scores the whole grid
+    on a fraction of each training fold and keeps the best 1/HALVING_FACTOR
+    for the next, larger rung. Candidates are evaluated in batches of n_jobs
+    and the search stops starting new batches once time_budget seconds have
+    passed.
+    """
+
+    def __init__(self, model_name, task, score_folds, score_name, n_splits=DEFAULT_FOLDS, strategy='none',
+                 n_iter=DEFAULT_N_ITER, time_budget=DEFAULT_TIME_BUDGET, n_jobs=-1, cache=fold_cache):
+        if strategy not in SEARCH_STRATEGIES:
+            raise ValueError(f"Unknown search strategy '{strategy}'. Choose from: {', '.join(SEARCH_STRATEGIES)}")
+        self.model_name = model_name
+        self.task = task
+        self.score_folds = score_folds
+        self.score_name = score_name
+        self.n_splits = n_splits
+        self.strategy = strategy
+        self.n_iter = n_iter
+        self.time_budget = time_budget
+        self.n_jobs = n_jobs
+        self.cache = cache
+
+    def _run_rung(self, parallel, candidates, folds, deadline, n_rows=None):
+        """
+        Cross-validate candidates; returns {index: entry} for those evaluated
+        before the deadline and whether the budget ran out.
+        """
+        batch_size = max(1, effective_n_jobs(self.n_jobs))
+        evaluated = {}
+        for start in range(0, len(candidates), batch_size):
+            if evaluated and time.perf_counter() > deadline:
+                return evaluated, True
+            batch = list(enumerate(candidates))[start:start + batch_size]
+            outcomes = parallel(
+                delayed(_safe_evaluate_fold)(self.model_name, params, X_tr, y_tr, X_va, n_rows)
+                for _, params in batch for X_tr, y_tr, X_va, _ in folds
+            )
+            for position, (index, params) in enumerate(batch):
+                fold_outcomes = outcomes[position * len(folds):(position + 1) * len(folds)]
+                errors = [outcome for outcome in fold_outcomes if isinstance(outcome, str)]
+                if errors:
+                    evaluated[index] = {"Params": params, "Error": errors[0]}
+                    continue
+                try:
+                    fold_metrics = [self.score_folds(y_va, y_pred)
+                                    for (_, _, _, y_va), (y_pred, _, _) in zip(folds, fold_outcomes)]
+                except ValueError as e:
+                    # e.g. a regressor predicting a class index the label encoder never saw
+                    evaluated[index] = {"Params": params, "Error": str(e)}
+                    continue
+                summary = _summarise(fold_metrics)
+                evaluated[index] = {
+                    "Params": params,
+                    "Metrics": summary,
+                    "Score": summary[self.score_name]["mean"],
+                    "Fit Seconds": float(sum(outcome[1] for outcome in fold_outcomes)),
+                    "Predict Seconds": float(sum(outcome[2] for outcome in fold_outcomes)),
+                    "Training Rows": n_rows,
+                }
+        return evaluated, False
+
+    def run(self, key, X, y):
+        """
+        Search on the training matrix X, y (already preprocessed) and return
+        the report: best parameters, mean/std per metric of the best
+        candidate, every candidate tried and a timing breakdown.
+        """
+        started = time.perf_counter()
+        deadline = started + self.time_budget
+        folds = self.cache.get(key, X, y, self.task, self.n_splits)
+        fold_seconds = time.perf_counter() - started
+
+        # Halving starts from the whole grid; the cheap early rungs prune it
+        candidates = candidate_params(self.model_name, 'grid' if self.strategy == 'halving' else self.strategy,
+                                      n_iter=self.n_iter)
+        tried, stopped_early = [], False
+        with Parallel(n_jobs=self.n_jobs) as parallel:
+            if self.strategy == 'halving' and len(candidates) > 1:
+                n_train = min(len(fold[0]) for fold in folds)
+                rungs = max(1, math.ceil(math.log(len(candidates), HALVING_FACTOR)))
+                # Training rows per rung, growing by HALVING_FACTOR up to the whole fold (None)
+                schedule = sorted({max(MIN_HALVING_ROWS, n_train // HALVING_FACTOR ** rung)
+                                   for rung in range(1, rungs + 1)})
+                schedule = [n_rows for n_rows in schedule if n_rows < n_train] + [None]
+                survivors = candidates
+                for n_rows in schedule:
+                    if tried and time.perf_counter() > deadline:
+                        stopped_early = True
+                        break
+                    if len(survivors) == 1:
+                        n_rows = None
+                    final = n_rows is None
+                    evaluated, stopped_early = self._run_rung(parallel, survivors, folds, deadline, n_rows)
+                    tried.extend(evaluated.values())
+                    ranked = sorted((entry for entry in evaluated.values() if "Error" not in entry),
+                                    key=lambda entry: entry["Score"], reverse=True)
+                    if final or stopped_early or not ranked:
+                        break
+                    survivors = [entry["Params"] for entry in ranked[:max(1, len(ranked) // HALVING_FACTOR)]]
+                # Only scores from the same rung are comparable; use the largest one reached
+                scored = [entry for entry in tried if "Error" not in entry]
+                largest = max((_rung_rows(entry) for entry in scored), default=None)
+                scored = [entry for entry in scored if _rung_rows(entry) == largest]
+            else:
+                evaluated, stopped_early = self._run_rung(parallel, candidates, folds, deadline)
+                tried.extend(evaluated.values())
+                scored = [entry for entry in tried if "Error" not in entry]
+
+        if not scored:
+            raise ValueError(f"Every candidate of '{self.model_name}' failed: {tried[0]['Error']}")
+        best = max(scored, key=lambda entry: entry["Score"])
+        search_seconds = time.perf_counter() - started - fold_seconds
+        return {
+            "Folds": self.n_splits,
+            "Search": self.strategy,
+            "Best Params": best["Params"],
+            "Metrics": best["Metrics"],
+            "Candidates": tried,
+            "Timing": {
+                "Fold Preparation Seconds": fold_seconds,
+                "Search Seconds": search_seconds,
+                "Fit Seconds": float(sum(entry.get("Fit Seconds", 0) for entry in tried)),
+                "Predict Seconds": float(sum(entry.get("Predict Seconds", 0) for entry in tried)),
+                # Halving evaluates a candidate once per rung it survives to
+                "Candidates Evaluated": len({repr(sorted(entry["Params"].items())) for entry in tried}),
+                "Candidates Planned": len(candidates),
+                "Rung Fits": len(tried),
+                "Stopped Early": stopped_early,
+            },
+        }
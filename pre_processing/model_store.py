@@ -0,0 +1,143 @@
+import os
+import re
+import json
+import time
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from pre_processing.model_registry import FittedModelCache
+
+ARTIFACT_DIRNAME = "models"
+DEFAULT_LOADED_ARTIFACTS = 8
+DEFAULT_PREDICT_CHUNKSIZE = 10_000
+
+_ARTIFACT_ID = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+
+class ModelArtifact:
+    """
+    A fitted estimator together with the PreprocessingPipeline it was trained
+    behind, so raw rows can be scored with transform-only preprocessing.
+    """
+
+    def __init__(self, model, pipeline, model_name, dataset_key=None):
+        self.model = model
+        self.pipeline = pipeline
+        self.model_name = model_name
+        self.dataset_key = dataset_key
+        self.created = time.time()
+
+    @property
+    def metadata(self):
+        return {
+            "model": self.model_name,
+            "task": self.pipeline.task,
+            "target": self.pipeline.target_column,
+            "features": self.pipeline.feature_columns,
+            "created": self.created,
+        }
+
+    def predict(self, df):
+        """
+        Predictions for a batch of raw rows, in the target's original units
+        or labels.
+        """
+        X = self.pipeline.transform_features(df)
+        return self.pipeline.inverse_transform_target(self.model.predict(X))
+
+
+class ArtifactStore:
+    """
+    Fitted models on disk under store_dir, one joblib file per artifact plus
+    a JSON sidecar with its metadata. Loaded artifacts stay in an in-memory
+    LRU keyed by path and modification time, so repeated prediction requests
+    do not pay deserialization.
+    """
+
+    def __init__(self, store_dir, loaded=None):
+        self.store_dir = store_dir
+        self.loaded = loaded if loaded is not None else loaded_artifacts
+
+    @staticmethod
+    def artifact_id(model_name, dataset_key):
+        return f"{model_name}-{dataset_key[:16]}"
+
+    def _path(self, artifact_id, extension):
+        if not _ARTIFACT_ID.match(artifact_id):
+            raise KeyError(artifact_id)
+        return os.path.join(self.store_dir, f"{artifact_id}{extension}")
+
+    def save(self, artifact_id, artifact):
+        """
+        Write an artifact atomically and return its ID.
+        """
+        os.makedirs(self.store_dir, exist_ok=True)
+        for extension, write in ((".joblib", lambda path: joblib.dump(artifact, path)),
+                                 (".json", lambda path: _write_json(path, artifact.metadata))):
+            fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, prefix='.tmp-', suffix=extension)
+            os.close(fd)
+            write(tmp_path)
+            os.replace(tmp_path, self._path(artifact_id, extension))
+        return artifact_id
+
+    def load(self, artifact_id):
+        """
+        Return the artifact, from memory when this version was loaded before.
+        Raises KeyError for unknown IDs.
+        """
+        path = self._path(artifact_id, ".joblib")
+        try:
+            version = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+        except FileNotFoundError:
+            raise KeyError(artifact_id)
+        artifact = self.loaded.get(version)
+        if artifact is None:
+            artifact = joblib.load(path)
+            self.loaded.put(version, artifact)
+        return artifact
+
+    def list(self):
+        if not os.path.isdir(self.store_dir):
+            return {}
+        artifacts = {}
+        for name in sorted(os.listdir(self.store_dir)):
+            if name.endswith(".json") and not name.startswith("."):
+                try:
+                    with open(os.path.join(self.store_dir, name)) as f:
+                        artifacts[name[:-len(".json")]] = json.load(f)
+                except (OSError, ValueError):
+                    continue
+        return artifacts
+
+
+def _write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def artifact_store(output_dir):
+    """
+    The artifact store of a pipeline output directory.
+    """
+    return ArtifactStore(os.path.join(output_dir, ARTIFACT_DIRNAME))
+
+
+def predict_batches(artifact, batches, include_input=True):
+    """
+    Score an iterable of DataFrames lazily, one output frame per batch, so
+    memory stays bounded by the batch size.
+    """
+    for batch in batches:
+        predictions = artifact.predict(batch)
+        if include_input:
+            scored = batch.reset_index(drop=True)
+            scored["prediction"] = predictions
+        else:
+            scored = pd.DataFrame({"prediction": np.asarray(predictions)})
+        yield scored
+
+
+loaded_artifacts = FittedModelCache(DEFAULT_LOADED_ARTIFACTS)
@@ -1,43 +1,89 @@
+import os
+import json
+import time
+import tracemalloc
+
 from flask import session
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-from sklearn.svm import SVR
-from sklearn.linear_model import LinearRegression, LogisticRegression
-from sklearn.tree import DecisionTreeRegressor
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.neighbors import KNeighborsRegressor
+from joblib import Parallel, delayed
+
 from sklearn.preprocessing import LabelEncoder,StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, explained_variance_score, mean_absolute_error, mean_squared_error, r2_score,accuracy_score
 
 from pre_processing.main import main
-from pre_processing.modules.transformation import transform
+from pre_processing.model_registry import FittedModelCache, model_registry
+from pre_processing.model_store import ArtifactStore, ModelArtifact, artifact_store
+from pre_processing.modules.transformation import PreprocessingPipeline
+from pre_processing.modules.result_cache import CleanedDatasetCache
+from pre_processing.modules.pre_processing_utils import no_progress
+from pre_processing.modules.rule_based_cleaning import RULES_PATH
 from utils import global_store
-
-models = {
-    "linear_regression": LinearRegression(),
-    "decision_tree": DecisionTreeRegressor(),
-    "random_forest": RandomForestRegressor(),
-    "svm": SVR(),
-    "knn": KNeighborsRegressor(),
-    "logistic_regression": LogisticRegression(),
-    "gradient_boosting": GradientBoostingRegressor(),
-    # "xgboost": XGBRegressor()
-}
-
-def pre_process_data(file_path):
-    checkbox = global_store.global_data["checkbox"]
-    df, _ = main(file_path, gen_syn_data=checkbox)
-    return df
-
-def train_predict_regression(data_csv, model_name, target):
-    df = pre_process_data(data_csv)
-    df, scaler = transform(df, target_column=target, task="prediction")
-
-    df.to_csv(r"output\after_preprocess.csv")
+from utils.storage import write_output
+from utils.dataset_cache import dataset_cache
+from utils.lazy_import import LazyModule
+
+# matplotlib loads on the first chart, not on import
+plotting = LazyModule('pre_processing.modules.plotting')
+model_search = LazyModule('pre_processing.model_search')
+
+# Cores per single-model fit; batch comparisons parallelise across models instead
+MODEL_N_JOBS = int(os.environ.get("DATADOME_MODEL_N_JOBS", -1))
+
+cleaned_cache = CleanedDatasetCache()
+fitted_models = FittedModelCache()
+
+def dataset_key(file_path, target=None, task=None, gen_syn_data=None, rules_path=RULES_PATH):
+    """
+    Key identifying a cleaned dataset: the file contents plus cleaning parameters.
+    """
+    checkbox = global_store.global_data["checkbox"] if gen_syn_data is None else gen_syn_data
+    return cleaned_cache.key(file_path, {
+        "gen_syn_data": bool(checkbox), "target": target, "task": task, "rules_path": rules_path
+    })
+
+def pre_process_data(file_path, target=None, task=None, gen_syn_data=None, progress=None,
+                     output_dir="output", rules_path=RULES_PATH, key=None):
+    """
+    Clean the dataset, reusing a cached result when the same file was already
+    cleaned with the same parameters (e.g. when only the model changes).
+    A cached result's profiling_report.json is written to output_dir as the
+    pipeline would have written it.
+    gen_syn_data defaults to the checkbox in global_store; pass it explicitly
+    when running outside the Flask process.
+    """
+    checkbox = global_store.global_data["checkbox"] if gen_syn_data is None else gen_syn_data
+    key = key or dataset_key(file_path, target, task, checkbox, rules_path)
+    report_path = os.path.join(output_dir, "profiling_report.json")
+    cached = cleaned_cache.get(key)
+    if cached is not None:
+        df, report, schema = cached
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=4)
+        return df, schema
+
+    df, _, schema = main(file_path, output_dir=output_dir, gen_syn_data=checkbox, target=target, task=task,
+                         rules_path=rules_path, progress=progress)
+    # Cache the report file as written, with its synthesis and performance sections
+    with open(report_path) as f:
+        report = json.load(f)
+    cleaned_cache.put(key, df, report, schema)
+    return df, schema
+
+def prepare_training_data(data_csv, target, task, gen_syn_data=None, progress=None, output_dir="output",
+                          rules_path=RULES_PATH):
+    """
+    Clean and transform the dataset once and return the shared train/test
+    split as (X_train, X_test, y_train, y_test, pipeline, dataset_key), where
+    pipeline is the fitted PreprocessingPipeline.
+    """
+    key = dataset_key(data_csv, target, task, gen_syn_data, rules_path)
+    df, schema = pre_process_data(data_csv, target=target, task=task, gen_syn_data=gen_syn_data, progress=progress,
+                                  output_dir=output_dir, rules_path=rules_path, key=key)
+    pipeline = PreprocessingPipeline(target, task, schema)
+    df = pipeline.fit_transform(df)
+
+    write_output(df, os.path.join(output_dir, "after_preprocess" if task == "prediction" else "clean_user_data_test"))
 
     X = df.drop(columns=[target])
     y = df[target]
@@ -45,26 +91,122 @@ def train_predict_regression(data_csv, model_name, target):
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42
     )
+    return X_train, X_test, y_train, y_test, pipeline, key
+
+
+def fit_model(key, model_name, X_train, y_train, params=None):
+    """
+    Fit a fresh estimator, or reuse the one already fitted for this dataset
+    key, model and hyperparameters (params override the registry defaults).
+    """
+    params = params or {}
+    fit_key = (key, model_name, tuple(sorted(params.items(), key=lambda item: item[0])))
+    model = fitted_models.get(fit_key)
+    if model is None:
+        model = model_registry.create(model_name, n_jobs=MODEL_N_JOBS, **params)
+        # ravel to convert to 1D array if needed
+        model.fit(X_train, np.ravel(y_train))
+        fitted_models.put(fit_key, model)
+    return model
+
+
+def save_artifact(output_dir, key, model_name, pipeline, model):
+    """
+    Persist a fitted model with its preprocessing so /predict can score new
+    rows, and return the artifact ID.
+    """
+    artifact_id = ArtifactStore.artifact_id(model_name, key)
+    return artifact_store(output_dir).save(artifact_id, ModelArtifact(model, pipeline, model_name, key))
+
+
+def regression_metrics(y_test, y_test_pred):
+    mse = mean_squared_error(y_test, y_test_pred)
+    return {
+        "Mean Squared Error": mse,
+        "Root Mean Squared Error": np.sqrt(mse),
+        "Mean Absolute Error": mean_absolute_error(y_test, y_test_pred),
+        # Mean Absolute Percentage Error
+        "Mean Absolute Percentage Error": np.mean(np.abs((y_test - y_test_pred) / y_test)) * 100,
+        "R-squared Score": r2_score(y_test, y_test_pred),
+        "Explained Variance Score": explained_variance_score(y_test, y_test_pred)
+    }
 
-    model = models.get(model_name)
-    # ravel to convert to 1D array if needed
-    model.fit(X_train, y_train.ravel())
+
+def classification_metrics(y_test, y_test_pred):
+    return {
+        "Accuracy": accuracy_score(y_test, y_test_pred),
+        "Classification Report": classification_report(y_test, y_test_pred, output_dict=True, zero_division=0)
+    }
+
+
+def inverse_target(task, scaler, y_test, y_test_pred):
+    """
+    Map scaled (prediction) or label-encoded (classification) targets back to
+    their original values.
+    """
+    if task == "prediction":
+        y_test = scaler.inverse_transform(np.asarray(y_test).reshape(-1, 1)).flatten()
+        y_test_pred = scaler.inverse_transform(np.asarray(y_test_pred).reshape(-1, 1)).flatten()
+    else:
+        y_test = scaler.inverse_transform(np.asarray(y_test).astype(int))
+        y_test_pred = scaler.inverse_transform(np.asarray(y_test_pred).astype(int))
+    return y_test, y_test_pred
+
+
+def cross_validate(key, model_name, task, pipeline, X_train, y_train, cv, search="none", n_iter=None,
+                   time_budget=None):
+    """
+    k-fold cross-validation of model_name on the training split, searching
+    its parameter space with strategy search ('none', 'grid', 'random' or
+    'halving'). Fold metrics are computed in the target's original units.
+    Returns the model_search report, whose "Best Params" are refitted on
+    the whole training split by the caller.
+    """
+    def score_folds(y_true, y_pred):
+        y_true, y_pred = inverse_target(task, pipeline.target_encoder, y_true, y_pred)
+        return regression_metrics(y_true, y_pred) if task == "prediction" else classification_metrics(y_true, y_pred)
+
+    options = {name: value for name, value in (("n_iter", n_iter), ("time_budget", time_budget)) if value is not None}
+    searcher = model_search.ModelSearch(model_name, task, score_folds,
+                                        "R-squared Score" if task == "prediction" else "Accuracy",
+                                        n_splits=cv, strategy=search, n_jobs=MODEL_N_JOBS, **options)
+    return searcher.run(key, X_train, y_train)
+
+
+def fit_evaluated_model(key, model_name, task, pipeline, X_train, y_train, cv=None, **search_options):
+    """
+    Fit model_name on the training split, first cross-validating and tuning
+    it when cv (number of folds) is given. Returns (model, cv_report), with
+    cv_report None without cross-validation.
+    """
+    if not cv:
+        return fit_model(key, model_name, X_train, y_train), None
+    report = cross_validate(key, model_name, task, pipeline, X_train, y_train, cv, **search_options)
+    start = time.perf_counter()
+    model = fit_model(key, model_name, X_train, y_train, report["Best Params"])
+    report["Timing"]["Refit Seconds"] = time.perf_counter() - start
+    return model, report
+
+
+def train_predict_regression(data_csv, model_name, target, gen_syn_data=None, progress=None, output_dir="output",
+                             rules_path=RULES_PATH, cv=None, **search_options):
+    """
+    Fit model_name on the cleaned training split and score the holdout. With
+    cv folds, the results gain a "Cross Validation" entry and the model is
+    refitted with the best parameters found (see cross_validate).
+    """
+    X_train, X_test, y_train, y_test, pipeline, key = prepare_training_data(
+        data_csv, target, "prediction", gen_syn_data=gen_syn_data, progress=progress,
+        output_dir=output_dir, rules_path=rules_path
+    )
+
+    model, cv_report = fit_evaluated_model(key, model_name, "prediction", pipeline, X_train, y_train, cv,
+                                           **search_options)
+    artifact_id = save_artifact(output_dir, key, model_name, pipeline, model)
 
     y_test_pred = model.predict(X_test)
     # **Inverse transform predicted and actual y values**
-    y_test = scaler.inverse_transform(
-        y_test.to_numpy().reshape(-1, 1)).flatten()
-    y_test_pred = scaler.inverse_transform(
-        np.array(y_test_pred).reshape(-1, 1)).flatten()
-
-    # Compute metrics
-    mse = mean_squared_error(y_test, y_test_pred)
-    rmse = np.sqrt(mse)
-    mae = mean_absolute_error(y_test, y_test_pred)
-    r2 = r2_score(y_test, y_test_pred)
-    explained_variance = explained_variance_score(y_test, y_test_pred)
-    mape = np.mean(np.abs((y_test - y_test_pred) / y_test)) * \
-        100  # Mean Absolute Percentage Error
+    y_test, y_test_pred = inverse_target("prediction", pipeline.target_encoder, y_test, y_test_pred)
 
     # Store results
     results = {
@@ -72,51 +214,33 @@ def train_predict_regression(data_csv, model_name, target):
         "Intercept": model.intercept_.tolist() if hasattr(model, "intercept_") else "Not applicable",
         "Expected": y_test.tolist(),
         "Preds": y_test_pred.tolist(),
-        "Performance Metrics": {
-            "Mean Squared Error": mse,
-            "Root Mean Squared Error": rmse,
-            "Mean Absolute Error": mae,
-            "Mean Absolute Percentage Error": mape,
-            "R-squared Score": r2,
-            "Explained Variance Score": explained_variance
-        }
+        "Performance Metrics": regression_metrics(y_test, y_test_pred),
+        "Artifact ID": artifact_id
     }
+    if cv_report is not None:
+        results["Cross Validation"] = cv_report
 
     return results, y_test, y_test_pred
 
 
-def train_predict_classification(data_csv, model_name, target):
-    df = pre_process_data(data_csv)
-    df, scaler = transform(df, target_column=target, task="classification")
-
-    df.to_csv(r"output\clean_user_data_test.csv")
-
-    X = df.drop(columns=[target])
-    y = df[target]
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
+def train_predict_classification(data_csv, model_name, target, gen_syn_data=None, progress=None, output_dir="output",
+                             rules_path=RULES_PATH, cv=None, **search_options):
+    """
+    Classification counterpart of train_predict_regression.
+    """
+    X_train, X_test, y_train, y_test, pipeline, key = prepare_training_data(
+        data_csv, target, "classification", gen_syn_data=gen_syn_data, progress=progress,
+        output_dir=output_dir, rules_path=rules_path
     )
 
-    model = models.get(model_name)
-    # ravel to convert to 1D array if needed
-    model.fit(X_train, y_train.ravel())
+    model, cv_report = fit_evaluated_model(key, model_name, "classification", pipeline, X_train, y_train, cv,
+                                           **search_options)
+    artifact_id = save_artifact(output_dir, key, model_name, pipeline, model)
 
     y_test_pred = model.predict(X_test)
 
-    y_test = y_test.astype(int)
-    y_test_pred = y_test_pred.astype(int)
     # **Inverse transform predicted and actual y values**
-    y_test = scaler.inverse_transform(y_test.to_numpy())
-    y_test_pred = scaler.inverse_transform(np.array(y_test_pred))
-
-    accuracy = accuracy_score(y_test, y_test_pred)
-    class_report = classification_report(y_test, y_test_pred, output_dict=True)
-
-    metrics = {
-        "Accuracy": accuracy,
-        "Classification Report": class_report
-    }
+    y_test, y_test_pred = inverse_target("classification", pipeline.target_encoder, y_test, y_test_pred)
 
     num_classes = len(np.unique(y_train))
 
@@ -124,14 +248,107 @@ def train_predict_classification(data_csv, model_name, target):
         "Model Type": "Binary Classification" if num_classes == 2 else "Multiclass Classification",
         "Feature Importances": model.coef_.tolist() if hasattr(model, "coef_") else "Not applicable",
         "Predictions on Test Data": y_test_pred.tolist(),
-        "Performance Metrics": metrics
+        "Performance Metrics": classification_metrics(y_test, y_test_pred),
+        "Artifact ID": artifact_id
     }
+    if cv_report is not None:
+        results["Cross Validation"] = cv_report
 
     return results, y_test.tolist(), y_test_pred.tolist()
 
 
+def _fit_and_evaluate(model_name, model, X_train, y_train, X_test):
+    """
+    Fit one unfitted estimator and predict the test split, recording wall
+    time of each step and the peak Python-tracked allocation during the fit.
+    Runs inside a worker process of train_all_models; the fitted model is
+    returned so it can be saved as an artifact.
+    """
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        model.fit(X_train, np.ravel(y_train))
+        fit_seconds = time.perf_counter() - start
+        _, peak_bytes = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        y_test_pred = model.predict(X_test)
+        predict_seconds = time.perf_counter() - start
+    finally:
+        tracemalloc.stop()
+    return model_name, model, y_test_pred, fit_seconds, predict_seconds, peak_bytes
+
+
+def _failed_entry(model_name, error):
+    return {"Model": model_name, "Error": error}
+
+
+def _safe_fit_and_evaluate(model_name, model, X_train, y_train, X_test):
+    try:
+        return _fit_and_evaluate(model_name, model, X_train, y_train, X_test)
+    except Exception as e:
+        return _failed_entry(model_name, f"{type(e).__name__}: {e}")
+
+
+def train_all_models(data_csv, model_names, task, target, gen_syn_data=None, progress=None, output_dir="output",
+                     rules_path=RULES_PATH, n_jobs=-1):
+    """
+    Train several models on one cleaned dataset and rank them.
+
+    The data is cleaned, transformed and split once; every model is a fresh
+    clone fitted on the same split, in parallel across n_jobs processes, so the
+    batch costs roughly as much as its slowest model.
+
+    Returns the leaderboard: one dict per model with its metrics, fit and
+    predict seconds, peak fit memory and saved artifact ID, best first (by R-squared for
+    prediction, accuracy for classification). Models that are unknown or fail
+    are listed last with an "Error" entry.
+    """
+    progress = progress or no_progress
+    X_train, X_test, y_train, y_test, pipeline, key = prepare_training_data(
+        data_csv, target, task, gen_syn_data=gen_syn_data, progress=progress,
+        output_dir=output_dir, rules_path=rules_path
+    )
+
+    failed = [_failed_entry(name, "Model is not available.") for name in model_names if name not in model_registry]
+    available = [name for name in model_names if name in model_registry]
+
+    progress("training", 0.7)
+    fitted = Parallel(n_jobs=n_jobs, return_as="generator_unordered")(
+        delayed(_safe_fit_and_evaluate)(name, model_registry.create(name, n_jobs=1), X_train, y_train, X_test) for name in available
+    )
+
+    leaderboard = []
+    for done, outcome in enumerate(fitted, start=1):
+        progress("training", 0.7 + 0.25 * done / len(available))
+        if isinstance(outcome, dict):
+            failed.append(outcome)
+            continue
+        model_name, model, y_test_pred, fit_seconds, predict_seconds, peak_bytes = outcome
+        try:
+            y_true, y_pred = inverse_target(task, pipeline.target_encoder, y_test, y_test_pred)
+            metrics = regression_metrics(y_true, y_pred) if task == "prediction" else classification_metrics(y_true, y_pred)
+        except ValueError as e:
+            # e.g. a regressor predicting a class index the label encoder never saw
+            failed.append(_failed_entry(model_name, str(e)))
+            continue
+        leaderboard.append({
+            "Model": model_name,
+            "Performance Metrics": metrics,
+            "Fit Seconds": fit_seconds,
+            "Predict Seconds": predict_seconds,
+            "Peak Fit Memory Bytes": peak_bytes,
+            "Artifact ID": save_artifact(output_dir, key, model_name, pipeline, model),
+        })
+
+    score = "R-squared Score" if task == "prediction" else "Accuracy"
+    leaderboard.sort(key=lambda entry: entry["Performance Metrics"][score], reverse=True)
+    progress("done", 1.0)
+    return leaderboard + failed
+
+
 def regression_standard(data_csv, model_name, target):
-    data = pd.read_csv(data_csv)
+    data = dataset_cache.get(data_csv)
     X = data.drop(columns=[target])
     y = data[target]
 
@@ -147,7 +364,7 @@ def regression_standard(data_csv, model_name, target):
         X_scaled, y_scaled, test_size=0.2, random_state=42
     )
 
-    model = models.get(model_name)
+    model = model_registry.create(model_name, n_jobs=MODEL_N_JOBS)
     # ravel to convert to 1D array if needed
     model.fit(X_train, y_train.ravel())
 
@@ -187,7 +404,7 @@ def regression_standard(data_csv, model_name, target):
 
 def classification_standard(data_csv, model_name, target):
     # Load data
-    data = pd.read_csv(data_csv)
+    data = dataset_cache.get(data_csv)
     X = data.drop(columns=[target])
     y = data.iloc[target]
 
@@ -203,7 +420,7 @@ def classification_standard(data_csv, model_name, target):
         X_scaled, y_scaled, test_size=0.2, random_state=42
     )
 
-    model = models.get(model_name)
+    model = model_registry.create(model_name, n_jobs=MODEL_N_JOBS)
     # ravel to convert to 1D array if needed
     model.fit(X_train, y_train.ravel())
 
@@ -232,47 +449,13 @@ def classification_standard(data_csv, model_name, target):
     return results, y_test, y_test_pred
 
 
-def visualize_results(un_results, un_y_test, un_y_pred, pros_results, pros_test, pros_pred, save_path):
-    fig, axes = plt.subplots(4, 2, figsize=(20, 20))
-    axes = axes.flatten()
-
-    for i, (yt, yp, title) in enumerate([
+def visualize_results(un_results, un_y_test, un_y_pred, pros_results, pros_test, pros_pred, save_path, run_id=None):
+    """
+    Render the conventional vs processed comparison chart to save_path. Large
+    test sets are binned or decimated (see modules.plotting), and images are
+    cached per run_id, a hash of the plotted values by default.
+    """
+    return plotting.render_results([
         (un_results["Expected"], un_results["Preds"], "Conventional Results"),
-        (pros_results["Expected"], pros_results["Preds"],
-         "Our Model processing Results")
-    ]):
-        # Convert lists to numpy arrays for element-wise subtraction
-        yt = np.array(yt).flatten()
-        yp = np.array(yp).flatten()
-        residuals = yt - yp
-
-        sns.scatterplot(x=yt, y=yp, alpha=0.7, ax=axes[i])
-        axes[i].plot([yt.min(), yt.max()], [
-                     yt.min(), yt.max()], 'r', linestyle='--')
-        axes[i].set_xlabel("Actual Values")
-        axes[i].set_ylabel("Predicted Values")
-        axes[i].set_title(f"{title} - Actual vs Predicted Values")
-
-        sns.histplot(residuals, kde=True, bins=30,
-                     color='blue', alpha=0.7, ax=axes[i + 2])
-        axes[i + 2].set_xlabel("Residuals")
-        axes[i + 2].set_title(f"{title} - Residuals Distribution")
-
-        sns.boxplot(y=residuals, ax=axes[i + 4])
-        axes[i + 4].set_title(f"{title} - Boxplot of Residuals")
-
-        sns.lineplot(x=range(len(yt)), y=yt, label='Actual',
-                     marker='o', ax=axes[i + 6])
-        sns.lineplot(x=range(len(yp)), y=yp, label='Predicted',
-                     marker='s', ax=axes[i + 6])
-        axes[i + 6].set_xlabel("Sample Index")
-        axes[i + 6].set_ylabel("Values")
-        axes[i + 6].set_title(f"{title} - Actual vs Predicted Line Plot")
-        axes[i + 6].legend()
-
-    plt.tight_layout()
-
-    plt.savefig(save_path)
-    plt.close()
-
-    return save_path
+        (pros_results["Expected"], pros_results["Preds"], "Our Model processing Results"),
+    ], save_path, run_key=run_id)
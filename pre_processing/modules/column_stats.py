@@ -0,0 +1,107 @@
+import weakref
+import warnings
+
+import numpy as np
+import pandas as pd
+
+def _first_mode(counts):
+    """
+    The most frequent value from value_counts output; ties go to the
+    smallest value, as Series.mode() orders them.
+    """
+    counts = counts[counts > 0]
+    if counts.empty:
+        return None
+    tied = counts.index[counts.to_numpy() == counts.iloc[0]]
+    try:
+        return sorted(tied)[0]
+    except TypeError:
+        return tied[0]
+
+
+class ColumnStats:
+    """
+    Per-column statistics of a DataFrame computed together: null masks and
+    counts, cardinality, and for numeric columns count, mean, median and
+    skewness (biased, as scipy.stats.skew) from one pass over a 2-D float
+    array, plus min/max in the column dtype. Modes are computed for
+    non-numeric columns up front and for numeric ones on request.
+
+    The statistics are a snapshot of the frame at one pipeline stage: build
+    them once with ColumnStats(df) and pass them to every consumer of that
+    stage (e.g. the report and synthesis both take the final frame's), and
+    build new ones once the frame has changed.
+    """
+
+    def __init__(self, df):
+        self.rows = len(df)
+        self.null_mask = df.isna()
+        self.null_counts = self.null_mask.sum()
+        self.missing_percentages = self.null_counts / max(self.rows, 1) * 100
+        self.unique_counts = df.nunique(dropna=True)
+
+        numeric = [column for column in df.columns
+                   if pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column])]
+        self.numeric_columns = numeric
+        values = df[numeric].to_numpy(dtype=float, na_value=np.nan) if numeric else np.empty((self.rows, 0))
+        present = ~np.isnan(values)
+        counts = present.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            mean = np.nansum(values, axis=0) / counts
+            centered = np.where(present, values - mean, 0.0)
+            m2 = (centered ** 2).sum(axis=0) / counts
+            m3 = (centered ** 3).sum(axis=0) / counts
+            skewness = np.where(m2 > 0, m3 / m2 ** 1.5, np.nan)
+            median = np.nanmedian(values, axis=0) if self.rows else np.full(len(numeric), np.nan)
+        minimum, maximum = df[numeric].min(), df[numeric].max()
+        self.numeric = pd.DataFrame({
+            'count': counts, 'mean': mean, 'median': median, 'skew': skewness,
+        }, index=pd.Index(numeric, dtype=object))
+        self.minimum, self.maximum = minimum, maximum
+
+        self._modes = {
+            column: _first_mode(df[column].value_counts(dropna=True))
+            for column in df.columns if column not in self.numeric.index
+        }
+        self._df_columns = df.columns
+        self._source = weakref.ref(df)
+
+    def mode(self, column):
+        if column not in self._modes:
+            self._modes[column] = _first_mode(self._source()[column].value_counts(dropna=True))
+        return self._modes[column]
+
+    def range(self, column):
+        """
+        (min, max) of a column; non-numeric columns fall back to pandas.
+        """
+        if column in self.numeric.index:
+            return self.minimum[column], self.maximum[column]
+        series = self._source()[column]
+        return series.min(), series.max()
+
+    def missing_indices(self, column):
+        return self.null_mask.index[self.null_mask[column].to_numpy()].tolist()
+
+    def summary(self):
+        """
+        JSON-ready per-column statistics for the profiling report.
+        """
+        summary = {}
+        for column in self._df_columns:
+            entry = {
+                'missing_count': int(self.null_counts[column]),
+                'missing_percentage': round(float(self.missing_percentages[column]), 2),
+                'unique_count': int(self.unique_counts[column]),
+            }
+            if column in self.numeric.index:
+                entry.update({name: float(value) for name, value in self.numeric.loc[column].items()})
+                entry.update({'min': float(self.minimum[column]), 'max': float(self.maximum[column])})
+            else:
+                mode = self._modes[column]
+                if isinstance(mode, np.generic):
+                    mode = mode.item()
+                entry['mode'] = mode if mode is None or isinstance(mode, (str, bool, int, float)) else str(mode)
+            summary[column] = entry
+        return summary
@@ -1,116 +1,159 @@
-import hashlib
+import pandas as pd
 
-from sklearn.impute import KNNImputer
 from sklearn.preprocessing import StandardScaler
-from scipy.stats import skew
 from pre_processing.modules.pre_processing_utils import infer_column_type
+from pre_processing.modules.column_stats import ColumnStats
+from pre_processing.modules.duplicate_detection import detect_duplicates
+from pre_processing.modules.schema import DatasetSchema
+from pre_processing.modules.imputation import create_imputer, MedianStrategy, DEFAULT_TIME_BUDGET, DEFAULT_MEMORY_BUDGET
 
 
 class DataCleaner:
-    def __init__(self):
+    def __init__(self, imputation_strategy='auto', imputation_time_budget=DEFAULT_TIME_BUDGET,
+                 imputation_memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.imputation_strategy = imputation_strategy
+        self.imputation_time_budget = imputation_time_budget
+        self.imputation_memory_budget = imputation_memory_budget
         self.type_validation_report = {}
         self.missing_info = {}
-        # self.duplicate_indices = []
+        self.duplicate_indices = []
+        self.fill_values = {}
+        self.imputed_columns = []
+        self.imputer_scaler = None
+        self.numeric_imputer = None
+        self._datetime_carry = {}
     
 
-    def identify_duplicate_rows(self, df):
+    def identify_duplicate_rows(self, df, subset=None, keep='first'):
         """
-        Identify and remove duplicate rows using row hashing.
+        Identify and remove duplicate rows using vectorized columnar row hashing.
         """
-        def hash_row(row):
-            row_str = ''.join(str(x) for x in row)
-            return hashlib.md5(row_str.encode()).hexdigest()
+        duplicate_mask, drop_mask = detect_duplicates(df, subset=subset, keep=keep)
+        self.duplicate_indices = df.index[duplicate_mask].tolist()
         
-        df['_row_hash'] = df.apply(hash_row, axis=1)
-        
-        duplicate_mask = df.duplicated(subset=['_row_hash'], keep=False)
-        self.duplicate_indices = df[duplicate_mask].index.tolist()
-        
-        df_unique = df.drop_duplicates(subset=['_row_hash']).drop(columns=['_row_hash'])
+        df_unique = df[~drop_mask]
         
         return df_unique
     
 
-    def infer_and_validate_column_types(self, df):
+    def infer_and_validate_column_types(self, df, sample_size=None):
         """
-        Infer and validate data types for each column with regex handling.
+        Infer and validate data types for each column in a single vectorized pass.
+        If sample_size is set, types are decided on a random sample of that many rows.
+        Missing values are left in place; see fill_missing.
         """
-        def is_datetime(column) -> bool:
-            try:
-                pd.to_datetime(column)
-                return True
-            except (ValueError, TypeError):
-                return False
-            
-        import pandas as pd
-
-        column_dtype = {}
+        column_dtype = DatasetSchema()
         
         for column in df.columns:
-            if is_datetime(df[column]):
-                converted_series = df[column]
-                column_dtype[column] = "datetime"  
-            else:
-                converted_series, inferred_type = infer_column_type(df[column])
-                column_dtype[column] = inferred_type  
-                invalid_indices = df[column].index[pd.isna(converted_series)]
+            converted_series, inferred_type = infer_column_type(df[column], sample_size=sample_size)
+            column_dtype[column] = inferred_type
+            if inferred_type != "datetime":
+                df[column] = converted_series
+
+        # Converted values that did not parse are the missing ones now
+        stats = ColumnStats(df)
+        for column, inferred_type in column_dtype.items():
+            if inferred_type != "datetime":
+                invalid_indices = stats.missing_indices(column)
                 self.type_validation_report[column] = {
                     'inferred_type': inferred_type,
                     'invalid_entries_count': len(invalid_indices),
-                    'invalid_entry_indices': list(invalid_indices)
+                    'invalid_entry_indices': invalid_indices
                 }
-                df[column] = converted_series
 
+        return df,column_dtype
+
+    def fill_missing(self, df, column_dtype, stats=None):
+        """
+        Fit the fill statistics on df (see fit_fill_values) and fill its
+        missing values. stats is df's ColumnStats, computed if not given.
+        """
+        stats = stats or ColumnStats(df)
+        self.fit_fill_values(df, column_dtype, stats.missing_percentages, stats=stats)
+        return self.fill_missing_values(df, column_dtype)
+    
+    def fit_fill_values(self, df, column_dtype, missing_percentages, stats=None):
+        """
+        Fit the statistics used to fill missing values: an imputation strategy
+        (KNN by default, see imputation.create_imputer) for numeric columns with
+        5% or more missing values, the mode for object columns and the median
+        (skewed) or mean for the remaining numeric columns. Modes and moments
+        come from stats, df's ColumnStats, computed if not given.
+        """
+        stats = stats or ColumnStats(df)
         numeric = ['int', 'float']
         numeric_cols = [col for col in df.columns if (column_dtype[col] in numeric)]
-        missing_percentages = df.isna().sum() / len(df) * 100
-        high_missing_numeric_cols = [col for col in numeric_cols if missing_percentages[col] >= 5]
+        self.imputed_columns = [col for col in numeric_cols if missing_percentages[col] >= 5]
+        self.imputer_scaler = None
+        self.numeric_imputer = None
+        self.fill_values = {}
 
-        if high_missing_numeric_cols:
-            if not df[high_missing_numeric_cols].isnull().all().all():
-                imputer = KNNImputer(n_neighbors=5)
-                scaler = StandardScaler()
-                null_mask = df[high_missing_numeric_cols].isnull()
-                scaled_data = scaler.fit_transform(df[high_missing_numeric_cols])
-                imputed_scaled_data = imputer.fit_transform(scaled_data)
-                df[high_missing_numeric_cols]= scaler.inverse_transform(imputed_scaled_data)
-                # imputed_values = imputer.fit_transform(df[high_missing_numeric_cols])
-                df.loc[:, high_missing_numeric_cols] = df[high_missing_numeric_cols].where(~null_mask, imputed_scaled_data)
+        if self.imputed_columns and not df[self.imputed_columns].isnull().all().all():
+            self.imputer_scaler = StandardScaler()
+            scaled_data = self.imputer_scaler.fit_transform(df[self.imputed_columns])
+            self.numeric_imputer = create_imputer(
+                scaled_data, self.imputation_strategy,
+                time_budget=self.imputation_time_budget, memory_budget=self.imputation_memory_budget
+            )
+            try:
+                self.numeric_imputer.fit(scaled_data)
+            except MemoryError:
+                self.numeric_imputer = MedianStrategy().fit(scaled_data)
+
+        for column in df.columns:
+            if column_dtype[column] == "object":
+                mode_value = stats.mode(column)
+                if mode_value is not None:
+                    self.fill_values[column] = mode_value
+            elif column_dtype[column] in numeric and missing_percentages[column] < 5 and column in stats.numeric.index:
+                moments = stats.numeric.loc[column]
+                if abs(moments['skew']) > 0.5:
+                    # Use median for skewed data
+                    self.fill_values[column] = moments['median']
+                else:
+                    self.fill_values[column] = moments['mean']
+
+        return self.fill_values
+
+    def fill_missing_values(self, df, column_dtype, carry_over=False):
+        """
+        Fill missing values with the statistics fitted by fit_fill_values.
+        With carry_over, datetime columns are forward-filled across successive
+        calls so a streamed dataset is filled as if it were one frame.
+        """
+        if self.numeric_imputer is not None:
+            null_mask = df[self.imputed_columns].isnull()
+            if null_mask.any().any():
+                scaled_data = self.imputer_scaler.transform(df[self.imputed_columns])
+                imputed_data = self.imputer_scaler.inverse_transform(self.numeric_imputer.transform(scaled_data))
+                df[self.imputed_columns] = df[self.imputed_columns].where(~null_mask, imputed_data)
 
         for column in df.columns:
             if column_dtype[column] == "datetime":
-                    df[column] = df[column].fillna(method="ffill").fillna(method="bfill")
-            elif column_dtype[column] == "object":
-                    mode_value = df[column].mode()
-                    if  not mode_value.empty:
-                        df[column] = df[column].fillna(mode_value.iloc[0])
-            elif column_dtype[column] in numeric:
-                if missing_percentages[column] < 5:
-                    # Check skewness
-                    skewness = skew(df[column].dropna())
-                    if abs(skewness) > 0.5:
-                        # Use median for skewed data
-                        df[column] = df[column].fillna(df[column].median())
-                    else:
-                        df[column] = df[column].fillna(df[column].mean())            
-        
-        return df,column_dtype
+                filled = df[column].ffill()
+                if carry_over and column in self._datetime_carry:
+                    filled = filled.fillna(self._datetime_carry[column])
+                filled = filled.bfill()
+                if carry_over and filled.notna().any():
+                    self._datetime_carry[column] = filled.dropna().iloc[-1]
+                df[column] = filled
+            elif column in self.fill_values:
+                df[column] = df[column].fillna(self.fill_values[column])
+
+        return df
     
-    def detect_missing_values(self, df):
+    def detect_missing_values(self, df, stats=None):
         """
-        Detect missing values and return their details.
+        Detect missing values and return their details. stats is df's
+        ColumnStats, computed if not given.
         """
-        for column in df.columns:
-            missing_count = df[column].isnull().sum()
-            if missing_count > 0:
-                missing_indices = df[df[column].isnull()].index.tolist()
-                missing_percentage = (missing_count / len(df)) * 100
-                
-                self.missing_info[column] = {
-                    'total_missing': int(missing_count),
-                    'missing_percentage': round(missing_percentage, 2),
-                    'missing_indices': missing_indices
-                }
+        stats = stats or ColumnStats(df)
+        for column in df.columns[stats.null_counts.to_numpy() > 0]:
+            self.missing_info[column] = {
+                'total_missing': int(stats.null_counts[column]),
+                'missing_percentage': round(stats.missing_percentages[column], 2),
+                'missing_indices': stats.missing_indices(column)
+            }
         
         return self.missing_info
     
@@ -2,10 +2,11 @@ import numpy as np
 import pandas as pd
 
 from sklearn.decomposition import PCA
-from sklearn.cluster import DBSCAN
 from sklearn.preprocessing import StandardScaler
 from sklearn.impute import KNNImputer
 
+from .outlier_detection import create_outlier_detector
+
 class DataImputer:
     def __init__(self, n_neighbors=7):
         self.n_neighbors = n_neighbors
@@ -13,6 +14,8 @@ class DataImputer:
         self.imputer = KNNImputer(n_neighbors=n_neighbors)
 
         self.outlier_report = {}
+        self.outlier_columns = []
+        self.outlier_detector = None
     
     def knn(self, df):
         """
@@ -34,9 +37,15 @@ class DataImputer:
         
         return df_imputed
     
-    def impute_missing_values(self,df: pd.DataFrame, column_dtypes: dict, eps: float = 0.5, min_samples: int = 5, n_components: int = 2) -> pd.DataFrame:
+    def _fit_projection(self, df: pd.DataFrame, numeric_cols: list, n_components: int) -> np.ndarray:
+        # Standardize the numeric columns and apply PCA to reduce dimensions
+        self.outlier_scaler = StandardScaler()
+        self.outlier_pca = PCA(n_components=min(n_components, len(numeric_cols)))
+        return self.outlier_pca.fit_transform(self.outlier_scaler.fit_transform(df[numeric_cols]))
+
+    def impute_missing_values(self,df: pd.DataFrame, column_dtypes: dict, eps: float = 0.5, min_samples: int = 5, n_components: int = 2, backend: str = 'auto') -> pd.DataFrame:
         """
-        Identify and remove outliers from numeric columns using PCA and DBSCAN.
+        Identify and remove outliers from numeric columns using PCA and an outlier detection backend.
 
         Args:
             df: Input DataFrame
@@ -44,6 +53,8 @@ class DataImputer:
             eps: The maximum distance between two samples for one to be considered as in the neighborhood of the other
             min_samples: The number of samples in a neighborhood for a point to be considered as a core point
             n_components: Number of principal components to retain
+            backend: Outlier detection backend ('dbscan', 'dbscan_subsample', 'isolation_forest',
+                'robust_zscore', 'iqr'), or 'auto' to choose by row count
 
         Returns:
             DataFrame with outliers removed
@@ -56,21 +67,15 @@ class DataImputer:
 
             return df
 
-        # Standardize the numeric columns
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(df[numeric_cols])
-
-        # Apply PCA to reduce dimensions
-        pca = PCA(n_components=n_components)
-        X_pca = pca.fit_transform(X_scaled)
+        X_pca = self._fit_projection(df, numeric_cols, n_components)
 
-        # Apply DBSCAN on reduced data
-        dbscan = DBSCAN(eps=eps, min_samples=min_samples)
-        labels = dbscan.fit_predict(X_pca)
+        # Apply the outlier detection backend on reduced data
+        self.outlier_detector = create_outlier_detector(backend, n_rows=len(df), eps=eps, min_samples=min_samples)
+        outlier_mask = self.outlier_detector.fit_predict(X_pca)
 
-        # Remove outliers (points labeled as -1 by DBSCAN)
-        df_clean = df[labels != -1]
-        outlier_indices = df[labels == -1].index.tolist()
+        # Remove outliers
+        df_clean = df[~outlier_mask]
+        outlier_indices = df[outlier_mask].index.tolist()
 
         outliers_removed = len(df) - len(df_clean)
         # print(outliers_removed)
@@ -82,3 +87,51 @@ class DataImputer:
         
         return df_clean
 
+    def fit_outlier_model(self, df: pd.DataFrame, column_dtypes: dict, eps: float = 0.5, min_samples: int = 5, n_components: int = 2, backend: str = 'dbscan', n_rows: int = None) -> None:
+        """
+        Fit the scaler, PCA and outlier backend on a sample so that later chunks
+        can be scored with predict_outliers without fitting on the full dataset.
+        n_rows is the size of the full dataset, used when backend is 'auto'.
+
+        With the DBSCAN backends a point is kept if it lies within eps of one of
+        the sample's core points, which is how DBSCAN admits border points.
+        The sample is sparser than the dataset, so eps is widened by
+        (n_rows / len(df)) ** (1 / d), as SubsampleDBSCANDetector does, to
+        keep the expected number of neighbours per point.
+        """
+        numeric = ['int','float']
+        self.outlier_columns = [col for col in df.columns if column_dtypes[col] in numeric]
+        self.outlier_report = {'outliers_removed': 0, 'outlier_percentage': 0.0, 'outlier_indices': []}
+        self._rows_scored = 0
+        if not self.outlier_columns:
+            return
+
+        X_pca = self._fit_projection(df, self.outlier_columns, n_components)
+        if n_rows and n_rows > len(df):
+            eps *= (n_rows / len(df)) ** (1 / X_pca.shape[1])
+        self.outlier_detector = create_outlier_detector(backend, n_rows=n_rows or len(df), eps=eps, min_samples=min_samples)
+        self.outlier_detector.fit(X_pca)
+
+    def predict_outliers(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Return a boolean outlier mask for rows scored with the fitted model.
+        """
+        if not self.outlier_columns or df.empty:
+            return np.zeros(len(df), dtype=bool)
+
+        X_pca = self.outlier_pca.transform(self.outlier_scaler.transform(df[self.outlier_columns]))
+        return self.outlier_detector.predict(X_pca)
+
+    def remove_outliers(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Remove outliers from a chunk with the model fitted by fit_outlier_model,
+        accumulating the outlier report across chunks.
+        """
+        self._rows_scored += len(df)
+        outlier_mask = self.predict_outliers(df)
+
+        self.outlier_report['outliers_removed'] += int(outlier_mask.sum())
+        self.outlier_report['outlier_percentage'] = self.outlier_report['outliers_removed'] / self._rows_scored * 100
+        self.outlier_report['outlier_indices'].extend(df.index[outlier_mask].tolist())
+
+        return df[~outlier_mask]
@@ -1,16 +1,21 @@
-import pandas as pd
+from utils.storage import iter_dataset_batches
+from utils.dataset_cache import dataset_cache
+from .dtype_optimization import optimize_dtypes
+from .schema import DatasetSchema
 
-def load_and_preprocess_dataset(file_path):
+def load_and_preprocess_dataset(file_path, optimize_memory=True):
     """
-    Load dataset from CSV or Excel, with error handling and basic preprocessing.
+    Load dataset from CSV, Excel or a columnar working copy (Feather/Parquet),
+    with error handling and basic preprocessing. Parsed files are shared
+    through the in-process dataset cache.
+
+    With optimize_memory, numeric columns are downcast and text columns
+    stored as categories or Arrow strings (see dtype_optimization); the
+    per-column savings go to the report's 'memory' entry. The compacted
+    frame is cached with the parsed one.
     """
     try:
-        if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path)
-        elif file_path.endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(file_path)
-        else:
-            raise ValueError("Unsupported file format. Please use CSV or Excel files.")
+        df = dataset_cache.get(file_path)
     except Exception as e:
         raise IOError(f"Error loading file: {e}")
     
@@ -18,5 +23,43 @@ def load_and_preprocess_dataset(file_path):
         'original_shape': list(df.shape),
         'column_indices': {col: idx for idx, col in enumerate(df.columns)},
     }
+    if optimize_memory:
+        compacted, report['memory'] = dataset_cache.derive(file_path, 'optimized', optimize_dtypes)
+        df = compacted.copy(deep=False)
     
-    return df, report
\ No newline at end of file
+    return df, report
+
+
+def infer_dataset_types(file_path, df, data_cleaner, sample_size=None):
+    """
+    data_cleaner.infer_and_validate_column_types(df, sample_size) for a frame
+    returned by load_and_preprocess_dataset(file_path). The typed frame, its
+    schema and the type validation report are cached with the parsed file,
+    so re-running the pipeline on an unchanged upload skips inference.
+    Returns a shallow copy of the typed frame and a copy of the schema.
+    """
+    def infer(_):
+        typed, schema = data_cleaner.infer_and_validate_column_types(df.copy(deep=False), sample_size=sample_size)
+        return typed, schema, data_cleaner.type_validation_report
+
+    key = ('types', sample_size, tuple(str(dtype) for dtype in df.dtypes))
+    typed, schema, validation = dataset_cache.derive(file_path, key, infer)
+    data_cleaner.type_validation_report = dict(validation)
+    return typed.copy(deep=False), DatasetSchema(schema)
+
+
+def iter_dataset_chunks(file_path, chunksize):
+    """
+    Yield a CSV or Arrow dataset in chunks of chunksize rows. The index keeps
+    counting across chunks, so row indices in reports refer to the whole file.
+    """
+    if not file_path.endswith(('.csv', '.feather', '.arrow')):
+        raise ValueError("Streaming mode supports CSV and Arrow files only.")
+    try:
+        batches = iter_dataset_batches(file_path, chunksize)
+        first = next(batches, None)
+    except Exception as e:
+        raise IOError(f"Error loading file: {e}")
+    if first is not None:
+        yield first
+        yield from batches
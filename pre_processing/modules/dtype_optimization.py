@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = pd.StringDtype('pyarrow')
+except ImportError:
+    STRING_DTYPE = None
+
+# Text columns with at most this share of distinct values become 'category'
+CATEGORY_MAX_RATIO = 0.5
+# Narrowest integer width kept; int8/int16 arithmetic wraps on everyday values
+MIN_INT_BITS = 32
+
+
+def _downcast_int(series):
+    """
+    int32 when every value fits, never narrower (see MIN_INT_BITS).
+    """
+    if series.dtype.itemsize * 8 <= MIN_INT_BITS or series.empty:
+        return series
+    info = np.iinfo(np.int32)
+    if series.min() >= info.min and series.max() <= info.max:
+        return series.astype('Int32' if isinstance(series.dtype, pd.api.extensions.ExtensionDtype) else np.int32)
+    return series
+
+
+def _downcast_float(series):
+    """
+    float32 only when every value survives the round trip, so cleaning and
+    model results are unchanged.
+    """
+    values = series.to_numpy()
+    narrowed = values.astype(np.float32)
+    with np.errstate(over='ignore', invalid='ignore'):
+        lossless = np.array_equal(narrowed.astype(values.dtype), values, equal_nan=True)
+    return series.astype(np.float32) if lossless else series
+
+
+def _compact_text(series, category_max_ratio):
+    """
+    Low-cardinality text becomes 'category', other text Arrow strings.
+    Columns holding anything but strings (e.g. strings mixed with numbers)
+    stay object, so type inference still sees the original values.
+    """
+    non_null = series.count()
+    if non_null == 0 or pd.api.types.infer_dtype(series, skipna=True) != 'string':
+        return series
+    if series.nunique(dropna=True) <= category_max_ratio * non_null:
+        return series.astype('category')
+    if STRING_DTYPE is not None:
+        return series.astype(STRING_DTYPE)
+    return series
+
+
+def compact_column(series, category_max_ratio=CATEGORY_MAX_RATIO):
+    """
+    Return the column in the smallest dtype that holds the same values.
+    """
+    if pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return _downcast_int(series)
+    if pd.api.types.is_float_dtype(series):
+        return _downcast_float(series)
+    if series.dtype == object:
+        return _compact_text(series, category_max_ratio)
+    return series
+
+
+def optimize_dtypes(df, category_max_ratio=CATEGORY_MAX_RATIO):
+    """
+    Downcast numeric columns and store text compactly. Returns the compacted
+    DataFrame and a report of per-column memory before and after.
+    """
+    before = df.memory_usage(index=False, deep=True)
+    compacted = pd.DataFrame(
+        {column: compact_column(df[column], category_max_ratio) for column in df.columns},
+        index=df.index
+    )
+    after = compacted.memory_usage(index=False, deep=True)
+
+    report = {
+        'bytes_before': int(before.sum()),
+        'bytes_after': int(after.sum()),
+        'columns': {
+            column: {
+                'dtype_before': str(df[column].dtype),
+                'dtype_after': str(compacted[column].dtype),
+                'bytes_before': int(before[column]),
+                'bytes_after': int(after[column]),
+            }
+            for column in df.columns
+        }
+    }
+    return compacted, report
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+# Mixing constant from the 64-bit golden ratio, as used by boost::hash_combine
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIXED_TYPES = {'mixed', 'mixed-integer', 'mixed-integer-float'}
+
+
+def hash_column(series):
+    """
+    Hash one column into 64-bit values. Mixed-type object columns also hash the
+    Python type of each cell so that 1 and "1" do not collide.
+    """
+    hashes = pd.util.hash_array(series.to_numpy(), categorize=True)
+    if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) in _MIXED_TYPES:
+        type_names = series.map(lambda value: type(value).__name__).to_numpy()
+        hashes = _combine(hashes, pd.util.hash_array(type_names, categorize=True))
+    return hashes
+
+
+def _combine(seed, values):
+    with np.errstate(over='ignore'):
+        return seed ^ (values + _GOLDEN + (seed << np.uint64(6)) + (seed >> np.uint64(2)))
+
+
+def hash_rows(df, subset=None):
+    """
+    Combine per-column hashes positionally into one uint64 hash per row.
+    """
+    columns = list(df.columns) if subset is None else list(subset)
+    row_hashes = np.zeros(len(df), dtype=np.uint64)
+    for column in columns:
+        row_hashes = _combine(row_hashes, hash_column(df[column]))
+    return row_hashes
+
+
+def detect_duplicates(df, subset=None, keep='first', row_hashes=None):
+    """
+    Find duplicate rows with columnar hashing.
+
+    Rows whose hashes match are re-checked on their actual values, so a hash
+    collision can never drop a distinct row.
+
+    Args:
+        df: Input DataFrame
+        subset: Columns to compare, defaults to all columns
+        keep: 'first' or 'last' occurrence to keep, or False to drop every copy
+        row_hashes: Precomputed hash_rows(df, subset), if already available
+
+    Returns:
+        Tuple of boolean arrays (duplicate_mask, drop_mask). duplicate_mask marks
+        every row that belongs to a duplicate group, drop_mask the rows to remove.
+    """
+    columns = list(df.columns) if subset is None else list(subset)
+    duplicate_mask = np.zeros(len(df), dtype=bool)
+    drop_mask = np.zeros(len(df), dtype=bool)
+    if len(df) == 0 or not columns:
+        return duplicate_mask, drop_mask
+
+    if row_hashes is None:
+        row_hashes = hash_rows(df, columns)
+    candidates = pd.Series(row_hashes).duplicated(keep=False).to_numpy()
+    if candidates.any():
+        # Collision check: compare real values, grouped by hash, on candidates only
+        candidate_rows = df.iloc[candidates][columns].reset_index(drop=True)
+        candidate_rows.columns = range(len(columns))
+        candidate_rows['row_hash'] = row_hashes[candidates]
+        duplicate_mask[candidates] = candidate_rows.duplicated(keep=False).to_numpy()
+        drop_mask[candidates] = candidate_rows.duplicated(keep=keep).to_numpy()
+
+    return duplicate_mask, drop_mask
+
+
+class SortedHashRuns:
+    """
+    A set of 64-bit hashes, each with an optional int64 value, kept as a few
+    sorted runs. New hashes form a run of their own and runs of similar size
+    are merged (as in a log-structured merge tree), so adding n hashes in
+    chunks costs O(n log n) overall instead of re-sorting the whole set per
+    chunk, and a lookup is one binary search per run (O(log n) runs).
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(hashes) for hashes, _ in self.runs)
+
+    def lookup(self, hashes):
+        """
+        Return (found, values): whether each hash is in the set and its value
+        (-1 where absent).
+        """
+        found = np.zeros(len(hashes), dtype=bool)
+        values = np.full(len(hashes), -1, dtype=np.int64)
+        for run_hashes, run_values in self.runs:
+            positions = np.minimum(np.searchsorted(run_hashes, hashes), len(run_hashes) - 1)
+            hit = (run_hashes[positions] == hashes) & ~found
+            values[hit] = run_values[positions[hit]]
+            found |= hit
+        return found, values
+
+    def add(self, hashes, values=None):
+        """
+        Add hashes that are not in the set yet, and unique among themselves.
+        """
+        if len(hashes) == 0:
+            return
+        values = np.full(len(hashes), -1, dtype=np.int64) if values is None else np.asarray(values, dtype=np.int64)
+        order = np.argsort(hashes, kind='stable')
+        self.runs.append((hashes[order], values[order]))
+        while len(self.runs) > 1 and len(self.runs[-2][0]) <= 2 * len(self.runs[-1][0]):
+            (left, left_values), (right, right_values) = self.runs.pop(-2), self.runs.pop()
+            merged = np.concatenate([left, right])
+            order = np.argsort(merged, kind='stable')
+            self.runs.append((merged[order], np.concatenate([left_values, right_values])[order]))
+
+
+class RunningDuplicateFilter:
+    """
+    Drop rows already seen in earlier chunks of a streamed dataset.
+
+    Only 64-bit row hashes and the index of their first row are kept (in a
+    SortedHashRuns), so memory grows by 16 bytes per unique row. Duplicates
+    inside a chunk are value-checked like detect_duplicates; across chunks
+    rows are matched on the hash alone.
+
+    duplicate_count counts every row of a duplicate group, the first
+    occurrence included, as the duplicate_mask of detect_duplicates does.
+    """
+
+    def __init__(self, subset=None):
+        self.subset = subset
+        self.seen = SortedHashRuns()
+        self.repeated = SortedHashRuns()
+        self.duplicate_count = 0
+
+    def filter(self, df, duplicate_indices=None):
+        """
+        Return a boolean mask of rows in this chunk that repeat an earlier row.
+        With duplicate_indices (anything with extend()), the indices of rows
+        that joined a duplicate group in this chunk are added to it; a first
+        occurrence is added when its first copy turns up.
+        """
+        row_hashes = hash_rows(df, self.subset)
+        _, drop_mask = detect_duplicates(df, subset=self.subset, keep='first', row_hashes=row_hashes)
+        drop_mask |= self.seen.lookup(row_hashes)[0]
+
+        kept = ~drop_mask
+        self.seen.add(row_hashes[kept], df.index[kept])
+
+        # Groups getting their first copy in this chunk gain their first occurrence as well
+        dropped_hashes = np.unique(row_hashes[drop_mask])
+        new_groups = ~self.repeated.lookup(dropped_hashes)[0]
+        self.repeated.add(dropped_hashes[new_groups])
+        self.duplicate_count += int(drop_mask.sum()) + int(new_groups.sum())
+
+        if duplicate_indices is not None:
+            duplicate_indices.extend(self.seen.lookup(dropped_hashes[new_groups])[1].tolist())
+            duplicate_indices.extend(df.index[drop_mask].tolist())
+        return drop_mask
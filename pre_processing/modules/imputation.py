@@ -0,0 +1,236 @@
+import numpy as np
+
+from sklearn.experimental import enable_iterative_imputer  # noqa: F401
+from sklearn.impute import IterativeImputer, KNNImputer, SimpleImputer
+from sklearn.neighbors import NearestNeighbors
+
+# Rough throughput figures used to turn operation counts into seconds
+NAN_EUCLIDEAN_OPS_PER_SEC = 5e7
+TREE_BUILD_OPS_PER_SEC = 1e8
+TREE_QUERY_OPS_PER_SEC = 1.5e5
+DENSE_OPS_PER_SEC = 1e8
+
+DEFAULT_TIME_BUDGET = 60            # seconds
+DEFAULT_MEMORY_BUDGET = 1024 ** 3   # bytes
+# Ball-tree imputation builds one tree per missing pattern for at most this many patterns
+MAX_TREE_PATTERNS = 32
+
+
+class ImputationStrategy:
+    """
+    Base class for numeric imputation strategies. Strategies work on a float
+    matrix with NaNs; fit learns donors or statistics and transform fills any
+    matrix with the same columns, so a strategy fitted on a sample can fill
+    later chunks.
+    """
+
+    def fit(self, X):
+        raise NotImplementedError
+
+    def transform(self, X):
+        raise NotImplementedError
+
+    def fit_transform(self, X):
+        return self.fit(X).transform(X)
+
+    @staticmethod
+    def estimate_cost(n_rows, n_missing_rows, n_cols, n_patterns=1):
+        """
+        Return the estimated (seconds, bytes) to fit and fill an n_rows x n_cols
+        matrix with n_missing_rows incomplete rows, which have n_patterns
+        distinct sets of missing columns.
+        """
+        raise NotImplementedError
+
+
+class KNNStrategy(ImputationStrategy):
+    """
+    Exact KNN imputation over every row; brute-force nan-euclidean distances.
+    """
+
+    def __init__(self, n_neighbors=5):
+        self.imputer = KNNImputer(n_neighbors=n_neighbors, keep_empty_features=True)
+
+    def fit(self, X):
+        self.imputer.fit(X)
+        return self
+
+    def transform(self, X):
+        return self.imputer.transform(X)
+
+    @staticmethod
+    def estimate_cost(n_rows, n_missing_rows, n_cols, n_patterns=1):
+        seconds = n_missing_rows * n_rows * n_cols / NAN_EUCLIDEAN_OPS_PER_SEC
+        # sklearn computes distances in chunks bounded by its working_memory
+        return seconds, 2 * n_rows * n_cols * 8
+
+
+class SampledKNNStrategy(KNNStrategy):
+    """
+    KNN imputation with neighbours drawn from a random donor pool of at most
+    donor_pool_size rows, which makes the cost linear in the row count.
+    """
+
+    def __init__(self, n_neighbors=5, donor_pool_size=20_000, random_state=42):
+        super().__init__(n_neighbors=n_neighbors)
+        self.donor_pool_size = donor_pool_size
+        self.random_state = random_state
+
+    def fit(self, X):
+        if len(X) > self.donor_pool_size:
+            rng = np.random.default_rng(self.random_state)
+            X = X[rng.choice(len(X), size=self.donor_pool_size, replace=False)]
+        self.imputer.fit(X)
+        return self
+
+    @staticmethod
+    def estimate_cost(n_rows, n_missing_rows, n_cols, n_patterns=1, donor_pool_size=20_000):
+        pool = min(n_rows, donor_pool_size)
+        seconds = n_missing_rows * pool * n_cols / NAN_EUCLIDEAN_OPS_PER_SEC
+        return seconds, 2 * pool * n_cols * 8
+
+
+class BallTreeKNNStrategy(ImputationStrategy):
+    """
+    KNN imputation with ball-tree neighbour search. Donors are the complete
+    rows; incomplete rows are grouped by missing pattern and each group is
+    queried on its observed columns only, with one tree per pattern. fit
+    builds trees for the max_patterns most common patterns of the fitted
+    matrix, and transform reuses them, so filling chunk after chunk builds
+    no new trees. Rows with any other pattern, with nothing observed, or
+    when there are too few complete rows, fall back to column medians.
+    """
+
+    def __init__(self, n_neighbors=5, leaf_size=40, max_patterns=MAX_TREE_PATTERNS):
+        self.n_neighbors = n_neighbors
+        self.leaf_size = leaf_size
+        self.max_patterns = max_patterns
+
+    def fit(self, X):
+        missing = np.isnan(X)
+        complete = ~missing.any(axis=1)
+        self.donors = X[complete]
+        self.medians = SimpleImputer(strategy='median', keep_empty_features=True).fit(X).statistics_
+        self.trees = {}
+        if len(self.donors) < self.n_neighbors or complete.all():
+            return self
+
+        patterns, counts = np.unique(missing[~complete], axis=0, return_counts=True)
+        for pattern in patterns[np.argsort(-counts, kind='stable')[:self.max_patterns]]:
+            observed = ~pattern
+            if observed.any():
+                self.trees[pattern.tobytes()] = NearestNeighbors(
+                    n_neighbors=self.n_neighbors, algorithm='ball_tree', leaf_size=self.leaf_size
+                ).fit(self.donors[:, observed])
+        return self
+
+    def transform(self, X):
+        X = X.copy()
+        missing = np.isnan(X)
+        incomplete = np.flatnonzero(missing.any(axis=1))
+        if not len(incomplete):
+            return X
+
+        patterns, pattern_ids = np.unique(missing[incomplete], axis=0, return_inverse=True)
+        for pattern_id, pattern in enumerate(patterns):
+            rows = incomplete[pattern_ids.ravel() == pattern_id]
+            tree = self.trees.get(pattern.tobytes())
+            if tree is None:
+                X[np.ix_(rows, pattern)] = self.medians[pattern]
+                continue
+            _, neighbors = tree.kneighbors(X[np.ix_(rows, ~pattern)])
+            X[np.ix_(rows, pattern)] = self.donors[:, pattern][neighbors].mean(axis=1)
+        return X
+
+    @staticmethod
+    def estimate_cost(n_rows, n_missing_rows, n_cols, n_patterns=1, max_patterns=MAX_TREE_PATTERNS):
+        # One tree over the complete rows per pattern, then one query per incomplete row
+        log_n = np.log2(max(n_rows, 2))
+        trees = min(n_patterns, max_patterns)
+        seconds = (trees * (n_rows - n_missing_rows) * log_n * n_cols / TREE_BUILD_OPS_PER_SEC
+                   + n_missing_rows * log_n * n_cols / TREE_QUERY_OPS_PER_SEC)
+        return seconds, 2 * n_rows * n_cols * 8
+
+
+class IterativeStrategy(ImputationStrategy):
+    """
+    Round-robin regression of each column on the others (IterativeImputer).
+    """
+
+    def __init__(self, max_iter=10, random_state=42):
+        self.imputer = IterativeImputer(max_iter=max_iter, random_state=random_state,
+                                        keep_empty_features=True)
+        self.max_iter = max_iter
+
+    def fit(self, X):
+        self.imputer.fit(X)
+        return self
+
+    def transform(self, X):
+        return self.imputer.transform(X)
+
+    @staticmethod
+    def estimate_cost(n_rows, n_missing_rows, n_cols, n_patterns=1, max_iter=10):
+        seconds = max_iter * n_cols * n_rows * n_cols / DENSE_OPS_PER_SEC
+        return seconds, 4 * n_rows * n_cols * 8
+
+
+class MedianStrategy(ImputationStrategy):
+    """
+    Column medians; the fallback that always fits the budget.
+    """
+
+    def __init__(self):
+        self.imputer = SimpleImputer(strategy='median', keep_empty_features=True)
+
+    def fit(self, X):
+        self.imputer.fit(X)
+        return self
+
+    def transform(self, X):
+        return self.imputer.transform(X)
+
+    @staticmethod
+    def estimate_cost(n_rows, n_missing_rows, n_cols, n_patterns=1):
+        return n_rows * n_cols / DENSE_OPS_PER_SEC, n_rows * n_cols * 8
+
+
+# Ordered from most to least accurate; 'auto' takes the first that fits the budget
+IMPUTATION_STRATEGIES = {
+    'knn': KNNStrategy,
+    'knn_sampled': SampledKNNStrategy,
+    'ball_tree': BallTreeKNNStrategy,
+    'iterative': IterativeStrategy,
+    'median': MedianStrategy,
+}
+
+
+def select_imputation_strategy(n_rows, n_missing_rows, n_cols,
+                               time_budget=DEFAULT_TIME_BUDGET, memory_budget=DEFAULT_MEMORY_BUDGET, n_patterns=1):
+    """
+    Return the name of the most accurate strategy whose estimated time and
+    memory fit the budgets.
+    """
+    for name, strategy in IMPUTATION_STRATEGIES.items():
+        seconds, memory = strategy.estimate_cost(n_rows, n_missing_rows, n_cols, n_patterns)
+        if seconds <= time_budget and memory <= memory_budget:
+            return name
+    return 'median'
+
+
+def create_imputer(X, strategy='auto', time_budget=DEFAULT_TIME_BUDGET,
+                   memory_budget=DEFAULT_MEMORY_BUDGET, n_neighbors=5):
+    """
+    Build an unfitted imputation strategy for X by name, or pick one with 'auto'.
+    """
+    if strategy == 'auto':
+        missing = np.isnan(X)
+        incomplete = missing.any(axis=1)
+        n_patterns = len(np.unique(missing[incomplete], axis=0)) if incomplete.any() else 0
+        strategy = select_imputation_strategy(len(X), int(incomplete.sum()), X.shape[1], time_budget, memory_budget,
+                                              n_patterns=n_patterns)
+    if strategy not in IMPUTATION_STRATEGIES:
+        raise ValueError(f"Unknown imputation strategy '{strategy}'. Choose from: {', '.join(IMPUTATION_STRATEGIES)}")
+    if strategy in ('knn', 'knn_sampled', 'ball_tree'):
+        return IMPUTATION_STRATEGIES[strategy](n_neighbors=n_neighbors)
+    return IMPUTATION_STRATEGIES[strategy]()
@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .pre_processing_utils import convert_to_serializable, no_progress
+
+DEFAULT_METRICS_DIR = os.environ.get('DATADOME_METRICS_DIR', os.path.join('output', 'metrics'))
+# tracemalloc slows down allocation-heavy Python code, so it is opt-in
+TRACE_MEMORY = os.environ.get('DATADOME_TRACE_MEMORY', '0') == '1'
+# How often the resident set size is sampled during a stage
+RSS_SAMPLE_INTERVAL = float(os.environ.get('DATADOME_RSS_SAMPLE_INTERVAL', '0.05'))
+
+
+def _rss_bytes():
+    return psutil.Process().memory_info().rss if psutil else None
+
+
+def _process_peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class _RssSampler:
+    """
+    Samples the resident set size on a background thread and keeps the
+    largest value, giving a stage its own peak rather than the process's.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = _rss_bytes()
+        self._stop = threading.Event()
+        self._thread = None
+        if self.peak is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def stop(self):
+        if self._thread is None:
+            return None
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+        return self.peak
+
+
+class StageProfiler:
+    """
+    Records wall time, CPU time, memory and rows in/out for each pipeline
+    stage. Entering a stage also reports it to the progress callback, so a
+    stage boundary is declared once.
+
+    Memory is the change in resident set size over the stage and its peak
+    RSS, sampled every RSS_SAMPLE_INTERVAL seconds (both need psutil), and
+    the process's lifetime peak RSS at the end of the stage; with
+    trace_memory, also the peak of Python-tracked allocations above the
+    stage's starting point. CPU time covers all threads of this process, not
+    worker processes.
+    """
+
+    def __init__(self, progress=None, trace_memory=TRACE_MEMORY, registry=None):
+        self.progress = progress or no_progress
+        self.trace_memory = trace_memory
+        self.registry = registry if registry is not None else metrics_registry
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, fraction=None, rows_in=None):
+        """
+        Time the enclosed block. Yields the stage record; set its 'rows_out'
+        (and 'rows_in' if unknown up front) inside the block.
+        """
+        self.progress(name, fraction)
+        record = {'stage': name, 'rows_in': rows_in, 'rows_out': None}
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            traced_start = tracemalloc.get_traced_memory()[0]
+        rss_start = _rss_bytes()
+        sampler = _RssSampler()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = time.perf_counter() - wall_start
+            record['cpu_seconds'] = time.process_time() - cpu_start
+            record['stage_peak_rss_bytes'] = sampler.stop()
+            rss_end = _rss_bytes()
+            record['rss_delta_bytes'] = rss_end - rss_start if rss_end is not None else None
+            record['process_peak_rss_bytes'] = _process_peak_rss_bytes()
+            if self.trace_memory:
+                record['traced_peak_delta_bytes'] = tracemalloc.get_traced_memory()[1] - traced_start
+            if started_tracing:
+                tracemalloc.stop()
+            self.stages.append(record)
+            self.registry.observe(record)
+
+    def report(self):
+        """
+        The 'performance' section of the profiling report.
+        """
+        peaks = [record['stage_peak_rss_bytes'] for record in self.stages
+                 if record['stage_peak_rss_bytes'] is not None]
+        return {
+            'stages': self.stages,
+            'total_wall_seconds': sum(record['wall_seconds'] for record in self.stages),
+            'total_cpu_seconds': sum(record['cpu_seconds'] for record in self.stages),
+            'peak_rss_bytes': max(peaks) if peaks else None,
+            'process_peak_rss_bytes': _process_peak_rss_bytes(),
+        }
+
+
+def add_performance_section(profiling_report_path, performance):
+    """
+    Add the stage instrumentation to the report file once every stage,
+    including those that rewrite the file themselves, has finished.
+    """
+    with open(profiling_report_path) as f:
+        report = json.load(f)
+    report['performance'] = performance
+    with open(profiling_report_path, 'w') as f:
+        json.dump(report, f, indent=4, default=convert_to_serializable)
+
+
+class MetricsRegistry:
+    """
+    Cumulative per-stage counters for Prometheus-style export.
+
+    The pipeline often runs in job worker processes, so each observation is
+    added to a single store, metrics_dir/METRICS_FILE, under an exclusive
+    file lock, and render() reads the totals of all processes from there.
+    Without a metrics_dir the totals are kept in memory for this process.
+    """
+
+    METRICS_FILE = 'stage_totals.json'
+    COUNTERS = {
+        'runs': ('datadome_stage_runs_total', 'Completed runs of a pipeline stage.'),
+        'wall_seconds': ('datadome_stage_wall_seconds_total', 'Wall-clock seconds spent in a stage.'),
+        'cpu_seconds': ('datadome_stage_cpu_seconds_total', 'CPU seconds spent in a stage.'),
+        'rows_in': ('datadome_stage_rows_in_total', 'Rows entering a stage.'),
+        'rows_out': ('datadome_stage_rows_out_total', 'Rows leaving a stage.'),
+    }
+    GAUGES = {
+        'max_rss_delta_bytes': ('datadome_stage_max_rss_delta_bytes', 'Largest RSS growth seen during a stage.'),
+        'max_peak_rss_bytes': ('datadome_stage_max_peak_rss_bytes', 'Largest RSS sampled during a stage.'),
+    }
+
+    def __init__(self, metrics_dir=DEFAULT_METRICS_DIR):
+        self.metrics_dir = metrics_dir
+        self.totals = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _add(totals, record):
+        stage_totals = totals.setdefault(record['stage'], {name: 0 for name in MetricsRegistry.COUNTERS})
+        stage_totals['runs'] += 1
+        for name in ('wall_seconds', 'cpu_seconds', 'rows_in', 'rows_out'):
+            stage_totals[name] += record.get(name) or 0
+        for gauge, field in (('max_rss_delta_bytes', 'rss_delta_bytes'), ('max_peak_rss_bytes', 'stage_peak_rss_bytes')):
+            if record.get(field) is not None:
+                stage_totals[gauge] = max(stage_totals.get(gauge, 0), record[field])
+
+    @contextmanager
+    def _locked_store(self):
+        """
+        Yields the path of the shared store while holding its lock.
+        """
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        path = os.path.join(self.metrics_dir, self.METRICS_FILE)
+        with open(path + '.lock', 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield path
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def observe(self, record):
+        with self._lock:
+            if not self.metrics_dir:
+                self._add(self.totals, record)
+                return
+            try:
+                with self._locked_store() as path:
+                    totals = self._read(path)
+                    self._add(totals, record)
+                    fd, tmp_path = tempfile.mkstemp(dir=self.metrics_dir, prefix='.tmp-')
+                    with os.fdopen(fd, 'w') as f:
+                        json.dump(totals, f)
+                    os.replace(tmp_path, path)
+            except OSError:
+                self._add(self.totals, record)
+
+    def _all_totals(self):
+        if not self.metrics_dir:
+            return self.totals
+        try:
+            with self._locked_store() as path:
+                return self._read(path)
+        except OSError:
+            return self.totals
+
+    def render(self):
+        """
+        Prometheus text exposition of the stage metrics of all processes.
+        """
+        totals = self._all_totals()
+        lines = []
+        for kind, metrics in (('counter', self.COUNTERS), ('gauge', self.GAUGES)):
+            for name, (metric, help_text) in metrics.items():
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} {kind}")
+                for stage in sorted(totals):
+                    if name in totals[stage]:
+                        lines.append(f'{metric}{{stage="{stage}"}} {totals[stage][name]}')
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,173 @@
+import numpy as np
+
+from sklearn.cluster import DBSCAN
+from sklearn.ensemble import IsolationForest
+from sklearn.neighbors import NearestNeighbors
+
+# Row-count thresholds used by backend='auto'
+DBSCAN_MAX_ROWS = 50_000
+SUBSAMPLE_MAX_ROWS = 1_000_000
+
+
+class OutlierDetector:
+    """
+    Base class for outlier detection backends. predict returns a boolean mask
+    where True marks an outlier.
+    """
+
+    def fit(self, X):
+        raise NotImplementedError
+
+    def predict(self, X):
+        raise NotImplementedError
+
+    def fit_predict(self, X):
+        return self.fit(X).predict(X)
+
+
+class DBSCANDetector(OutlierDetector):
+    """
+    DBSCAN on the full matrix; points labelled as noise are outliers. New points
+    are scored by their distance to the nearest core point.
+    """
+
+    def __init__(self, eps=0.5, min_samples=5):
+        self.eps = eps
+        self.min_samples = min_samples
+        self.fit_eps = eps
+        self.core_neighbors = None
+
+    def _fit_dbscan(self, X, eps):
+        dbscan = DBSCAN(eps=eps, min_samples=self.min_samples).fit(X)
+        core_points = X[dbscan.core_sample_indices_]
+        self.core_neighbors = NearestNeighbors(n_neighbors=1).fit(core_points) if len(core_points) else None
+        self.fit_eps = eps
+        return dbscan.labels_
+
+    def fit(self, X):
+        self._fit_dbscan(X, self.eps)
+        return self
+
+    def predict(self, X):
+        if self.core_neighbors is None:
+            return np.ones(len(X), dtype=bool)
+        # A point within eps of a core point is a border point of that cluster
+        distances, _ = self.core_neighbors.kneighbors(X)
+        return distances[:, 0] > self.fit_eps
+
+    def fit_predict(self, X):
+        return self._fit_dbscan(X, self.eps) == -1
+
+
+class SubsampleDBSCANDetector(DBSCANDetector):
+    """
+    DBSCAN fitted on a random subsample; all points are then assigned by their
+    nearest core point, which keeps neighbourhood queries bounded by sample_size.
+
+    eps is widened by (n / sample_size) ** (1 / d) so the subsample sees the
+    same expected number of neighbours per core point as the full data would.
+    """
+
+    def __init__(self, eps=0.5, min_samples=5, sample_size=20_000, random_state=42):
+        super().__init__(eps=eps, min_samples=min_samples)
+        self.sample_size = sample_size
+        self.random_state = random_state
+
+    def fit(self, X):
+        if len(X) <= self.sample_size:
+            self._fit_dbscan(X, self.eps)
+            return self
+
+        rng = np.random.default_rng(self.random_state)
+        sample = X[rng.choice(len(X), size=self.sample_size, replace=False)]
+        scale = (len(X) / self.sample_size) ** (1 / X.shape[1])
+        self._fit_dbscan(sample, self.eps * scale)
+        return self
+
+    def fit_predict(self, X):
+        return self.fit(X).predict(X)
+
+
+class IsolationForestDetector(OutlierDetector):
+    """
+    IsolationForest; linear in the number of rows and parallel over trees.
+    contamination is the expected outlier share ('auto' tends to flag far more
+    rows than DBSCAN would on well-clustered data).
+    """
+
+    def __init__(self, contamination=0.01, n_estimators=100, n_jobs=-1, random_state=42):
+        self.model = IsolationForest(contamination=contamination, n_estimators=n_estimators,
+                                     n_jobs=n_jobs, random_state=random_state)
+
+    def fit(self, X):
+        self.model.fit(X)
+        return self
+
+    def predict(self, X):
+        return self.model.predict(X) == -1
+
+
+class RobustZScoreDetector(OutlierDetector):
+    """
+    Per-column robust statistics: the modified z-score (median/MAD) or Tukey's
+    IQR fences. A row is an outlier if any column falls outside. Single pass,
+    no distance computations.
+    """
+
+    def __init__(self, method='zscore', threshold=3.5, iqr_factor=1.5):
+        if method not in ('zscore', 'iqr'):
+            raise ValueError("method must be 'zscore' or 'iqr'")
+        self.method = method
+        self.threshold = threshold
+        self.iqr_factor = iqr_factor
+
+    def fit(self, X):
+        if self.method == 'zscore':
+            median = np.median(X, axis=0)
+            mad = np.median(np.abs(X - median), axis=0)
+            # 0.6745 makes the MAD consistent with the standard deviation
+            half_width = self.threshold * np.where(mad > 0, mad, np.finfo(float).eps) / 0.6745
+            self.lower, self.upper = median - half_width, median + half_width
+        else:
+            q1, q3 = np.percentile(X, [25, 75], axis=0)
+            spread = self.iqr_factor * (q3 - q1)
+            self.lower, self.upper = q1 - spread, q3 + spread
+        return self
+
+    def predict(self, X):
+        return ((X < self.lower) | (X > self.upper)).any(axis=1)
+
+
+OUTLIER_BACKENDS = {
+    'dbscan': DBSCANDetector,
+    'dbscan_subsample': SubsampleDBSCANDetector,
+    'isolation_forest': IsolationForestDetector,
+    'robust_zscore': lambda **params: RobustZScoreDetector(method='zscore', **params),
+    'iqr': lambda **params: RobustZScoreDetector(method='iqr', **params),
+}
+
+
+def select_outlier_backend(n_rows):
+    """
+    Pick a backend by row count: exact DBSCAN while it is affordable, then
+    subsample DBSCAN, then the robust z-score fast path.
+    """
+    if n_rows <= DBSCAN_MAX_ROWS:
+        return 'dbscan'
+    if n_rows <= SUBSAMPLE_MAX_ROWS:
+        return 'dbscan_subsample'
+    return 'robust_zscore'
+
+
+def create_outlier_detector(backend='auto', n_rows=None, eps=0.5, min_samples=5, **params):
+    """
+    Build an outlier detector by name. backend='auto' chooses from n_rows;
+    eps and min_samples only apply to the DBSCAN backends.
+    """
+    if backend == 'auto':
+        backend = select_outlier_backend(n_rows or 0)
+    if backend not in OUTLIER_BACKENDS:
+        raise ValueError(f"Unknown outlier backend '{backend}'. Choose from: {', '.join(OUTLIER_BACKENDS)}")
+    if backend.startswith('dbscan'):
+        params.update(eps=eps, min_samples=min_samples)
+    return OUTLIER_BACKENDS[backend](**params)
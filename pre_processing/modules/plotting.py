@@ -0,0 +1,156 @@
+import os
+import hashlib
+import tempfile
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cbook import boxplot_stats
+from scipy.stats import gaussian_kde
+
+# Above these sizes series are binned or decimated, so render time does not
+# grow with the test set
+MAX_SCATTER_POINTS = 5_000
+MAX_LINE_POINTS = 1_000
+MAX_MARKER_POINTS = 200
+MAX_KDE_POINTS = 2_000
+MAX_FLIERS = 200
+HIST_BINS = 30
+HEXBIN_GRIDSIZE = 60
+FIGURE_DPI = 80
+
+
+def lttb(y, n_out):
+    """
+    Largest-Triangle-Three-Buckets decimation of y (at x = 0..n-1) to n_out
+    points. Returns the indices of the kept points, which preserve peaks and
+    the visual shape of the line.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket is the third corner of the triangle
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        next_x, next_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        kept[i + 1] = previous
+    return kept
+
+
+def _subsample(values, n, seed=0):
+    if len(values) <= n:
+        return values
+    return np.random.default_rng(seed).choice(values, n, replace=False)
+
+
+def plot_actual_vs_predicted(ax, yt, yp, title):
+    if len(yt) > MAX_SCATTER_POINTS:
+        image = ax.hexbin(yt, yp, gridsize=HEXBIN_GRIDSIZE, bins='log', mincnt=1, cmap='viridis')
+        ax.figure.colorbar(image, ax=ax, label='Points per bin (log)')
+    else:
+        ax.scatter(yt, yp, alpha=0.7, s=16, edgecolors='white', linewidths=0.5)
+    ax.plot([yt.min(), yt.max()], [yt.min(), yt.max()], 'r', linestyle='--')
+    ax.set_xlabel("Actual Values")
+    ax.set_ylabel("Predicted Values")
+    ax.set_title(f"{title} - Actual vs Predicted Values")
+
+
+def plot_residual_histogram(ax, residuals, title):
+    counts, edges = np.histogram(residuals, bins=HIST_BINS)
+    ax.stairs(counts, edges, fill=True, color='blue', alpha=0.7)
+    sample = _subsample(residuals, MAX_KDE_POINTS)
+    if len(sample) > 1 and np.ptp(sample) > 0:
+        grid = np.linspace(edges[0], edges[-1], 200)
+        density = gaussian_kde(sample)(grid)
+        ax.plot(grid, density * len(residuals) * (edges[1] - edges[0]), color='blue')
+    ax.set_xlabel("Residuals")
+    ax.set_ylabel("Count")
+    ax.set_title(f"{title} - Residuals Distribution")
+
+
+def plot_residual_box(ax, residuals, title):
+    stats = boxplot_stats(residuals)[0]
+    # Keep the most extreme fliers only; all of them would be drawn one by one
+    fliers = stats['fliers']
+    if len(fliers) > MAX_FLIERS:
+        order = np.argsort(np.abs(fliers - stats['med']))
+        stats['fliers'] = fliers[order[-MAX_FLIERS:]]
+    ax.bxp([stats], vert=True, showfliers=True)
+    ax.set_xticks([])
+    ax.set_title(f"{title} - Boxplot of Residuals")
+
+
+def plot_lines(ax, yt, yp, title):
+    markers = len(yt) <= MAX_MARKER_POINTS
+    for values, label, marker in ((yt, 'Actual', 'o'), (yp, 'Predicted', 's')):
+        kept = lttb(values, MAX_LINE_POINTS)
+        ax.plot(kept, values[kept], label=label, marker=marker if markers else None, markersize=4)
+    ax.set_xlabel("Sample Index")
+    ax.set_ylabel("Values")
+    ax.set_title(f"{title} - Actual vs Predicted Line Plot")
+    ax.legend()
+
+
+def run_id(*series):
+    """
+    Content hash of the plotted series, used to cache rendered images.
+    """
+    digest = hashlib.sha256()
+    for values in series:
+        digest.update(np.ascontiguousarray(values, dtype=float).tobytes())
+        digest.update(b'|')
+    return digest.hexdigest()[:32]
+
+
+def render_results(panels, save_path, run_key=None, cache_dir=None):
+    """
+    Draw the 4x2 comparison figure for panels, a list of
+    (y_true, y_pred, title), and write it to save_path.
+
+    Rendering uses a standalone Agg figure, so it is safe in worker threads
+    and processes. Images are cached in cache_dir (default: a 'plots' folder
+    next to save_path) by run_key, which defaults to a hash of the data.
+    """
+    panels = [(np.asarray(yt, dtype=float).ravel(), np.asarray(yp, dtype=float).ravel(), title)
+              for yt, yp, title in panels]
+    run_key = run_key or run_id(*(values for yt, yp, _ in panels for values in (yt, yp)))
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(save_path)), 'plots')
+    extension = os.path.splitext(save_path)[1] or '.jpeg'
+    cached_path = os.path.join(cache_dir, f"{run_key}{extension}")
+
+    if not os.path.exists(cached_path):
+        figure = Figure(figsize=(20, 20), dpi=FIGURE_DPI)
+        FigureCanvasAgg(figure)
+        axes = figure.subplots(4, 2).flatten()
+        for i, (yt, yp, title) in enumerate(panels):
+            residuals = yt - yp
+            plot_actual_vs_predicted(axes[i], yt, yp, title)
+            plot_residual_histogram(axes[i + 2], residuals, title)
+            plot_residual_box(axes[i + 4], residuals, title)
+            plot_lines(axes[i + 6], yt, yp, title)
+        figure.tight_layout()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.tmp-', suffix=extension)
+        os.close(fd)
+        figure.savefig(tmp_path)
+        os.replace(tmp_path, cached_path)
+
+    if os.path.abspath(cached_path) != os.path.abspath(save_path):
+        with open(cached_path, 'rb') as src, open(save_path, 'wb') as dst:
+            dst.write(src.read())
+    return save_path
@@ -1,6 +1,11 @@
+import warnings
+
 import numpy as np
 import pandas as pd
-import re
+
+NUMERIC_PATTERN = r'([-+]?(?:\d*\.\d+|\d+))'
+BOOL_MAP = {'true': True, 'false': False, '1': True, '0': False}
+DATETIME_PROBE_SIZE = 100
 
 def convert_to_serializable(obj):
     """
@@ -14,31 +19,166 @@ def convert_to_serializable(obj):
         return obj.tolist()
     return obj
 
-def infer_column_type(series):
-    def extract_numeric(value):
-        if pd.isna(value):
-            return np.nan
-        if isinstance(value, (int, float)):
-            return value
-        
-        match = re.search(r'[-+]?(?:\d*\.\d+|\d+)', str(value))
-        return float(match.group()) if match else np.nan
-
-    series = series.astype(str).str.strip()
-    
-    bool_map = {'true': True, 'false': False, '1': True, '0': False}
-    boolean_values = series.str.lower().map(bool_map)
+def no_progress(stage, fraction=None):
+    """
+    Default progress callback for the pipeline; progress(stage, fraction) is
+    called as each stage starts, with fraction the share of work done so far.
+    """
+
+
+def _as_text(series):
+    """
+    Cast values to stripped strings while keeping missing values missing.
+    """
+    if isinstance(series.dtype, (pd.CategoricalDtype, pd.StringDtype)):
+        series = series.astype(object)
+    return series.where(series.isna(), series.astype(str)).str.strip()
+
+
+def _parses_as_datetime(text):
+    """
+    Probe a small head of the column first so free text exits early instead of
+    falling back to per-element dateutil parsing over the whole column.
+    """
+    values = text.dropna()
+    if values.empty:
+        return False
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        if pd.to_datetime(values.iloc[:DATETIME_PROBE_SIZE], errors='coerce').isna().any():
+            return False
+        return bool(pd.to_datetime(values, errors='coerce').notna().all())
+
+
+def _as_float(series):
+    # Keep float32 columns from the dtype optimization stage as they are
+    return series if pd.api.types.is_float_dtype(series) else series.astype(float)
+
+
+def _as_int(values):
+    return values if pd.api.types.is_integer_dtype(values) else values.astype(int)
+
+
+def _keep_compact(original, converted):
+    """
+    Text results go back into the compact dtype the column was loaded with.
+    """
+    if converted.dtype == object:
+        if isinstance(original.dtype, pd.CategoricalDtype):
+            return converted.astype('category')
+        if isinstance(original.dtype, pd.StringDtype):
+            return converted.astype(original.dtype)
+    return converted
+
+
+def _classify_numeric(numeric_values, fallback):
+    if len(numeric_values) and numeric_values.notna().any():
+        if numeric_values.nunique() / len(numeric_values) > 0.2:
+            if (numeric_values % 1 == 0).all():
+                return _as_int(numeric_values), 'int'
+            return numeric_values, 'float'
+        return numeric_values, 'object'
+    return fallback, 'object'
+
+
+def _probe(series):
+    """
+    Run the boolean, datetime and numeric probes over one column with
+    vectorized string operations and return (converted_series, column_type).
+    """
+    if pd.api.types.is_bool_dtype(series):
+        return series, 'boolean'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, 'datetime'
+    if pd.api.types.is_numeric_dtype(series):
+        if pd.api.types.is_integer_dtype(series) and series.isin([0, 1]).all():
+            return series.astype(bool), 'boolean'
+        return _classify_numeric(series if pd.api.types.is_integer_dtype(series) else _as_float(series), series)
+
+    text = _as_text(series)
+    boolean_values = text.str.lower().map(BOOL_MAP)
     if boolean_values.notna().all():
         return boolean_values, 'boolean'
-    
-    numeric_values = series.apply(extract_numeric)
-    if numeric_values.notna().any():
-        if numeric_values.nunique() / len(series) > 0.2:
-            if numeric_values.apply(float.is_integer).all():
-                return numeric_values.astype(int), 'int'
-            else:
-                return numeric_values, 'float'
-        else:
-            return numeric_values, 'object'
-    
-    return series, 'object'
\ No newline at end of file
+
+    numeric_text = text.str.extract(NUMERIC_PATTERN, expand=False)
+    numeric_values = pd.to_numeric(numeric_text, errors='coerce')
+    plain_numbers = (numeric_text == text)[text.notna()].all()
+    if not plain_numbers and _parses_as_datetime(text):
+        return series, 'datetime'
+
+    return _classify_numeric(numeric_values, text)
+
+
+def _numeric_and_text(series):
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return _as_float(series), series
+    text = _as_text(series)
+    return pd.to_numeric(text.str.extract(NUMERIC_PATTERN, expand=False), errors='coerce'), text
+
+
+def _as_boolean(series, text):
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_numeric_dtype(series):
+        return series.map({1: True, 0: False})
+    return text.str.lower().map(BOOL_MAP)
+
+
+def convert_column(series, column_type):
+    """
+    Convert a column to an already inferred type without re-running inference.
+    Returns None when the values do not fit the type.
+    """
+    if column_type == 'datetime':
+        return series
+    numeric_values, text = _numeric_and_text(series)
+
+    if column_type == 'boolean':
+        boolean_values = _as_boolean(series, text)
+        return boolean_values if boolean_values.notna().all() else None
+    if column_type == 'int':
+        if numeric_values.notna().all() and (numeric_values % 1 == 0).all():
+            return _as_int(numeric_values)
+        return None
+    if column_type == 'float':
+        return numeric_values if numeric_values.notna().any() else None
+    return numeric_values if numeric_values.notna().any() else text
+
+
+def coerce_column(series, column_type, numeric_codes=False):
+    """
+    Coerce a chunk of a column to a fitted type; values that do not fit become NaN.
+    numeric_codes marks 'object' columns that held numeric codes when fitted.
+    """
+    if column_type == 'datetime':
+        return series
+    numeric_values, text = _numeric_and_text(series)
+
+    if column_type == 'boolean':
+        return _as_boolean(series, text)
+    if column_type == 'int':
+        if numeric_values.notna().all() and (numeric_values % 1 == 0).all():
+            return _as_int(numeric_values)
+        return numeric_values
+    if column_type == 'float' or numeric_codes:
+        return numeric_values
+    return text
+
+
+def infer_column_type(series, sample_size=None, random_state=42):
+    """
+    Infer the type of a column and return (converted_series, column_type).
+
+    With sample_size set, the type is decided on a bounded random sample and
+    the whole column is then converted once; if the full column does not fit
+    the sampled type it is re-probed in full.
+    """
+    if sample_size is None or len(series) <= sample_size:
+        converted, column_type = _probe(series)
+        return _keep_compact(series, converted), column_type
+
+    _, column_type = _probe(series.sample(n=sample_size, random_state=random_state))
+    converted = convert_column(series, column_type)
+    if converted is None:
+        converted, column_type = _probe(series)
+    return _keep_compact(series, converted), column_type
@@ -1,17 +1,31 @@
+from pre_processing.modules.column_stats import ColumnStats
+
+
 class ReportGenerator:
-    def generate_profiling_report(self, original_df, processed_df, data_cleaner, data_imputer):
+    def generate_profiling_report(self, original_df, processed_df, data_cleaner, data_imputer, column_stats=None):
         """
-        Generate comprehensive profiling report.
+        Generate comprehensive profiling report. column_stats is processed_df's
+        ColumnStats, computed if not given.
+        """
+        return self.build_report(original_df.shape, list(original_df.columns), processed_df.shape,
+                                 data_cleaner, data_imputer, column_stats=column_stats or ColumnStats(processed_df))
+
+    def build_report(self, original_shape, column_names, processed_shape, data_cleaner, data_imputer,
+                     column_stats=None):
+        """
+        Generate the profiling report from shapes alone, for datasets that were
+        streamed and never held in memory as a whole. With column_stats (the
+        processed frame's ColumnStats) the report gains per-column statistics.
         """
         report = {
             'original_dataset': {
-                'total_rows': int(original_df.shape[0]),
-                'total_columns': int(original_df.shape[1]),
-                'column_names': list(original_df.columns)
+                'total_rows': int(original_shape[0]),
+                'total_columns': int(original_shape[1]),
+                'column_names': list(column_names)
             },
             'processed_dataset': {
-                'total_rows': int(processed_df.shape[0]),
-                'total_columns': int(processed_df.shape[1])
+                'total_rows': int(processed_shape[0]),
+                'total_columns': int(processed_shape[1])
             },
             'duplicates': {
                 'duplicate_count': len(data_cleaner.duplicate_indices),
@@ -22,4 +36,6 @@ class ReportGenerator:
         
         report['type_validation'] = data_cleaner.type_validation_report
         report['outlier_detection'] = data_imputer.outlier_report
+        if column_stats is not None:
+            report['column_statistics'] = column_stats.summary()
         return report
\ No newline at end of file
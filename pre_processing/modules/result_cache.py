@@ -0,0 +1,141 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+import pandas as pd
+
+from .schema import DatasetSchema
+
+DEFAULT_CACHE_DIR = os.path.join('output', 'cache')
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+MAX_REMEMBERED_DIGESTS = 256
+
+_digests = {}
+
+
+def file_digest(file_path, block_size=1 << 20):
+    """
+    SHA-256 of a file's contents, read in blocks. Digests are remembered per
+    path, modification time and size, so an unchanged file is hashed once.
+    """
+    stat = os.stat(file_path)
+    version = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    if version in _digests:
+        return _digests[version]
+
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    _digests[version] = digest.hexdigest()
+    while len(_digests) > MAX_REMEMBERED_DIGESTS:
+        _digests.pop(next(iter(_digests)))
+    return _digests[version]
+
+
+class CleanedDatasetCache:
+    """
+    On-disk, content-addressed cache of cleaned datasets.
+
+    Entries are keyed by the input file's content hash plus the pipeline
+    parameters, and hold the cleaned DataFrame as Parquet, its schema and the
+    profiling report. The least recently used entries are evicted once the
+    cache exceeds max_entries or max_bytes. cache_dir is created by the
+    first put.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def key(self, file_path, params):
+        """
+        Cache key from the file's content hash and the pipeline parameters.
+        Parameters that name files (such as a rule file) are keyed by content.
+        """
+        keyed_params = {
+            name: file_digest(value) if name.endswith('_path') and value and os.path.exists(value) else value
+            for name, value in sorted(params.items())
+        }
+        payload = json.dumps({'data': file_digest(file_path), 'params': keyed_params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        """
+        Return (df, profiling_report, schema) for a key, or None on a miss.
+        """
+        entry_dir = self._entry_dir(key)
+        if not os.path.isdir(entry_dir):
+            return None
+        try:
+            df = pd.read_parquet(os.path.join(entry_dir, 'data.parquet'))
+            with open(os.path.join(entry_dir, 'report.json')) as f:
+                report = json.load(f)
+            with open(os.path.join(entry_dir, 'schema.json')) as f:
+                schema = DatasetSchema(json.load(f))
+        except (OSError, ValueError):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+        # Access time drives LRU eviction
+        os.utime(entry_dir)
+        return df, report, schema
+
+    def put(self, key, df, report, schema):
+        """
+        Store a cleaned dataset. The entry is written to a temporary directory
+        and renamed into place, so readers never see a partial entry.
+        Returns False if the frame cannot be stored as Parquet (e.g. columns
+        mixing strings and numbers).
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+        try:
+            try:
+                df.to_parquet(os.path.join(tmp_dir, 'data.parquet'), index=False)
+            except (TypeError, ValueError):
+                return False
+            with open(os.path.join(tmp_dir, 'report.json'), 'w') as f:
+                json.dump(report, f, default=str)
+            with open(os.path.join(tmp_dir, 'schema.json'), 'w') as f:
+                json.dump(dict(schema), f)
+            entry_dir = self._entry_dir(key)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict()
+        return True
+
+    def _entries(self):
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for name in os.listdir(self.cache_dir):
+            entry_dir = self._entry_dir(name)
+            if name.startswith('.') or not os.path.isdir(entry_dir):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(entry_dir) if entry.is_file())
+            entries.append((os.stat(entry_dir).st_mtime, size, entry_dir))
+        return sorted(entries)
+
+    def evict(self):
+        """
+        Drop least recently used entries until both limits are met.
+        """
+        entries = self._entries()
+        total_bytes = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, entry_dir = entries.pop(0)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_bytes -= size
+
+    def clear(self):
+        for _, _, entry_dir in self._entries():
+            shutil.rmtree(entry_dir, ignore_errors=True)
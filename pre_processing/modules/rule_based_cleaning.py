@@ -1,15 +1,317 @@
-import pandas as pd
+import os
+import re
+import ast
 import json
 
+import numpy as np
+import pandas as pd
+
+RULES_PATH = os.path.join("output", "submitted_data.json")
+
+NULL_POLICIES = ('keep', 'drop')
+# Reserved keys of a rules file; every other key names a column
+EXPRESSIONS_KEY = '_expressions'
+NULLS_KEY = '_nulls'
+COLUMN_RULE_KEYS = ('min', 'max', 'allowed', 'forbidden', 'pattern', 'nulls')
+
+# Syntax allowed in expressions: column names, literals and operators only.
+# Anything else (calls, attributes, subscripts, @-references) is rejected
+# before an expression is stored or evaluated.
+EXPRESSION_NODES = (
+    ast.Expression, ast.BoolOp, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Name, ast.Load, ast.Constant,
+    ast.List, ast.Tuple,
+    ast.And, ast.Or, ast.Not, ast.USub, ast.UAdd, ast.Invert,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.BitAnd, ast.BitOr,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+)
+_QUOTED_COLUMN = re.compile(r'`([^`]*)`')
+
+
+class Rule:
+    """
+    One compiled check. predicate(df) returns a boolean array that is True
+    for the rows passing the rule; columns lists what it reads, so rules on
+    columns the data does not have can be skipped.
+    """
+
+    def __init__(self, name, columns, predicate):
+        self.name = name
+        self.columns = columns
+        self.predicate = predicate
+
+    def evaluate(self, df):
+        return np.asarray(self.predicate(df), dtype=bool)
+
+
+def _parse_bound(value):
+    """
+    A range bound as a float or a Timestamp; None or "" leaves the side open.
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return pd.Timestamp(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Range bound {value!r} is neither a number nor a date.")
+
+
+def _as_bound_type(series, bound):
+    """
+    The column in the bound's type; values that do not parse become missing,
+    as type inference would make them.
+    """
+    if isinstance(bound, pd.Timestamp):
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        return pd.to_datetime(series, errors='coerce')
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series
+    return pd.to_numeric(series.astype(object), errors='coerce')
+
+
+def _range_rule(column, low, high):
+    bound = low if low is not None else high
+
+    def predicate(df):
+        values = _as_bound_type(df[column], bound)
+        passed = values.isna()
+        if low is not None and high is not None:
+            passed |= values.between(low, high)
+        elif low is not None:
+            passed |= values >= low
+        else:
+            passed |= values <= high
+        return passed
+
+    return Rule(f"{column}: range", [column], predicate)
+
+
+def _membership(series, values):
+    """
+    series.isin(values). Form submissions send every value as a string, so
+    for a typed column the values are compared as numbers when they all
+    parse as numbers, and as text otherwise.
+    """
+    textual = pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series) \
+        or isinstance(series.dtype, pd.CategoricalDtype)
+    if not textual and values and all(isinstance(value, str) for value in values):
+        numbers = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+        if pd.api.types.is_numeric_dtype(series) and numbers.notna().all():
+            return series.isin(numbers.tolist())
+        return series.astype(str).isin(values)
+    return series.isin(values)
+
+
+def _set_rule(column, values, allowed):
+    def predicate(df):
+        series = df[column]
+        member = _membership(series, values)
+        return series.isna() | (member if allowed else ~member)
+
+    return Rule(f"{column}: {'allowed' if allowed else 'forbidden'}", [column], predicate)
+
+
+def _pattern_rule(column, pattern):
+    try:
+        regex = re.compile(pattern)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern for column '{column}': {e}")
+
+    def predicate(df):
+        series = df[column]
+        matches = series.astype(str).str.contains(regex, regex=True)
+        return series.isna() | matches.fillna(False)
+
+    return Rule(f"{column}: pattern", [column], predicate)
+
+
+def _not_null_rule(column):
+    return Rule(f"{column}: nulls", [column], lambda df: df[column].notna())
+
+
+def _expression_columns(expression):
+    """
+    Validate an expression against EXPRESSION_NODES and return the columns
+    it names. Column names with spaces are quoted in backticks, as in
+    DataFrame.eval. Raises ValueError for anything outside the allowed syntax.
+    """
+    if not isinstance(expression, str) or not expression.strip():
+        raise ValueError("Expressions must be non-empty strings.")
+    quoted = {}
+
+    def placeholder(match):
+        name = f"_quoted_column_{len(quoted)}"
+        quoted[name] = match.group(1)
+        return name
+
+    try:
+        tree = ast.parse(_QUOTED_COLUMN.sub(placeholder, expression).strip(), mode='eval')
+    except SyntaxError:
+        raise ValueError(f"Expression '{expression}' is not valid syntax.")
+    columns = []
+    for node in ast.walk(tree):
+        if not isinstance(node, EXPRESSION_NODES):
+            raise ValueError(f"Expression '{expression}' may only use column names, literals and operators.")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, str, bool, type(None))):
+            raise ValueError(f"Expression '{expression}' has an unsupported literal.")
+        if isinstance(node, ast.Name):
+            columns.append(quoted.get(node.id, node.id))
+    return list(dict.fromkeys(columns))
+
+
+def _wide_dtype(dtype):
+    """
+    The 64-bit version of a narrower numeric dtype, None for anything else.
+    """
+    integer, floating = pd.api.types.is_integer_dtype(dtype), pd.api.types.is_float_dtype(dtype)
+    if not (integer or floating) or dtype.itemsize >= 8:
+        return None
+    nullable = isinstance(dtype, pd.api.extensions.ExtensionDtype)
+    if integer:
+        return 'Int64' if nullable else 'int64'
+    return 'Float64' if nullable else 'float64'
+
+
+def _expression_rule(expression):
+    """
+    A cross-column condition in DataFrame.eval syntax, e.g. "start <= end".
+    Only column names are in scope. Rows where a compared value is missing
+    fail the comparison. Numeric columns are evaluated in 64-bit, so
+    arithmetic on compacted int32/float32 columns cannot wrap or round.
+    """
+    columns = _expression_columns(expression)
+
+    def predicate(df):
+        frame = df[columns]
+        narrow = {column: _wide_dtype(dtype) for column, dtype in frame.dtypes.items() if _wide_dtype(dtype)}
+        result = (frame.astype(narrow) if narrow else frame).eval(expression, local_dict={}, global_dict={})
+        if np.ndim(result) == 0:
+            raise ValueError(f"Expression '{expression}' does not evaluate to a condition per row.")
+        result = pd.Series(result, index=df.index)
+        return result.fillna(False).astype(bool)
+
+    return Rule(f"expression: {expression}", columns, predicate)
+
+
+def compile_rules(rules):
+    """
+    Compile a rules dict, as submitted by /save-file, into a list of Rules.
+
+    Each column maps to either a dict with any of
+        min, max    range bounds (numbers or dates; either side may be open)
+        allowed     values the column may take
+        forbidden   values the column may not take
+        pattern     regular expression values must contain (re.search)
+        nulls       'keep' (default) or 'drop' rows missing this column
+    EXPRESSIONS_KEY holds a list of cross-column conditions, limited to
+    column names, literals and operators, and NULLS_KEY the default null
+    policy. Missing values pass every column rule; the null policy alone
+    decides on them. Raises ValueError for malformed rules.
+    """
+    if not isinstance(rules, dict):
+        raise ValueError("Rules must be a JSON object mapping columns to rules.")
+    default_nulls = rules.get(NULLS_KEY, 'keep')
+    if default_nulls not in NULL_POLICIES:
+        raise ValueError(f"Unknown null policy '{default_nulls}'. Choose from: {', '.join(NULL_POLICIES)}")
+
+    compiled = []
+    for column, spec in rules.items():
+        if column in (EXPRESSIONS_KEY, NULLS_KEY):
+            continue
+        if not isinstance(spec, dict):
+            raise ValueError(f"Rule for column '{column}' must be an object with any of: "
+                             f"{', '.join(COLUMN_RULE_KEYS)}.")
+        unknown = set(spec) - set(COLUMN_RULE_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown rule keys for column '{column}': {', '.join(sorted(unknown))}")
+
+        low, high = _parse_bound(spec.get('min')), _parse_bound(spec.get('max'))
+        if low is not None and high is not None:
+            if type(low) is not type(high):
+                raise ValueError(f"Range bounds of column '{column}' mix numbers and dates.")
+            if low > high:
+                raise ValueError(f"Range of column '{column}' has min greater than max.")
+        if low is not None or high is not None:
+            compiled.append(_range_rule(column, low, high))
+        for key, allowed in (('allowed', True), ('forbidden', False)):
+            if spec.get(key) is not None:
+                if not isinstance(spec[key], list):
+                    raise ValueError(f"'{key}' of column '{column}' must be a list.")
+                compiled.append(_set_rule(column, spec[key], allowed))
+        if spec.get('pattern'):
+            compiled.append(_pattern_rule(column, spec['pattern']))
+        nulls = spec.get('nulls', default_nulls)
+        if nulls not in NULL_POLICIES:
+            raise ValueError(f"Unknown null policy '{nulls}' for column '{column}'.")
+        if nulls == 'drop':
+            compiled.append(_not_null_rule(column))
+
+    expressions = rules.get(EXPRESSIONS_KEY, [])
+    if not isinstance(expressions, list):
+        raise ValueError(f"'{EXPRESSIONS_KEY}' must be a list of expressions.")
+    compiled.extend(_expression_rule(expression) for expression in expressions)
+    return compiled
+
+
+class RuleEngine:
+    """
+    Applies compiled rules in one pass: every rule is evaluated as a
+    vectorized predicate, the results are combined into a single keep mask,
+    and the frame is filtered (copied) once. apply() may be called chunk by
+    chunk; report accumulates rows and per-rule violation counts across
+    calls. A row can violate several rules, so violations may add up to
+    more than the rows dropped.
+    """
+
+    def __init__(self, rules):
+        self.rules = compile_rules(rules)
+        self.report = {
+            'rows_in': 0,
+            'rows_out': 0,
+            'violations': {rule.name: 0 for rule in self.rules},
+            'skipped': {},
+        }
+
+    def mask(self, df):
+        keep = np.ones(len(df), dtype=bool)
+        for rule in self.rules:
+            if rule.columns is not None:
+                missing = [column for column in rule.columns if column not in df.columns]
+                if missing:
+                    self.report['skipped'][rule.name] = f"Missing column: {', '.join(missing)}"
+                    continue
+            try:
+                passed = rule.evaluate(df)
+            except Exception as e:
+                # e.g. an expression naming a column the data does not have
+                self.report['skipped'][rule.name] = f"{type(e).__name__}: {e}"
+                continue
+            self.report['violations'][rule.name] += int(len(df) - np.count_nonzero(passed))
+            keep &= passed
+        return keep
+
+    def apply(self, df):
+        keep = self.mask(df)
+        self.report['rows_in'] += len(df)
+        if not keep.all():
+            df = df[keep]
+        self.report['rows_out'] += len(df)
+        return df
+
+
 def rule_based_cleaning_processor(df: pd.DataFrame, rules: dict = {}):
-    for column, rule in rules.items():
-            if rule[0].isnumeric(): 
-                df = df[df[column].isnull() | df[column].between(int(rule[0]), int(rule[1]))]
-            else:
-                df = df[~df[column].isin(rule)]
-    return df
+    return RuleEngine(rules).apply(df)
 
-def rule_based_cleaning(df , file_path ):
+def load_rules(file_path):
     with open(file_path , 'r') as file:
-        rules = json.load(file)
-    return rule_based_cleaning_processor(df,rules)
\ No newline at end of file
+        return json.load(file)
+
+def rule_based_cleaning(df , file_path ):
+    rules = load_rules(file_path)
+    return rule_based_cleaning_processor(df,rules)
@@ -0,0 +1,38 @@
+from .pre_processing_utils import infer_column_type
+
+NUMERIC_TYPES = ('int', 'float')
+CATEGORICAL_TYPES = ('object', 'boolean')
+
+
+class DatasetSchema(dict):
+    """
+    Column name -> inferred type ('int', 'float', 'boolean', 'object', 'datetime').
+
+    Inferred once by DataCleaner and handed to the imputer, the synthesizer and
+    the transformation step so none of them re-infer column types.
+    """
+
+    def columns_of(self, *column_types):
+        return [column for column, column_type in self.items() if column_type in column_types]
+
+    @property
+    def numeric_columns(self):
+        return self.columns_of(*NUMERIC_TYPES)
+
+    @property
+    def categorical_columns(self):
+        return self.columns_of(*CATEGORICAL_TYPES)
+
+    @property
+    def datetime_columns(self):
+        return self.columns_of('datetime')
+
+
+def infer_schema(df, sample_size=None):
+    """
+    Infer a DatasetSchema for a DataFrame without modifying it.
+    """
+    schema = DatasetSchema()
+    for column in df.columns:
+        _, schema[column] = infer_column_type(df[column], sample_size=sample_size)
+    return schema
@@ -0,0 +1,132 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+from utils.lazy_import import LazyModule
+
+from .duplicate_detection import hash_rows
+
+sdv_utils = LazyModule('sdv.utils')
+
+DEFAULT_STORE_DIR = os.path.join('output', 'synthesizers')
+DEFAULT_MAX_ENTRIES = 16
+
+# CPU throughput of CTGAN before any fit has been timed (batch_size=500)
+DEFAULT_SECONDS_PER_ROW_EPOCH = 2e-4
+
+
+def data_fingerprint(df):
+    """
+    Content hash of a DataFrame, independent of its index.
+    """
+    digest = hashlib.sha256(hash_rows(df).tobytes())
+    digest.update(json.dumps([str(column) for column in df.columns]).encode())
+    return digest.hexdigest()
+
+
+def metadata_fingerprint(metadata):
+    """
+    Hash of the SDV metadata (column names and sdtypes); identical for every
+    version of a dataset that keeps the same schema.
+    """
+    return hashlib.sha256(json.dumps(metadata.to_dict(), sort_keys=True, default=str).encode()).hexdigest()
+
+
+def plateau_epoch(losses, window=10, patience=10, tolerance=0.05):
+    """
+    First epoch after which the smoothed loss stops moving: over the next
+    `patience` epochs it stays within `tolerance` times its range over the
+    whole run. GAN losses oscillate, so the loss is smoothed over `window`
+    epochs first. Returns None if the loss never settles.
+    """
+    smoothed = losses.rolling(window).mean().to_numpy()[window - 1:]
+    if len(smoothed) <= patience:
+        return None
+    spread = smoothed.max() - smoothed.min()
+    for start in range(len(smoothed) - patience):
+        segment = smoothed[start:start + patience + 1]
+        if segment.max() - segment.min() <= tolerance * spread:
+            return start + window
+    return None
+
+
+class SynthesizerStore:
+    """
+    On-disk store of fitted synthesizers.
+
+    Models are keyed by the training data fingerprint, the metadata and the
+    training parameters, so identical data is only ever trained once and later
+    runs just sample. Per-schema training statistics (seconds per row-epoch,
+    the epoch at which the loss plateaued) are kept separately and shared by
+    every dataset with the same metadata, so new versions of a dataset train
+    with a calibrated epoch count. The least recently used models are evicted
+    beyond max_entries.
+    """
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        self.store_dir = store_dir
+        self.max_entries = max_entries
+        self.stats_dir = os.path.join(store_dir, 'stats')
+        os.makedirs(self.stats_dir, exist_ok=True)
+
+    def key(self, data_hash, metadata_hash, params):
+        payload = json.dumps({'data': data_hash, 'metadata': metadata_hash, 'params': params}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _model_path(self, key):
+        return os.path.join(self.store_dir, f"{key}.pkl")
+
+    def load(self, key):
+        """
+        Return the fitted synthesizer stored under key, or None.
+        """
+        path = self._model_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            synthesizer = sdv_utils.load_synthesizer(path)
+        except Exception:
+            os.remove(path)
+            return None
+        # Access time drives LRU eviction
+        os.utime(path)
+        return synthesizer
+
+    def save(self, key, synthesizer):
+        """
+        Write a fitted synthesizer atomically, then evict old models.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, prefix='.tmp-', suffix='.pkl')
+        os.close(fd)
+        try:
+            synthesizer.save(tmp_path)
+            os.replace(tmp_path, self._model_path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+
+    def load_stats(self, metadata_hash):
+        try:
+            with open(os.path.join(self.stats_dir, f"{metadata_hash}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_stats(self, metadata_hash, stats):
+        with open(os.path.join(self.stats_dir, f"{metadata_hash}.json"), 'w') as f:
+            json.dump(stats, f)
+
+    def evict(self):
+        models = sorted(
+            (entry.stat().st_mtime, entry.path) for entry in os.scandir(self.store_dir)
+            if entry.is_file() and entry.name.endswith('.pkl') and not entry.name.startswith('.')
+        )
+        for _, path in models[:max(len(models) - self.max_entries, 0)]:
+            os.remove(path)
+
+    def clear(self):
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+        os.makedirs(self.stats_dir, exist_ok=True)
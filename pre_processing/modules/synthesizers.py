@@ -0,0 +1,393 @@
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+from scipy.stats import rankdata
+from sklearn.neighbors import NearestNeighbors
+
+from utils.lazy_import import LazyModule
+from .synthesizer_store import (DEFAULT_SECONDS_PER_ROW_EPOCH, SynthesizerStore, data_fingerprint,
+                                metadata_fingerprint, plateau_epoch)
+
+# sdv pulls in torch; only CTGAN needs it
+sdv_single_table = LazyModule('sdv.single_table')
+sdv_metadata = LazyModule('sdv.metadata')
+
+DEFAULT_EPOCHS = 128
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_TIME_BUDGET = 60    # seconds
+# Epochs trained past the plateau seen on an earlier fit of the same schema
+PLATEAU_MARGIN = 1.25
+# Classes are considered imbalanced when the largest is this many times the smallest
+IMBALANCE_RATIO = 2.0
+
+# Rough throughput figures used by estimate_seconds
+CTGAN_OVERHEAD_SECONDS = 3.0
+CELLS_PER_SEC = 5e6
+
+
+def _split_columns(df, categorical_columns):
+    """
+    Continuous columns (numbers and datetimes) are modelled as such; every
+    other column is treated as discrete.
+    """
+    continuous = [
+        column for column in df.columns
+        if column not in categorical_columns and (
+            pd.api.types.is_numeric_dtype(df[column]) or pd.api.types.is_datetime64_any_dtype(df[column]))
+        and not pd.api.types.is_bool_dtype(df[column])
+    ]
+    discrete = [column for column in df.columns if column not in continuous]
+    return continuous, discrete
+
+
+def _to_float(series):
+    """
+    Continuous column as floats; datetimes become nanoseconds since the epoch (UTC).
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        nanoseconds = series.to_numpy(dtype='datetime64[ns]').astype('int64').astype(float)
+        return pd.Series(nanoseconds, index=series.index).where(series.notna())
+    return series.astype(float)
+
+
+def _from_float(values, like):
+    """
+    Inverse of _to_float for values sampled from a column shaped like `like`.
+    """
+    if pd.api.types.is_datetime64_any_dtype(like):
+        timestamps = pd.DatetimeIndex(np.round(values).astype('int64').astype('datetime64[ns]'))
+        if like.dt.tz is not None:
+            timestamps = timestamps.tz_localize('UTC').tz_convert(like.dt.tz)
+        return timestamps
+    return values
+
+
+class Synthesizer:
+    """
+    Base class for synthetic data backends. fit learns from a cleaned
+    DataFrame, sample returns new rows with the same columns. summary holds
+    what the synthesis report records about the fit.
+    """
+
+    def __init__(self):
+        self.summary = {}
+
+    def fit(self, df, categorical_columns, target=None):
+        raise NotImplementedError
+
+    def sample(self, num_rows):
+        raise NotImplementedError
+
+    @staticmethod
+    def estimate_seconds(n_rows, n_cols):
+        raise NotImplementedError
+
+
+class CTGANBackend(Synthesizer):
+    """
+    SDV's CTGAN. Fitted models are persisted in a SynthesizerStore, so runs on
+    data it has already seen only sample; time_budget caps the epochs trained.
+    """
+
+    name = 'ctgan'
+
+    def __init__(self, epochs=DEFAULT_EPOCHS, batch_size=DEFAULT_BATCH_SIZE, time_budget=None, store=None):
+        super().__init__()
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.time_budget = time_budget
+        self.store = store
+
+    def plan_epochs(self, n_rows, stats):
+        """
+        Epochs to train: at most self.epochs, cut to just past the loss plateau
+        seen on an earlier fit of the same schema, and to what fits in the time
+        budget at the measured (or default) throughput.
+        """
+        epochs = self.epochs
+        if stats.get('plateau_epoch'):
+            epochs = min(epochs, int(stats['plateau_epoch'] * PLATEAU_MARGIN) + 10)
+        if self.time_budget is not None:
+            seconds_per_epoch = n_rows * stats.get('seconds_per_row_epoch', DEFAULT_SECONDS_PER_ROW_EPOCH)
+            epochs = min(epochs, int(self.time_budget / max(seconds_per_epoch, 1e-9)))
+        return max(epochs, 1)
+
+    def fit(self, df, categorical_columns, target=None):
+        store = self.store or SynthesizerStore()
+        metadata = sdv_metadata.SingleTableMetadata()
+        metadata.detect_from_dataframe(df)
+        # Declare column types explicitly; CTGAN models discrete columns natively
+        continuous, discrete = _split_columns(df, categorical_columns)
+        for column in continuous:
+            if not pd.api.types.is_datetime64_any_dtype(df[column]):
+                metadata.update_column(column_name=column, sdtype='numerical')
+        for column in discrete:
+            metadata.update_column(column_name=column, sdtype='categorical')
+
+        metadata_hash = metadata_fingerprint(metadata)
+        key = store.key(data_fingerprint(df), metadata_hash, {'epochs': self.epochs, 'batch_size': self.batch_size})
+
+        self.model = store.load(key)
+        if self.model is not None:
+            print("Reusing stored CTGAN model...")
+            self.summary = {'reused': True, 'model_key': key}
+            return self
+
+        stats = store.load_stats(metadata_hash)
+        epochs = self.plan_epochs(len(df), stats)
+        self.model = sdv_single_table.CTGANSynthesizer(
+            epochs=epochs,
+            batch_size=self.batch_size,
+            verbose=True,
+            metadata=metadata
+        )
+
+        print(f"Training CTGAN model for {epochs} epochs...")
+        start = time.perf_counter()
+        self.model.fit(df)
+        fit_seconds = time.perf_counter() - start
+
+        plateau = plateau_epoch(self.model.get_loss_values()['Generator Loss'])
+        store.save_stats(metadata_hash, {
+            'seconds_per_row_epoch': fit_seconds / (len(df) * epochs),
+            'plateau_epoch': plateau,
+        })
+        store.save(key, self.model)
+        self.summary = {'reused': False, 'model_key': key, 'epochs': epochs, 'plateau_epoch': plateau}
+        return self
+
+    def sample(self, num_rows):
+        return self.model.sample(num_rows=num_rows)
+
+    @staticmethod
+    def estimate_seconds(n_rows, n_cols, epochs=DEFAULT_EPOCHS):
+        return CTGAN_OVERHEAD_SECONDS + n_rows * epochs * DEFAULT_SECONDS_PER_ROW_EPOCH
+
+
+class GaussianCopulaBackend(Synthesizer):
+    """
+    Gaussian copula: every column is mapped to normal scores through its
+    empirical distribution, the correlation of the scores is estimated, and
+    samples drawn from that multivariate normal are mapped back through the
+    empirical quantiles. Discrete columns occupy intervals of [0, 1] sized by
+    their category frequencies.
+    """
+
+    name = 'gaussian_copula'
+
+    def __init__(self, max_quantiles=10_000, random_state=42):
+        super().__init__()
+        self.max_quantiles = max_quantiles
+        self.rng = np.random.default_rng(random_state)
+
+    def fit(self, df, categorical_columns, target=None):
+        self.columns = list(df.columns)
+        self.like = df.head(1)
+        self.continuous, self.discrete = _split_columns(df, categorical_columns)
+        n = len(df)
+        scores = np.empty((n, len(self.columns)))
+        self.quantiles = {}
+        self.categories = {}
+
+        for i, column in enumerate(self.columns):
+            if column in self.continuous:
+                values = _to_float(df[column])
+                values = values.fillna(values.median()).to_numpy()
+                uniform = (rankdata(values) - 0.5) / n
+                grid = np.sort(values)
+                if len(grid) > self.max_quantiles:
+                    grid = grid[np.linspace(0, len(grid) - 1, self.max_quantiles).round().astype(int)]
+                self.quantiles[column] = grid
+            else:
+                counts = df[column].value_counts(dropna=False)
+                upper = np.cumsum(counts.to_numpy()) / n
+                lower = upper - counts.to_numpy() / n
+                codes = counts.index.get_indexer(df[column])
+                uniform = lower[codes] + self.rng.random(n) * (upper[codes] - lower[codes])
+                self.categories[column] = (counts.index, upper)
+            scores[:, i] = ndtri(np.clip(uniform, 1e-6, 1 - 1e-6))
+
+        correlation = np.nan_to_num(np.corrcoef(scores, rowvar=False)) if n > 1 else np.eye(len(self.columns))
+        correlation = np.atleast_2d(correlation)
+        np.fill_diagonal(correlation, 1.0)
+        # Clip negative eigenvalues so the matrix is a valid covariance
+        eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+        self.cholesky_factor = eigenvectors * np.sqrt(np.clip(eigenvalues, 1e-9, None))
+        return self
+
+    def sample(self, num_rows):
+        scores = self.rng.standard_normal((num_rows, len(self.columns))) @ self.cholesky_factor.T
+        uniform = ndtr(scores)
+        synthetic = {}
+        for i, column in enumerate(self.columns):
+            if column in self.continuous:
+                grid = self.quantiles[column]
+                values = np.interp(uniform[:, i], np.linspace(0, 1, len(grid)), grid)
+                synthetic[column] = _from_float(values, self.like[column])
+            else:
+                categories, upper = self.categories[column]
+                codes = np.minimum(np.searchsorted(upper, uniform[:, i]), len(categories) - 1)
+                synthetic[column] = categories[codes]
+        return pd.DataFrame(synthetic, columns=self.columns)
+
+    @staticmethod
+    def estimate_seconds(n_rows, n_cols):
+        return n_rows * n_cols * np.log2(max(n_rows, 2)) / CELLS_PER_SEC
+
+
+class BootstrapNoiseBackend(Synthesizer):
+    """
+    Resamples whole rows and jitters continuous columns with Gaussian noise
+    of Silverman's rule-of-thumb bandwidth. Keeps cross-column structure
+    exactly and costs one pass over the data.
+    """
+
+    name = 'bootstrap'
+
+    def __init__(self, noise_scale=1.0, random_state=42):
+        super().__init__()
+        self.noise_scale = noise_scale
+        self.rng = np.random.default_rng(random_state)
+
+    def fit(self, df, categorical_columns, target=None):
+        self.df = df.reset_index(drop=True)
+        self.continuous, _ = _split_columns(df, categorical_columns)
+        n = max(len(df), 1)
+        self.bandwidths = {
+            column: self.noise_scale * 1.06 * np.nan_to_num(_to_float(df[column]).std()) * n ** (-1 / 5)
+            for column in self.continuous
+        }
+        return self
+
+    def sample(self, num_rows):
+        synthetic = self.df.iloc[self.rng.integers(len(self.df), size=num_rows)].reset_index(drop=True)
+        for column, bandwidth in self.bandwidths.items():
+            values = _to_float(synthetic[column]).to_numpy() + self.rng.normal(0, bandwidth, num_rows)
+            synthetic[column] = _from_float(values, self.df[column])
+        return synthetic
+
+    @staticmethod
+    def estimate_seconds(n_rows, n_cols):
+        return n_rows * n_cols / CELLS_PER_SEC
+
+
+class SMOTEBackend(Synthesizer):
+    """
+    SMOTE-style interpolation: each new row lies on the segment between a row
+    and one of its k nearest neighbours of the same class. Continuous columns
+    are interpolated, discrete ones copied from the nearer endpoint. With a
+    target column, samples go to the smallest classes first so the result is
+    more balanced; without one the whole dataset is a single class.
+    """
+
+    name = 'smote'
+
+    def __init__(self, k_neighbors=5, random_state=42):
+        super().__init__()
+        self.k_neighbors = k_neighbors
+        self.rng = np.random.default_rng(random_state)
+
+    def fit(self, df, categorical_columns, target=None):
+        self.df = df.reset_index(drop=True)
+        self.target = target
+        self.continuous, _ = _split_columns(df, categorical_columns)
+        self.continuous = [column for column in self.continuous if column != target]
+        self.values = np.column_stack([_to_float(self.df[column]).to_numpy() for column in self.continuous]) \
+            if self.continuous else np.empty((len(df), 0))
+        scale = np.nanstd(self.values, axis=0) if len(df) else np.ones(self.values.shape[1])
+        self.scaled = np.nan_to_num(self.values / np.where(scale > 0, scale, 1))
+        if target is None:
+            self.classes = {None: np.arange(len(self.df))}
+        else:
+            self.classes = {label: np.asarray(rows) for label, rows in self.df.groupby(target, dropna=False).indices.items()}
+        return self
+
+    def _allocate(self, num_rows):
+        """
+        Split num_rows across classes, filling the gap to the largest class first.
+        """
+        labels = list(self.classes)
+        counts = np.array([len(self.classes[label]) for label in labels])
+        deficits = counts.max() - counts
+        if deficits.sum() >= num_rows:
+            allocation = np.floor(num_rows * deficits / deficits.sum()).astype(int)
+        else:
+            allocation = deficits + np.floor((num_rows - deficits.sum()) * counts / counts.sum()).astype(int)
+        allocation[np.argmin(counts)] += num_rows - allocation.sum()
+        return dict(zip(labels, allocation))
+
+    def _sample_class(self, rows, num_rows):
+        base = self.rng.choice(rows, size=num_rows)
+        if len(rows) < 2 or not self.continuous:
+            return base, base, np.zeros(num_rows)
+        k = min(self.k_neighbors, len(rows) - 1)
+        neighbors = NearestNeighbors(n_neighbors=k + 1).fit(self.scaled[rows])
+        _, positions = neighbors.kneighbors(self.scaled[base])
+        # Column 0 is the row itself
+        partner = rows[positions[np.arange(num_rows), self.rng.integers(1, k + 1, size=num_rows)]]
+        return base, partner, self.rng.random(num_rows)
+
+    def sample(self, num_rows):
+        parts = []
+        for label, count in self._allocate(num_rows).items():
+            if count <= 0:
+                continue
+            base, partner, gap = self._sample_class(self.classes[label], count)
+            nearer = np.where(gap < 0.5, base, partner)
+            part = self.df.iloc[nearer].reset_index(drop=True)
+            if self.continuous:
+                interpolated = self.values[base] + gap[:, None] * (self.values[partner] - self.values[base])
+                for i, column in enumerate(self.continuous):
+                    part[column] = _from_float(interpolated[:, i], self.df[column])
+            parts.append(part)
+        if not parts:
+            return self.df.iloc[:0].copy()
+        return pd.concat(parts, ignore_index=True)
+
+    @staticmethod
+    def estimate_seconds(n_rows, n_cols):
+        return n_rows * n_cols * np.log2(max(n_rows, 2)) / CELLS_PER_SEC
+
+
+# Ordered from most to least faithful; 'auto' takes the first that fits the budget
+SYNTHESIZER_BACKENDS = {
+    'ctgan': CTGANBackend,
+    'gaussian_copula': GaussianCopulaBackend,
+    'bootstrap': BootstrapNoiseBackend,
+    'smote': SMOTEBackend,
+}
+
+
+def is_imbalanced(series):
+    counts = series.value_counts()
+    return len(counts) > 1 and counts.max() >= IMBALANCE_RATIO * counts.min()
+
+
+def select_synthesizer_backend(n_rows, n_cols, time_budget=DEFAULT_TIME_BUDGET, imbalanced_target=False):
+    """
+    SMOTE when the rows are meant to rebalance a classification target,
+    otherwise the most faithful backend expected to finish within time_budget.
+    """
+    if imbalanced_target:
+        return 'smote'
+    for name in ('ctgan', 'gaussian_copula', 'bootstrap'):
+        if SYNTHESIZER_BACKENDS[name].estimate_seconds(n_rows, n_cols) <= time_budget:
+            return name
+    return 'bootstrap'
+
+
+def create_synthesizer(backend='auto', df=None, target=None, time_budget=DEFAULT_TIME_BUDGET, store=None,
+                       epochs=DEFAULT_EPOCHS):
+    """
+    Build an unfitted synthesizer by name, or pick one for df with 'auto'.
+    """
+    if backend == 'auto':
+        imbalanced = target is not None and is_imbalanced(df[target])
+        backend = select_synthesizer_backend(len(df), df.shape[1], time_budget, imbalanced)
+    if backend not in SYNTHESIZER_BACKENDS:
+        raise ValueError(f"Unknown synthesizer backend '{backend}'. Choose from: {', '.join(SYNTHESIZER_BACKENDS)}")
+    if backend == 'ctgan':
+        return CTGANBackend(epochs=epochs, time_budget=time_budget, store=store)
+    return SYNTHESIZER_BACKENDS[backend]()
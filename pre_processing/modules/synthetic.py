@@ -1,73 +1,53 @@
 import pandas as pd
 import numpy as np
-from sdv.single_table import CTGANSynthesizer
-from sdv.metadata import SingleTableMetadata
-from sklearn.preprocessing import LabelEncoder
 
-from .pre_processing_utils import convert_to_serializable, infer_column_type
+from .pre_processing_utils import convert_to_serializable
+from .schema import infer_schema
+from .column_stats import ColumnStats
+from .synthesizers import DEFAULT_EPOCHS, DEFAULT_TIME_BUDGET, create_synthesizer
+from utils.storage import write_output
 
+import os
 import json
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
-def generate_synthetic_data(df, output_dir = '.', synthetic_fraction=0.2):
+def generate_synthetic_data(df, output_dir = '.', synthetic_fraction=0.2, schema=None, backend='auto', target=None,
+                            epochs=DEFAULT_EPOCHS, time_budget=DEFAULT_TIME_BUDGET, store=None, column_stats=None):
     """
-    Generate synthetic data using CTGAN with reporting capabilities.
+    Generate synthetic data with reporting capabilities.
+    Column types come from the cleaning schema; they are only inferred if none is given.
+    backend names a synthesizer (see SYNTHESIZER_BACKENDS) or 'auto' to pick
+    the most faithful one expected to fit in time_budget seconds; with a
+    classification target whose classes are imbalanced, 'auto' rebalances
+    them with SMOTE. CTGAN models are persisted in `store`. column_stats is
+    df's ColumnStats (the report's, in the pipeline), computed if not given.
     """
     num_synthetic = int(len(df) * synthetic_fraction)
-    df_encoded = df.copy()
-    encoders = {}
 
-    categorical_columns = []
-    numeric_columns = []
-    for column in df.columns:
-        _, column_type = infer_column_type(df[column])
-        # print(f"Column: {column}, Type: {column_type}")
-        if column_type in ['object', 'boolean']: categorical_columns.append(column)
-        elif column_type in ['int', 'float']: numeric_columns.append(column)
-
-    for column in categorical_columns:
-        le = LabelEncoder()
-        encoded_values = le.fit_transform(df[column])
-        df_encoded[column] = encoded_values.astype(float)
-        encoders[column] = le
+    if schema is None:
+        schema = infer_schema(df)
+    categorical_columns = [column for column in schema.categorical_columns if column in df.columns]
+    numeric_columns = [column for column in schema.numeric_columns if column in df.columns]
     
+    before = column_stats or ColumnStats(df)
     numeric_ranges = {
-        column: {
-            'min': df[column].min(),
-            'max': df[column].max(),
-            'dtype': df[column].dtype
-        }
+        column: dict(zip(('min', 'max'), before.range(column)), dtype=df[column].dtype)
         for column in numeric_columns
     }
     
-    metadata = SingleTableMetadata()
-    metadata.detect_from_dataframe(df_encoded)
-    
-    for column in categorical_columns:
-        metadata.update_column(
-            column_name=column,
-            sdtype='numerical'
-        )
-    
-    model = CTGANSynthesizer(
-        epochs=128,
-        batch_size=500,
-        verbose=True,
-        metadata=metadata
-    )
-    
-    print("Training CTGAN model...")
-    model.fit(df_encoded)
+    synthesizer = create_synthesizer(backend, df=df, target=target, time_budget=time_budget, store=store,
+                                     epochs=epochs)
+    print(f"Fitting {synthesizer.name} synthesizer...")
+    start = time.perf_counter()
+    synthesizer.fit(df, categorical_columns, target=target)
+    fit_seconds = time.perf_counter() - start
     
     print(f"Generating {num_synthetic} synthetic samples...")
-    synthetic_data = model.sample(num_rows=num_synthetic)
-    
-    for column in categorical_columns:
-        n_categories = len(encoders[column].classes_)
-        synthetic_data[column] = synthetic_data[column].astype(float)
-        synthetic_data[column] = np.floor(synthetic_data[column]).astype(int) % n_categories
-        synthetic_data[column] = encoders[column].inverse_transform(synthetic_data[column])
+    start = time.perf_counter()
+    synthetic_data = synthesizer.sample(num_synthetic)
+    sample_seconds = time.perf_counter() - start
     
     for column in numeric_ranges.keys():
         synthetic_data[column] = synthetic_data[column].clip(
@@ -76,10 +56,8 @@ def generate_synthetic_data(df, output_dir = '.', synthetic_fraction=0.2):
         )
         synthetic_data[column] = synthetic_data[column].astype(numeric_ranges[column]['dtype'])
     
-    for column in categorical_columns:
-        df_encoded[column] = encoders[column].inverse_transform(df_encoded[column].astype(int))
-    
-    combined_data = pd.concat([df_encoded, synthetic_data], axis=0, ignore_index=True)
+    combined_data = pd.concat([df, synthetic_data], axis=0, ignore_index=True)
+    after = ColumnStats(combined_data)
     
     # Initial report
     synthesis_report = {
@@ -88,6 +66,12 @@ def generate_synthetic_data(df, output_dir = '.', synthetic_fraction=0.2):
             'columns': int(df.shape[1])
         },
         'synthetic_fraction': float(synthetic_fraction),
+        'synthesizer': {
+            'backend': synthesizer.name,
+            'fit_seconds': fit_seconds,
+            'sample_seconds': sample_seconds,
+            **synthesizer.summary
+        },
         'categorical_columns': {},
         'numeric_columns': {}
     }
@@ -95,7 +79,7 @@ def generate_synthetic_data(df, output_dir = '.', synthetic_fraction=0.2):
     for col in categorical_columns:
         synthesis_report['categorical_columns'][col] = {
             'before_synthesis': {
-                'unique_count': int(df[col].nunique()),
+                'unique_count': int(before.unique_counts[col]),
                 'sample_values': sorted(df[col].unique())[:5]
             }
         }
@@ -103,10 +87,10 @@ def generate_synthetic_data(df, output_dir = '.', synthetic_fraction=0.2):
     for col in numeric_columns:
         synthesis_report['numeric_columns'][col] = {
             'before_synthesis': {
-                'unique_count': int(df[col].nunique()),
+                'unique_count': int(before.unique_counts[col]),
                 'range': {
-                    'min': float(df[col].min()),
-                    'max': float(df[col].max())
+                    'min': float(numeric_ranges[col]['min']),
+                    'max': float(numeric_ranges[col]['max'])
                 }
             }
         }
@@ -114,17 +98,14 @@ def generate_synthetic_data(df, output_dir = '.', synthetic_fraction=0.2):
     # Post Synthesis
     for col in categorical_columns:
         synthesis_report['categorical_columns'][col]['after_synthesis'] = {
-            'unique_count': int(combined_data[col].nunique()),
+            'unique_count': int(after.unique_counts[col]),
             'sample_values': sorted(combined_data[col].unique())[:5]
         }
     
     for col in numeric_columns:
         synthesis_report['numeric_columns'][col]['after_synthesis'] = {
-            'unique_count': int(combined_data[col].nunique()),
-            'range': {
-                'min': float(combined_data[col].min()),
-                'max': float(combined_data[col].max())
-            }
+            'unique_count': int(after.unique_counts[col]),
+            'range': dict(zip(('min', 'max'), map(float, after.range(col))))
         }
     
     synthesis_report['final_shape'] = {
@@ -132,7 +113,7 @@ def generate_synthetic_data(df, output_dir = '.', synthetic_fraction=0.2):
         'columns': int(combined_data.shape[1])
     }
 
-    jpath = rf"{output_dir}\profiling_report.json"
+    jpath = os.path.join(output_dir, "profiling_report.json")
     with open(jpath, 'r') as f:
         report = json.load(f)
     
@@ -140,7 +121,7 @@ def generate_synthetic_data(df, output_dir = '.', synthetic_fraction=0.2):
     with open(jpath, 'w') as f:
         json.dump(report, f, indent=4, default=convert_to_serializable)
 
-    combined_data.to_csv(r"output\synthetic.csv")
+    write_output(combined_data, os.path.join(output_dir, "synthetic"))
     
     return combined_data
 
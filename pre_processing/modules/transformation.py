@@ -1,53 +1,145 @@
+import numpy as np
 import pandas as pd
+import joblib
 from sklearn.preprocessing import StandardScaler, LabelEncoder
-from pre_processing.modules.pre_processing_utils import infer_column_type
+from pre_processing.modules.pre_processing_utils import coerce_column, infer_column_type
+from pre_processing.modules.data_cleaner import DataCleaner
+from pre_processing.modules.schema import CATEGORICAL_TYPES, NUMERIC_TYPES, DatasetSchema
 
-def transform(df, target_column, task):
+DATE_KEYWORDS = ['date', 'time', 'dt', 'datetime', 'year', 'month', 'day', 'created', 'modified', 'timestamp', 'updated']
+# Code given to categories that were not seen when the pipeline was fitted
+UNKNOWN_CODE = -1
+
+
+def _categories(series):
     """
-    Process dataframe by separating target, applying transformations to X, scaling y,
-    and returning a concatenated DataFrame.
+    Sorted distinct values, as LabelEncoder orders them. Columns whose values
+    cannot be compared (e.g. strings mixed with numbers) are encoded as text.
+    """
+    values = pd.unique(series.dropna().to_numpy(dtype=object))
+    try:
+        return np.array(sorted(values), dtype=object), False
+    except TypeError:
+        return np.array(sorted(str(value) for value in values), dtype=object), True
+
+
+class PreprocessingPipeline:
+    """
+    Fitted feature preparation for model training and inference: type
+    coercion, missing-value fill statistics, one encoder per categorical
+    column, a scaler for numeric features and the target encoder.
+
+    fit() learns everything from the cleaned training frame; transform()
+    applies it to new batches in one vectorized pass without refitting, so
+    rows can be scored without rerunning the cleaning pipeline. Columns of
+    other types (datetimes, date-like categoricals) are passed through.
     """
 
-    y_scaler = StandardScaler()
-    x_scaler = StandardScaler()
-    label_encoder = LabelEncoder()
+    def __init__(self, target_column, task, schema=None):
+        self.target_column = target_column
+        self.task = task.lower()
+        self.schema = DatasetSchema(schema or {})
+        self.feature_columns = []
+        self.numeric_features = []
+        self.categorical_features = []
+        self.categories = {}
+        self.text_encoded = {}
+        self.numeric_codes = {}
+        self.x_scaler = StandardScaler()
+        self.target_encoder = StandardScaler() if self.task == "prediction" else LabelEncoder()
+        self.cleaner = DataCleaner()
+
+    def fit(self, df):
+        X = df.drop(columns=[self.target_column])
+        self.feature_columns = list(X.columns)
+        for column in df.columns:
+            if column not in self.schema:
+                self.schema[column] = infer_column_type(df[column])[1]
+        self.numeric_codes = {column: pd.api.types.is_numeric_dtype(df[column]) for column in df.columns}
+
+        self.numeric_features, self.categorical_features = [], []
+        for column in self.feature_columns:
+            column_type = self.schema[column]
+            if column_type in CATEGORICAL_TYPES and not any(keyword in column.lower() for keyword in DATE_KEYWORDS):
+                self.categorical_features.append(column)
+            elif column_type in NUMERIC_TYPES:
+                self.numeric_features.append(column)
+
+        feature_schema = {column: self.schema[column] for column in self.feature_columns}
+        self.cleaner.fit_fill_values(X, feature_schema, pd.Series(0.0, index=X.columns))
+        if self.numeric_features:
+            self.x_scaler.fit(X[self.numeric_features])
+        for column in self.categorical_features:
+            self.categories[column], self.text_encoded[column] = _categories(X[column])
 
-    # Transform target variable (Y)
-    if task.lower() == "prediction":
-        Y = df[target_column].copy().values.reshape(-1, 1)
-        Y = y_scaler.fit_transform(Y)
-        Y = pd.DataFrame(Y, columns=[target_column])
-    elif task.lower() == "classification":
-        Y = label_encoder.fit_transform(df[target_column])  
-        Y = pd.DataFrame(Y, columns=[target_column])
+        y = df[self.target_column]
+        if self.task == "prediction":
+            self.target_encoder.fit(y.to_numpy().reshape(-1, 1))
+        else:
+            self.target_encoder.fit(y)
+        return self
 
-    # Process features (X)
-    X = df.drop(columns=[target_column]).copy()
+    def encode(self, column, series):
+        values = series.astype(str).where(series.notna()) if self.text_encoded[column] else series
+        codes = pd.Categorical(values, categories=self.categories[column]).codes
+        return np.where(codes < 0, UNKNOWN_CODE, codes)
 
-    categorical_features = []
-    numeric_features = []
+    def transform_features(self, df):
+        """
+        Coerce, fill, encode and scale the feature columns of a new batch.
+        Missing feature columns raise a KeyError; extra columns are ignored.
+        """
+        X = df[self.feature_columns].copy()
+        for column in self.feature_columns:
+            X[column] = coerce_column(X[column], self.schema[column], self.numeric_codes.get(column, False))
+        X = self.cleaner.fill_missing_values(X, self.schema)
 
-    for column in X.columns:
-        _, column_type = infer_column_type(X[column])
-        if column_type in ['object', 'boolean'] and not any(keyword in column.lower() for keyword in ['date', 'time', 'dt', 'datetime', 'year', 'month', 'day', 'created', 'modified', 'timestamp', 'updated']): 
-            categorical_features.append(column)
-        elif column_type in ['int', 'float']: numeric_features.append(column)
+        if self.numeric_features:
+            X[self.numeric_features] = self.x_scaler.transform(X[self.numeric_features])
+        for column in self.categorical_features:
+            X[column] = self.encode(column, X[column])
+        return X.reset_index(drop=True)
 
-    # Scale numerical features
-    if numeric_features:
-        X[numeric_features] = x_scaler.fit_transform(X[numeric_features])
+    def transform_target(self, y):
+        if self.task == "prediction":
+            return self.target_encoder.transform(np.asarray(y, dtype=float).reshape(-1, 1)).ravel()
+        return self.target_encoder.transform(y)
 
-    # Encode categorical features using Label Encoding
-    if categorical_features:
-        for col in categorical_features:
-            X[col] = label_encoder.fit_transform(X[col])
+    def inverse_transform_target(self, y):
+        if self.task == "prediction":
+            return self.target_encoder.inverse_transform(np.asarray(y).reshape(-1, 1)).ravel()
+        return self.target_encoder.inverse_transform(np.asarray(y).astype(int))
 
-    X = X.reset_index(drop = True)
-    Y = Y.reset_index(drop = True)
+    def transform(self, df):
+        """
+        Features, plus the encoded target as the last column when df has it.
+        """
+        X = self.transform_features(df)
+        if self.target_column not in df.columns:
+            return X
+        Y = pd.DataFrame({self.target_column: self.transform_target(df[self.target_column])})
+        return pd.concat([X, Y], axis=1)
 
-    transformed_df = pd.concat([X, Y], axis=1)
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
 
-    return transformed_df, (y_scaler if task == "prediction" else label_encoder)
+    def save(self, path):
+        joblib.dump(self, path)
+        return path
 
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
 
 
+def transform(df, target_column, task, schema=None):
+    """
+    Process dataframe by separating target, applying transformations to X, scaling y,
+    and returning a concatenated DataFrame. Column types are read from the
+    cleaning schema when given and only inferred for columns it does not cover.
+    Returns (transformed_df, target_encoder); see PreprocessingPipeline to
+    keep the fitted transformations for new data.
+    """
+    pipeline = PreprocessingPipeline(target_column, task, schema)
+    transformed_df = pipeline.fit_transform(df)
+    return transformed_df, pipeline.target_encoder
@@ -0,0 +1,237 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+from .modules.data_loader import iter_dataset_chunks
+from .modules.data_cleaner import DataCleaner
+from .modules.data_imputer import DataImputer
+from .modules.report_generator import ReportGenerator
+from .modules.duplicate_detection import RunningDuplicateFilter, detect_duplicates
+from .modules.pre_processing_utils import convert_to_serializable, infer_column_type, coerce_column, no_progress
+from .modules.schema import DatasetSchema
+from .modules.column_stats import ColumnStats
+from .modules.rule_based_cleaning import RuleEngine, load_rules
+from .modules.synthetic import generate_synthetic_data
+from .modules.instrumentation import StageProfiler, add_performance_section
+
+
+class IndexLog:
+    """
+    Row indices appended to a binary int64 file, so the index lists of the
+    streaming report do not grow in memory with the file. The file is
+    created on the first non-empty extend(); read it back with
+    np.fromfile(path, dtype=np.int64).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+
+    def extend(self, indices):
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices):
+            with open(self.path, 'ab' if self.count else 'wb') as f:
+                indices.tofile(f)
+            self.count += len(indices)
+
+    def reported_path(self):
+        return self.path if self.count else None
+
+
+def sample_dataset(file_path, chunksize, sample_size, random_state=42):
+    """
+    Draw a uniform random sample of up to sample_size rows in one pass over the
+    file and count its rows. Every row gets a random key and the sample keeps
+    the sample_size smallest keys seen so far (bottom-k sampling).
+    """
+    rng = np.random.default_rng(random_state)
+    sample, keys = None, None
+    total_rows = 0
+
+    for chunk in iter_dataset_chunks(file_path, chunksize):
+        total_rows += len(chunk)
+        chunk_keys = rng.random(len(chunk))
+        if sample is None:
+            sample, keys = chunk, chunk_keys
+        else:
+            sample = pd.concat([sample, chunk])
+            keys = np.concatenate([keys, chunk_keys])
+        if len(sample) > sample_size:
+            keep = np.sort(np.argpartition(keys, sample_size)[:sample_size])
+            sample, keys = sample.iloc[keep], keys[keep]
+
+    if sample is None:
+        raise ValueError("Uploaded CSV has no data.")
+    return sample, total_rows
+
+
+def main_streaming(file_path, output_dir='output', chunksize=100_000, sample_size=100_000,
+                   gen_syn_data=False, rules_path=None, outlier_backend='auto',
+                   imputation_strategy='auto', synthesis_backend='auto', target=None, progress=None):
+    """
+    Run the cleaning pipeline over a CSV in chunks so peak memory is bounded by
+    chunksize instead of the file size.
+
+    Pass 1 samples the file and fits everything that needs global statistics:
+    column types, fill values, the KNN imputer and the outlier model. Rules
+    are applied to the sample, and duplicates dropped, before fitting, as
+    the in-memory pipeline does.
+    Pass 2 streams the file again and applies the row-local stages chunk by
+    chunk in the in-memory order (type coercion, rule filtering, filling,
+    deduplication against a running hash set, missing value counts, outlier
+    removal), appending each chunk to the output.
+
+    The report has the in-memory meaning (duplicate_count counts every row of
+    a duplicate group, missing values are those left after filling, as a
+    percentage of the deduplicated rows), but the row index lists are
+    written to int64 files under <output_dir>/<dataset>_indices (see
+    IndexLog) and reported by path.
+
+    Synthetic rows are drawn from the cleaned sample, and skipped when no
+    sample row survives cleaning; target names a classification target for
+    synthesis_backend='auto' to rebalance.
+
+    Returns the path of the cleaned CSV, the profiling report and the schema.
+    progress(stage, fraction) is called per stage and once per chunk.
+    """
+    progress = progress or no_progress
+    data_cleaner = DataCleaner(imputation_strategy=imputation_strategy)
+    data_imputer = DataImputer()
+    report_generator = ReportGenerator()
+    profiler = StageProfiler(progress)
+
+    # Pass 1: fit on a sample
+    with profiler.stage('sampling', 0.0) as stage:
+        sample, total_rows = sample_dataset(file_path, chunksize, sample_size)
+        stage['rows_in'], stage['rows_out'] = total_rows, len(sample)
+    columns = list(sample.columns)
+    initial_report = {
+        'original_shape': [total_rows, len(columns)],
+        'column_indices': {col: idx for idx, col in enumerate(columns)},
+        'streaming': {'chunksize': chunksize, 'sample_rows': len(sample)}
+    }
+
+    with profiler.stage('fitting', 0.1, rows_in=len(sample)) as stage:
+        fitted_sample = sample.copy()
+        column_dtype = DatasetSchema()
+        numeric_codes = {}
+        for column in columns:
+            fitted_sample[column], column_dtype[column] = infer_column_type(sample[column])
+            numeric_codes[column] = pd.api.types.is_numeric_dtype(fitted_sample[column])
+
+        # Fit on the sample as the in-memory pipeline fits on the whole file
+        if rules_path and os.path.exists(rules_path):
+            fitted_sample = RuleEngine(load_rules(rules_path)).apply(fitted_sample)
+        stats = ColumnStats(fitted_sample)
+        data_cleaner.fit_fill_values(fitted_sample, column_dtype, stats.missing_percentages, stats=stats)
+        fitted_sample = data_cleaner.fill_missing_values(fitted_sample, column_dtype)
+        unique_rows = ~detect_duplicates(fitted_sample)[1]
+        fitted_sample = fitted_sample[unique_rows]
+        # Expected rows of the whole file at the outlier stage, for the sample-to-file density ratio
+        expected_rows = max(len(fitted_sample), round(total_rows * len(fitted_sample) / len(sample)))
+        data_imputer.fit_outlier_model(fitted_sample, column_dtype, backend=outlier_backend, n_rows=expected_rows)
+        stage['rows_out'] = len(fitted_sample)
+
+    rule_engine = RuleEngine(load_rules(rules_path)) if rules_path and os.path.exists(rules_path) else None
+    duplicate_filter = RunningDuplicateFilter()
+
+    # Pass 2: apply row-local stages chunk by chunk
+    # Chunks are appended as they are cleaned, so the streamed output stays CSV
+    dataset_name = os.path.splitext(os.path.basename(file_path))[0]
+    processed_dataset_path = os.path.join(output_dir, f'clean_{dataset_name}.csv')
+    indices_dir = os.path.join(output_dir, f'{dataset_name}_indices')
+    os.makedirs(indices_dir, exist_ok=True)
+    # Files are named by column position; column names need not be valid file names
+    type_validation = {column: IndexLog(os.path.join(indices_dir, f'invalid_{position}.int64'))
+                       for position, column in enumerate(columns) if column_dtype[column] != 'datetime'}
+    missing_indices = {column: IndexLog(os.path.join(indices_dir, f'missing_{position}.int64'))
+                       for position, column in enumerate(columns)}
+    duplicate_indices = IndexLog(os.path.join(indices_dir, 'duplicates.int64'))
+    data_imputer.outlier_report['outlier_indices'] = IndexLog(os.path.join(indices_dir, 'outliers.int64'))
+    missing_counts = pd.Series(0, index=columns)
+    rows_checked = 0
+    rows_out = 0
+    rows_in = 0
+
+    with profiler.stage('streaming', 0.2, rows_in=total_rows) as stage:
+        for chunk_number, chunk in enumerate(iter_dataset_chunks(file_path, chunksize)):
+            progress('chunk', 0.2 + 0.6 * rows_in / total_rows)
+            rows_in += len(chunk)
+            for column in columns:
+                chunk[column] = coerce_column(chunk[column], column_dtype[column], numeric_codes[column])
+                if column in type_validation:
+                    type_validation[column].extend(chunk.index[chunk[column].isna().to_numpy()])
+
+            if rule_engine is not None:
+                chunk = rule_engine.apply(chunk)
+
+            chunk = data_cleaner.fill_missing_values(chunk, column_dtype, carry_over=True)
+
+            drop_mask = duplicate_filter.filter(chunk, duplicate_indices)
+            chunk = chunk[~drop_mask]
+
+            rows_checked += len(chunk)
+            null_mask = chunk.isna()
+            missing_counts += null_mask.sum()
+            for column in null_mask.columns[null_mask.any()]:
+                missing_indices[column].extend(chunk.index[null_mask[column].to_numpy()])
+
+            chunk = data_imputer.remove_outliers(chunk)
+            chunk.to_csv(processed_dataset_path, mode='w' if chunk_number == 0 else 'a',
+                         header=chunk_number == 0, index=False)
+            rows_out += len(chunk)
+        stage['rows_out'] = rows_out
+
+    data_cleaner.type_validation_report = {
+        column: {
+            'inferred_type': column_dtype[column],
+            'invalid_entries_count': indices.count,
+            'invalid_entry_indices_file': indices.reported_path()
+        }
+        for column, indices in type_validation.items()
+    }
+    data_cleaner.missing_info = {
+        column: {
+            'total_missing': int(missing_counts[column]),
+            'missing_percentage': round(missing_counts[column] / max(rows_checked, 1) * 100, 2),
+            'missing_indices_file': missing_indices[column].reported_path()
+        }
+        for column in columns if missing_counts[column] > 0
+    }
+    outlier_indices = data_imputer.outlier_report.pop('outlier_indices')
+    data_imputer.outlier_report['outlier_indices_file'] = outlier_indices.reported_path()
+
+    # Generate report
+    profiling_report_path = os.path.join(output_dir, 'profiling_report.json')
+    with profiler.stage('report', 0.8):
+        profiling_report = report_generator.build_report(
+            (total_rows, len(columns)), columns, (rows_out, len(columns)), data_cleaner, data_imputer
+        )
+        profiling_report['duplicates'] = {
+            'duplicate_count': duplicate_filter.duplicate_count,
+            'duplicate_indices_file': duplicate_indices.reported_path()
+        }
+        if rule_engine is not None:
+            profiling_report['rules'] = rule_engine.report
+        with open(profiling_report_path, 'w') as f:
+            json.dump({
+                'initial_report': initial_report,
+                'profiling_report': profiling_report
+            }, f, indent=4, default=convert_to_serializable)
+
+    # Synthesize from the cleaned sample and append only the new rows
+    clean_sample = fitted_sample[~data_imputer.predict_outliers(fitted_sample)] if gen_syn_data else None
+    if gen_syn_data and len(clean_sample):
+        with profiler.stage('synthesis', 0.85) as stage:
+            synthetic_fraction = 0.2 * rows_out / len(clean_sample)
+            combined = generate_synthetic_data(clean_sample, output_dir, synthetic_fraction, schema=column_dtype,
+                                               backend=synthesis_backend, target=target)
+            combined.iloc[len(clean_sample):].to_csv(processed_dataset_path, mode='a', header=False, index=False)
+            stage['rows_in'], stage['rows_out'] = len(clean_sample), len(combined) - len(clean_sample)
+
+    profiling_report['performance'] = profiler.report()
+    add_performance_section(profiling_report_path, profiling_report['performance'])
+
+    return processed_dataset_path, profiling_report, column_dtype
@@ -1,2 +1,5 @@
 from app import app_run
-app_run()
\ No newline at end of file
+
+# Guarded so job worker processes (spawned) can import this module safely
+if __name__ == "__main__":
+    app_run()
@@ -0,0 +1,40 @@
+import os
+import atexit
+import shutil
+import tempfile
+
+import pytest
+
+# Workspaces of the Flask app go to a scratch directory, not app/workspaces
+if "DATADOME_WORKSPACE_ROOT" not in os.environ:
+    os.environ["DATADOME_WORKSPACE_ROOT"] = tempfile.mkdtemp(prefix="datadome-workspaces-")
+    atexit.register(shutil.rmtree, os.environ["DATADOME_WORKSPACE_ROOT"], ignore_errors=True)
+
+from benchmarks.datagen import TableSpec, write_table
+from pre_processing.modules import instrumentation
+
+SAMPLE_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "sample_data.csv")
+
+
+@pytest.fixture(autouse=True)
+def in_memory_metrics(monkeypatch):
+    """
+    Keep stage metrics in memory instead of output/metrics.
+    """
+    monkeypatch.setattr(instrumentation.metrics_registry, "metrics_dir", None)
+
+
+@pytest.fixture
+def sample_csv():
+    return SAMPLE_DATA
+
+
+@pytest.fixture
+def table_csv(tmp_path):
+    """
+    A 3,000-row generated table with missing values, duplicates, outliers
+    and dirty numeric strings.
+    """
+    path = str(tmp_path / "table.csv")
+    write_table(TableSpec(rows=3_000, seed=1), path)
+    return path
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import skew
+
+from pre_processing.modules.column_stats import ColumnStats
+from pre_processing.modules.data_cleaner import DataCleaner
+from pre_processing.modules.data_imputer import DataImputer
+from pre_processing.modules.report_generator import ReportGenerator
+
+
+def frame():
+    return pd.DataFrame({
+        "x": [1.0, 2.0, np.nan, 4.0, 10.0],
+        "n": pd.array([1, 2, 2, None, 5], dtype="Int64"),
+        "colour": ["red", "blue", "blue", None, "red"],
+    })
+
+
+def test_statistics_match_pandas():
+    df = frame()
+    stats = ColumnStats(df)
+    pd.testing.assert_series_equal(stats.null_counts, df.isna().sum())
+    pd.testing.assert_series_equal(stats.unique_counts, df.nunique())
+    x = stats.numeric.loc["x"]
+    assert x["count"] == 4
+    assert x["mean"] == df["x"].mean()
+    assert x["median"] == df["x"].median()
+    assert np.isclose(x["skew"], skew(df["x"].dropna()))
+    assert stats.range("n") == (1, 5)
+    assert stats.missing_indices("colour") == [3]
+
+
+def test_modes_break_ties_like_series_mode():
+    df = frame()
+    stats = ColumnStats(df)
+    assert stats.mode("colour") == df["colour"].mode().iloc[0] == "blue"
+    assert stats.mode("n") == 2
+
+
+def test_statistics_are_a_snapshot_of_the_frame():
+    df = frame()
+    before = ColumnStats(df)
+    df.loc[2, "x"] = 3.0
+    assert before.null_counts["x"] == 1
+    assert ColumnStats(df).null_counts["x"] == 0
+    assert "_column_stats" not in df.__dict__
+
+
+def test_detect_missing_values_reads_the_given_statistics():
+    df = frame()
+    cleaner = DataCleaner()
+    info = cleaner.detect_missing_values(df, stats=ColumnStats(df))
+    assert info["x"] == {"total_missing": 1, "missing_percentage": 20.0, "missing_indices": [2]}
+    assert set(info) == {"x", "n", "colour"}
+
+
+def test_report_column_statistics():
+    df = frame()
+    report = ReportGenerator().generate_profiling_report(df, df, DataCleaner(), DataImputer())
+    summary = report["column_statistics"]
+    assert summary["colour"] == {"missing_count": 1, "missing_percentage": 20.0, "unique_count": 2, "mode": "blue"}
+    assert summary["x"]["max"] == 10.0
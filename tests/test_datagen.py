@@ -0,0 +1,33 @@
+import pandas as pd
+
+from benchmarks.datagen import TableSpec, iter_table, make_table, write_table
+
+
+def test_table_follows_the_spec():
+    spec = TableSpec(rows=2_000, numeric=3, categorical=2, datetime=1, cardinality=5, seed=3)
+    df = make_table(spec)
+    assert df.shape == (2_000, 6)
+    assert df.duplicated().sum() >= 0.8 * spec.duplicate_rate * spec.rows
+    assert 0.02 < df["num_1"].isna().mean() < 0.08
+    assert df["cat_0"].nunique() == 5
+    # Dirty strings only in the first numeric column
+    assert df["num_0"].dtype == object
+    assert df["num_1"].dtype.kind == "f"
+
+
+def test_generation_is_deterministic():
+    spec = TableSpec(rows=500, seed=7)
+    pd.testing.assert_frame_equal(make_table(spec), make_table(spec))
+
+
+def test_large_tables_are_written_in_chunks(tmp_path):
+    spec = TableSpec(rows=2_500, seed=1)
+    chunks = list(iter_table(spec, chunk_rows=1_000))
+    assert [len(chunk) for chunk in chunks] == [1_000, 1_000, 500]
+    assert chunks[-1].index[0] == 2_000
+
+    for extension in (".csv", ".parquet", ".feather"):
+        path = str(tmp_path / f"table{extension}")
+        assert write_table(spec, path, chunk_rows=1_000) == 2_500
+    assert len(pd.read_csv(tmp_path / "table.csv")) == 2_500
+    assert len(pd.read_parquet(tmp_path / "table.parquet")) == 2_500
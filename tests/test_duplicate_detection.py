@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pre_processing.modules import duplicate_detection
+from pre_processing.modules.duplicate_detection import (
+    RunningDuplicateFilter, SortedHashRuns, detect_duplicates, hash_column
+)
+from pre_processing.modules.data_cleaner import DataCleaner
+
+
+@pytest.mark.parametrize("keep", ["first", "last", False])
+def test_matches_pandas_duplicated(keep):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "a": rng.integers(0, 4, 500),
+        "b": rng.choice(["x", "y", None], 500),
+        "c": rng.choice([1.5, np.nan], 500),
+    })
+    duplicate_mask, drop_mask = detect_duplicates(df, keep=keep)
+    np.testing.assert_array_equal(duplicate_mask, df.duplicated(keep=False).to_numpy())
+    np.testing.assert_array_equal(drop_mask, df.duplicated(keep=keep).to_numpy())
+
+
+def test_mixed_type_object_columns_are_not_confused():
+    df = pd.DataFrame({"value": pd.Series([1, "1", 1.5, "1.5", 1], dtype=object)})
+    assert hash_column(df["value"])[0] != hash_column(df["value"])[1]
+    duplicate_mask, drop_mask = detect_duplicates(df)
+    assert duplicate_mask.tolist() == [True, False, False, False, True]
+    assert drop_mask.tolist() == [False, False, False, False, True]
+
+
+def test_hash_collisions_are_rechecked_on_values(monkeypatch):
+    # Every row hashes the same; only the value check can tell them apart
+    monkeypatch.setattr(duplicate_detection, "hash_column", lambda series: np.zeros(len(series), dtype=np.uint64))
+    df = pd.DataFrame({"a": [1, 2, 1, 3], "b": ["x", "y", "x", "z"]})
+    duplicate_mask, drop_mask = detect_duplicates(df)
+    assert duplicate_mask.tolist() == [True, False, True, False]
+    assert drop_mask.tolist() == [False, False, True, False]
+
+
+def test_subset_and_empty_frames():
+    df = pd.DataFrame({"a": [1, 1, 2], "b": [1, 2, 3]})
+    assert detect_duplicates(df, subset=["a"])[1].tolist() == [False, True, False]
+    assert detect_duplicates(df.iloc[:0])[0].tolist() == []
+
+
+def test_identify_duplicate_rows_reports_every_copy():
+    df = pd.DataFrame({"a": [1, 2, 1, 1]}, index=[10, 11, 12, 13])
+    cleaner = DataCleaner()
+    unique = cleaner.identify_duplicate_rows(df)
+    assert unique.index.tolist() == [10, 11]
+    assert cleaner.duplicate_indices == [10, 12, 13]
+
+
+def test_sorted_hash_runs_lookup_across_merges():
+    runs = SortedHashRuns()
+    hashes = np.random.default_rng(0).permutation(np.arange(1, 1001, dtype=np.uint64))
+    for start in range(0, 1000, 100):
+        runs.add(hashes[start:start + 100], np.arange(start, start + 100))
+    assert len(runs) == 1000
+    assert len(runs.runs) < 10
+    found, values = runs.lookup(np.array([hashes[0], hashes[999], 5000], dtype=np.uint64))
+    assert found.tolist() == [True, True, False]
+    assert values.tolist() == [0, 999, -1]
+
+
+def test_running_filter_matches_whole_frame_detection():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"a": rng.integers(0, 20, 1000), "b": rng.choice(["x", "y"], 1000)})
+    duplicate_mask, drop_mask = detect_duplicates(df)
+
+    running = RunningDuplicateFilter()
+    indices = []
+    dropped = np.concatenate([running.filter(df.iloc[start:start + 128], indices)
+                              for start in range(0, len(df), 128)])
+    np.testing.assert_array_equal(dropped, drop_mask)
+    assert running.duplicate_count == duplicate_mask.sum()
+    assert sorted(indices) == df.index[duplicate_mask].tolist()
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from pre_processing.modules import imputation
+from pre_processing.modules.imputation import (
+    BallTreeKNNStrategy, IMPUTATION_STRATEGIES, MedianStrategy, create_imputer, select_imputation_strategy
+)
+
+
+def matrix_with_gaps(n_rows=2_000, n_cols=4, rate=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(n_rows, 1))
+    X = latent + 0.1 * rng.normal(size=(n_rows, n_cols))
+    complete = X.copy()
+    X[rng.random(X.shape) < rate] = np.nan
+    return X, complete
+
+
+@pytest.mark.parametrize("name", list(IMPUTATION_STRATEGIES))
+def test_every_strategy_fills_every_gap(name):
+    X, _ = matrix_with_gaps(n_rows=300)
+    filled = create_imputer(X, name).fit(X).transform(X)
+    assert not np.isnan(filled).any()
+    observed = ~np.isnan(X)
+    np.testing.assert_array_equal(filled[observed], X[observed])
+
+
+def test_ball_tree_is_close_to_exact_knn():
+    X, complete = matrix_with_gaps()
+    missing = np.isnan(X)
+    exact = create_imputer(X, "knn").fit(X).transform(X)
+    ball_tree = BallTreeKNNStrategy().fit(X).transform(X)
+    median = MedianStrategy().fit(X).transform(X)
+
+    def error(filled):
+        return np.abs(filled[missing] - complete[missing]).mean()
+
+    assert error(ball_tree) < 1.2 * error(exact)
+    assert error(ball_tree) < 0.5 * error(median)
+
+
+def test_ball_trees_are_built_in_fit_and_reused(monkeypatch):
+    X, _ = matrix_with_gaps()
+    strategy = BallTreeKNNStrategy(max_patterns=3).fit(X[:1_000])
+    assert len(strategy.trees) == 3
+
+    built = []
+    original_fit = imputation.NearestNeighbors.fit
+    monkeypatch.setattr(imputation.NearestNeighbors, "fit",
+                        lambda self, *args: built.append(1) or original_fit(self, *args))
+    for start in range(1_000, 2_000, 250):
+        assert not np.isnan(strategy.transform(X[start:start + 250])).any()
+    assert built == []
+
+
+def test_ball_tree_falls_back_to_medians_without_donors():
+    X = np.array([[1.0, np.nan], [np.nan, 2.0], [3.0, np.nan]])
+    filled = BallTreeKNNStrategy().fit(X).transform(X)
+    np.testing.assert_array_equal(filled, [[1.0, 2.0], [2.0, 2.0], [3.0, 2.0]])
+
+
+def test_selection_degrades_with_size():
+    assert select_imputation_strategy(1_000, 100, 5) == "knn"
+    assert select_imputation_strategy(2_000_000, 200_000, 5) != "knn"
+    assert select_imputation_strategy(10 ** 9, 10 ** 8, 50) == "median"
+    with pytest.raises(ValueError):
+        create_imputer(np.zeros((2, 2)), "nope")
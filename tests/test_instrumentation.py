@@ -0,0 +1,54 @@
+import json
+import time
+
+import pytest
+
+from pre_processing.modules.instrumentation import MetricsRegistry, StageProfiler, add_performance_section
+
+
+def test_stages_are_timed_and_reported_as_progress():
+    events = []
+    registry = MetricsRegistry(None)
+    profiler = StageProfiler(progress=lambda stage, fraction: events.append((stage, fraction)), registry=registry)
+    with profiler.stage("load", 0.0) as record:
+        time.sleep(0.05)
+        record["rows_out"] = 10
+    with profiler.stage("clean", 0.5, rows_in=10) as record:
+        record["rows_out"] = 8
+
+    assert events == [("load", 0.0), ("clean", 0.5)]
+    report = profiler.report()
+    assert [stage["stage"] for stage in report["stages"]] == ["load", "clean"]
+    assert report["stages"][0]["wall_seconds"] >= 0.05
+    assert report["total_wall_seconds"] >= 0.05
+    assert registry.totals["clean"]["rows_in"] == 10
+    assert registry.totals["clean"]["rows_out"] == 8
+
+
+def test_failed_stages_are_still_recorded():
+    profiler = StageProfiler(registry=MetricsRegistry(None))
+    with pytest.raises(RuntimeError):
+        with profiler.stage("broken"):
+            raise RuntimeError
+    assert [stage["stage"] for stage in profiler.stages] == ["broken"]
+
+
+def test_registry_renders_totals_across_instances(tmp_path):
+    record = {"stage": "load", "wall_seconds": 1.5, "cpu_seconds": 1.0, "rows_in": None, "rows_out": 10,
+              "rss_delta_bytes": 100, "stage_peak_rss_bytes": 200}
+    MetricsRegistry(str(tmp_path)).observe(record)
+    MetricsRegistry(str(tmp_path)).observe(record)
+
+    text = MetricsRegistry(str(tmp_path)).render()
+    assert 'datadome_stage_runs_total{stage="load"} 2' in text
+    assert 'datadome_stage_wall_seconds_total{stage="load"} 3.0' in text
+    assert 'datadome_stage_rows_out_total{stage="load"} 20' in text
+    assert 'datadome_stage_max_peak_rss_bytes{stage="load"} 200' in text
+    assert "# TYPE datadome_stage_runs_total counter" in text
+
+
+def test_performance_section_is_added_to_the_report(tmp_path):
+    path = tmp_path / "profiling_report.json"
+    path.write_text(json.dumps({"duplicates": {}}))
+    add_performance_section(str(path), {"stages": []})
+    assert json.loads(path.read_text()) == {"duplicates": {}, "performance": {"stages": []}}
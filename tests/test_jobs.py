@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from app.jobs import JobCancelled, JobManager, JobQueueFull, ProgressReporter
+
+
+def report_stages(value, progress):
+    progress("first", 0.0)
+    progress("second", 0.5)
+    return value * 2
+
+
+def wait_for_progress(seconds, progress):
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        progress("waiting")
+        time.sleep(0.05)
+    return "finished"
+
+
+def fail(progress):
+    raise RuntimeError("broken")
+
+
+def wait_until_done(manager, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = manager.status(job_id)
+        if status["state"] in ("done", "failed", "cancelled"):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=1, max_queued=1)
+    yield manager
+    manager.shutdown()
+
+
+def test_progress_reporter_records_events_and_stops_cancelled_jobs():
+    events, cancelled = {"job": []}, {}
+    reporter = ProgressReporter("job", events, cancelled)
+    reporter("load", 0.1)
+    assert [event["stage"] for event in events["job"]] == ["load"]
+    cancelled["job"] = True
+    with pytest.raises(JobCancelled):
+        reporter("next", 0.2)
+
+
+def test_job_result_progress_and_ownership(manager):
+    job_id = manager.submit("double", report_stages, 21, owner="workspace")
+    status = wait_until_done(manager, job_id)
+    assert status["state"] == "done"
+    assert [event["stage"] for event in status["events"]] == ["first", "second"]
+    assert manager.result(job_id) == 42
+    assert manager.get(job_id, owner="workspace") is not None
+    assert manager.get(job_id, owner="someone else") is None
+
+
+def test_failed_jobs_report_their_error(manager):
+    status = wait_until_done(manager, manager.submit("fail", fail))
+    assert status["state"] == "failed"
+    assert "broken" in status["error"]
+
+
+def test_queue_limit_and_cancellation(manager):
+    running = manager.submit("wait", wait_for_progress, 30, owner="a")
+    queued = manager.submit("wait", wait_for_progress, 30, owner="b")
+    assert manager.active_owners() == {"a", "b"}
+    with pytest.raises(JobQueueFull):
+        manager.submit("wait", wait_for_progress, 30)
+
+    assert manager.cancel(queued)
+    assert manager.cancel(running)
+    assert wait_until_done(manager, running)["state"] == "cancelled"
+    assert wait_until_done(manager, queued)["state"] == "cancelled"
+    assert manager.active_owners() == set()
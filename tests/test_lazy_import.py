@@ -0,0 +1,32 @@
+import os
+import json
+import subprocess
+import sys
+
+from benchmarks.bench_startup import HEAVY_MODULES
+from utils.lazy_import import LazyModule, import_object, module_available
+
+
+def test_lazy_module_imports_on_first_use():
+    sys.modules.pop("colorsys", None)
+    module = LazyModule("colorsys")
+    assert "colorsys" not in sys.modules
+    assert "not loaded" in repr(module)
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules
+    assert "(loaded)" in repr(module)
+
+
+def test_import_helpers():
+    assert import_object("collections.OrderedDict").__name__ == "OrderedDict"
+    assert module_available("json")
+    assert not module_available("no_such_module_here")
+
+
+def test_app_starts_without_heavy_modules(tmp_path):
+    probe = ("import json, sys, app.app; "
+             f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))")
+    completed = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True,
+                               env={"DATADOME_WORKSPACE_ROOT": str(tmp_path)},
+                               cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert json.loads(completed.stdout.strip().splitlines()[-1]) == []
@@ -0,0 +1,164 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pre_processing import models
+from pre_processing.model_registry import FittedModelCache, ModelRegistry, model_registry
+from pre_processing.model_search import FoldCache, ModelSearch, candidate_params
+from pre_processing.model_store import ArtifactStore, ModelArtifact, predict_batches
+from pre_processing.modules.result_cache import CleanedDatasetCache
+from pre_processing.modules.transformation import UNKNOWN_CODE, PreprocessingPipeline
+
+TARGET = "Compressive Strength (28-day)(Mpa)"
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=200)
+    return pd.DataFrame({
+        "x": x,
+        "colour": rng.choice(["red", "green", "blue"], 200),
+        "y": 3 * x + rng.normal(scale=0.1, size=200),
+    })
+
+
+@pytest.fixture
+def pipeline(frame):
+    return PreprocessingPipeline("y", "prediction", {"x": "float", "colour": "object", "y": "float"}).fit(frame)
+
+
+def test_registry_builds_fresh_estimators():
+    first = model_registry.create("decision_tree")
+    assert first is not model_registry.create("decision_tree")
+    assert first.random_state == 42
+    assert model_registry.create("decision_tree", max_depth=3).max_depth == 3
+    assert model_registry.create("random_forest", n_jobs=1).n_jobs == 1
+    # n_jobs is dropped for estimators without it
+    model_registry.create("decision_tree", n_jobs=4)
+    with pytest.raises(ValueError):
+        model_registry.create("nope")
+
+
+def test_registry_imports_factories_lazily():
+    registry = ModelRegistry()
+    registry.register("missing", "no_such_package.Model")
+    assert "missing" in registry
+    with pytest.raises(ImportError):
+        registry.create("missing")
+
+
+def test_fitted_model_cache_is_lru():
+    cache = FittedModelCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_fold_cache_shares_folds():
+    X, y = np.arange(40.0).reshape(20, 2), np.arange(20.0)
+    cache = FoldCache(max_entries=1)
+    folds = cache.get("data", X, y, "prediction", 4)
+    assert len(folds) == 4
+    assert sum(len(fold[3]) for fold in folds) == 20
+    assert cache.get("data", X, y, "prediction", 4) is folds
+    cache.get("other", X, y, "prediction", 4)
+    assert cache.get("data", X, y, "prediction", 4) is not folds
+
+
+@pytest.mark.parametrize("strategy", ["grid", "halving"])
+def test_search_finds_a_better_candidate(strategy):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 3))
+    y = np.sin(3 * X[:, 0]) + 0.05 * rng.normal(size=300)
+
+    def score_folds(y_true, y_pred):
+        return {"score": -float(np.mean((y_true - y_pred) ** 2))}
+
+    search = ModelSearch("knn", "prediction", score_folds, "score", n_splits=3, strategy=strategy, n_jobs=1,
+                         cache=FoldCache())
+    report = search.run(f"data-{strategy}", X, y)
+    assert report["Search"] == strategy
+    assert report["Timing"]["Candidates Planned"] == len(candidate_params("knn", "grid"))
+    baseline = next(entry for entry in report["Candidates"] if entry["Params"] == {})
+    assert report["Metrics"]["score"]["mean"] >= baseline["Score"]
+    if strategy == "halving":
+        assert report["Timing"]["Candidates Evaluated"] == report["Timing"]["Candidates Planned"]
+        assert report["Timing"]["Rung Fits"] > report["Timing"]["Candidates Planned"]
+    with pytest.raises(ValueError):
+        ModelSearch("knn", "prediction", score_folds, "score", strategy="nope")
+
+
+def test_pipeline_transforms_new_rows_without_refitting(pipeline, frame, tmp_path):
+    X = pipeline.transform(frame)
+    assert list(X.columns) == ["x", "colour", "y"]
+    assert X["x"].mean() == pytest.approx(0, abs=1e-9)
+    assert set(X["colour"]) == {0, 1, 2}
+
+    rows = pd.DataFrame({"x": ["1.5", None], "colour": ["purple", "red"]})
+    features = pipeline.transform_features(rows)
+    assert features["colour"].tolist() == [UNKNOWN_CODE, pipeline.categories["colour"].tolist().index("red")]
+    assert not features["x"].isna().any()
+
+    loaded = PreprocessingPipeline.load(pipeline.save(str(tmp_path / "pipeline.joblib")))
+    pd.testing.assert_frame_equal(loaded.transform_features(rows), features)
+    np.testing.assert_allclose(pipeline.inverse_transform_target(pipeline.transform_target(frame["y"])), frame["y"])
+
+
+def test_artifacts_round_trip_and_score_batches(pipeline, frame, tmp_path):
+    model = model_registry.create("linear_regression").fit(pipeline.transform_features(frame),
+                                                           pipeline.transform_target(frame["y"]))
+    store = ArtifactStore(str(tmp_path / "models"), loaded=FittedModelCache())
+    artifact_id = store.save("linear-test", ModelArtifact(model, pipeline, "linear_regression", "key"))
+    assert store.list()["linear-test"]["target"] == "y"
+    loaded = store.load(artifact_id)
+    assert store.load(artifact_id) is loaded
+    with pytest.raises(KeyError):
+        store.load("../escape")
+    with pytest.raises(KeyError):
+        store.load("unknown")
+
+    rows = frame.drop(columns="y")
+    scored = pd.concat(predict_batches(loaded, (rows.iloc[i:i + 64] for i in range(0, len(rows), 64))))
+    assert len(scored) == len(rows)
+    np.testing.assert_allclose(scored["prediction"], frame["y"], atol=0.5)
+
+
+def test_predict_endpoint_streams_csv(pipeline, frame):
+    from app.app import app, workspace_manager
+    from pre_processing.model_store import artifact_store
+
+    workspace = workspace_manager.create()
+    model = model_registry.create("linear_regression").fit(pipeline.transform_features(frame),
+                                                           pipeline.transform_target(frame["y"]))
+    artifact_store(workspace.output_dir).save("linear-test", ModelArtifact(model, pipeline, "linear_regression"))
+
+    client = app.test_client()
+    headers = {"X-Workspace-ID": workspace.id}
+    body = frame.drop(columns="y").head(25).to_csv(index=False)
+    response = client.post("/predict/linear-test?chunksize=10", data=body, content_type="text/csv", headers=headers)
+    assert response.status_code == 200
+    scored = pd.read_csv(io.StringIO(response.get_data(as_text=True)))
+    assert len(scored) == 25
+    assert list(scored.columns) == ["x", "colour", "prediction"]
+    assert client.post("/predict/unknown", data=body, content_type="text/csv", headers=headers).status_code == 404
+    assert "linear-test" in client.get("/predict/models", headers=headers).get_json()
+
+
+def test_train_all_models_ranks_models_on_one_split(sample_csv, tmp_path, monkeypatch):
+    monkeypatch.setattr(models, "cleaned_cache", CleanedDatasetCache(str(tmp_path / "cache")))
+    leaderboard = models.train_all_models(sample_csv, ["linear_regression", "decision_tree", "nope"], "prediction",
+                                          TARGET, gen_syn_data=False, output_dir=str(tmp_path),
+                                          rules_path=str(tmp_path / "rules.json"), n_jobs=1)
+    assert [entry["Model"] for entry in leaderboard][-1] == "nope"
+    ranked = leaderboard[:2]
+    assert {entry["Model"] for entry in ranked} == {"linear_regression", "decision_tree"}
+    scores = [entry["Performance Metrics"]["R-squared Score"] for entry in ranked]
+    assert scores == sorted(scores, reverse=True)
+    assert all(os.path.exists(tmp_path / "models" / f"{entry['Artifact ID']}.joblib") for entry in ranked)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pre_processing.modules.data_imputer import DataImputer
+from pre_processing.modules.outlier_detection import (
+    DBSCANDetector, OUTLIER_BACKENDS, SubsampleDBSCANDetector, create_outlier_detector, select_outlier_backend
+)
+
+
+def points_with_outliers(n=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 2))
+    X[:10] = rng.uniform(15, 20, size=(10, 2))
+    return X
+
+
+@pytest.mark.parametrize("backend", list(OUTLIER_BACKENDS))
+def test_every_backend_flags_far_points(backend):
+    X = points_with_outliers()
+    mask = create_outlier_detector(backend, eps=0.5).fit(X).predict(X)
+    assert mask[:10].all()
+    assert mask[10:].mean() < 0.05
+
+
+def test_dbscan_predict_matches_fit_predict():
+    X = points_with_outliers(n=1_000)
+    detector = DBSCANDetector(eps=0.5)
+    np.testing.assert_array_equal(detector.fit_predict(X), DBSCANDetector(eps=0.5).fit(X).predict(X))
+
+
+def test_subsample_dbscan_agrees_with_exact_dbscan():
+    X = points_with_outliers(n=20_000)
+    exact = DBSCANDetector(eps=0.3).fit_predict(X)
+    subsampled = SubsampleDBSCANDetector(eps=0.3, sample_size=5_000).fit_predict(X)
+    assert (exact != subsampled).mean() < 0.01
+
+
+def test_backend_selection_by_rows():
+    assert select_outlier_backend(10_000) == "dbscan"
+    assert select_outlier_backend(500_000) == "dbscan_subsample"
+    assert select_outlier_backend(5_000_000) == "robust_zscore"
+    with pytest.raises(ValueError):
+        create_outlier_detector("nope")
+
+
+def test_impute_missing_values_removes_outliers_and_reports_them():
+    X = points_with_outliers(n=500)
+    df = pd.DataFrame({"a": X[:, 0], "b": X[:, 1], "label": ["x"] * 500})
+    imputer = DataImputer()
+    clean = imputer.impute_missing_values(df, {"a": "float", "b": "float", "label": "object"}, backend="iqr")
+    assert set(range(10)) <= set(imputer.outlier_report["outlier_indices"])
+    assert len(clean) == 500 - imputer.outlier_report["outliers_removed"]
@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+
+from pre_processing.modules.plotting import lttb, render_results
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    y = np.sin(np.linspace(0, 20, 10_000))
+    y[4_321] = 50
+    kept = lttb(y, 200)
+    assert len(kept) == 200
+    assert kept[0] == 0 and kept[-1] == len(y) - 1
+    assert np.all(np.diff(kept) > 0)
+    assert 4_321 in kept
+    # The decimated line spans the same range as the original
+    assert y[kept].min() < -0.99
+
+
+def test_lttb_returns_everything_for_short_series():
+    np.testing.assert_array_equal(lttb(np.arange(10.0), 20), np.arange(10))
+    np.testing.assert_array_equal(lttb(np.arange(10.0), 2), np.arange(10))
+
+
+def test_rendered_figures_are_cached(tmp_path):
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=20_000)
+    panels = [(y, y + rng.normal(scale=0.1, size=y.size), "model a"),
+              (y, y + rng.normal(scale=0.2, size=y.size), "model b")]
+    first = render_results(panels, str(tmp_path / "first.jpeg"))
+    cached = os.listdir(tmp_path / "plots")
+    assert len(cached) == 1
+
+    render_results(panels, str(tmp_path / "second.jpeg"))
+    assert os.listdir(tmp_path / "plots") == cached
+    assert open(first, "rb").read() == open(tmp_path / "second.jpeg", "rb").read()
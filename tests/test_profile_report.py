@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.profile_report import ProfileCache, dataset_summary, profile_report, sample_rows
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "group": np.where(np.arange(1_000) < 950, "common", "rare"),
+        "value": rng.normal(size=1_000),
+        "label": rng.choice(["x", "y"], 1_000),
+    })
+
+
+def test_stratified_sample_keeps_group_shares(frame):
+    sample = sample_rows(frame, 100, stratify="group")
+    assert sample["group"].value_counts().to_dict() == {"common": 95, "rare": 5}
+    assert sample.index.is_monotonic_increasing
+    assert len(sample_rows(frame, 100)) == 100
+    assert sample_rows(frame, 0) is frame
+
+
+def test_summary_matches_pandas(frame):
+    frame.loc[:9, "value"] = np.nan
+    summary = dataset_summary(frame)
+    assert summary.loc["value", "missing"] == 10
+    assert summary.loc["value", "mean"] == pytest.approx(frame["value"].mean())
+    assert summary.loc["group", "top"] == "common"
+    assert summary.loc["group", "top_freq"] == 950
+
+
+def test_summary_report_is_cached(frame, tmp_path):
+    data_path = str(tmp_path / "data.csv")
+    frame.to_csv(data_path, index=False)
+    cache = ProfileCache(str(tmp_path / "profiles"), max_entries=2)
+
+    first = profile_report(data_path, str(tmp_path / "first.html"), mode="summary", cache=cache)
+    assert "<table" in open(first).read()
+    key = cache.key(data_path, {"mode": "summary", "sample_size": None, "stratify": None})
+    assert cache.get(key) is not None
+
+    second = profile_report(data_path, str(tmp_path / "second.html"), mode="summary", cache=cache)
+    assert open(first).read() == open(second).read()
+    with pytest.raises(ValueError):
+        profile_report(data_path, str(tmp_path / "bad.html"), mode="nope", cache=cache)
+
+
+def test_profile_cache_evicts_oldest(tmp_path):
+    source = tmp_path / "report.html"
+    source.write_text("<html></html>")
+    cache = ProfileCache(str(tmp_path / "profiles"), max_entries=2)
+    for number, key in enumerate(["a", "b", "c"]):
+        cache.put(key, str(source))
+        os.utime(cache._path(key), (number, number))
+    cache.evict()
+    assert cache.get("a") is None
+    assert cache.get("b") is not None and cache.get("c") is not None
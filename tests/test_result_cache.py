@@ -0,0 +1,89 @@
+import os
+import json
+
+import pandas as pd
+
+from pre_processing import models
+from pre_processing.modules.result_cache import CleanedDatasetCache
+from pre_processing.modules.schema import DatasetSchema
+
+
+def write_csv(path, values):
+    pd.DataFrame({"a": values}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_miss_then_hit(tmp_path):
+    cache = CleanedDatasetCache(str(tmp_path / "cache"))
+    data = write_csv(tmp_path / "data.csv", [1, 2, 3])
+    key = cache.key(data, {"target": "a"})
+    assert cache.get(key) is None
+
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+    assert cache.put(key, df, {"rows": 2}, DatasetSchema({"a": "int", "b": "object"}))
+    cached_df, report, schema = cache.get(key)
+    pd.testing.assert_frame_equal(cached_df, df)
+    assert report == {"rows": 2}
+    assert dict(schema) == {"a": "int", "b": "object"}
+
+
+def test_key_follows_contents_and_parameters(tmp_path):
+    cache = CleanedDatasetCache(str(tmp_path / "cache"))
+    data = write_csv(tmp_path / "data.csv", [1, 2, 3])
+    rules = tmp_path / "rules.json"
+    rules.write_text(json.dumps({"a": {"min": 0}}))
+    key = cache.key(data, {"rules_path": str(rules)})
+
+    assert cache.key(data, {"rules_path": str(rules)}) == key
+    assert cache.key(data, {"rules_path": str(rules), "task": "prediction"}) != key
+    rules.write_text(json.dumps({"a": {"min": 1}}))
+    assert cache.key(data, {"rules_path": str(rules)}) != key
+    unchanged = cache.key(data, {})
+    write_csv(tmp_path / "data.csv", [1, 2, 4])
+    assert cache.key(data, {}) != unchanged
+
+
+def test_directory_is_created_by_the_first_put(tmp_path):
+    cache = CleanedDatasetCache(str(tmp_path / "cache"))
+    assert not os.path.exists(cache.cache_dir)
+    cache.evict()
+    cache.put("key", pd.DataFrame({"a": [1]}), {}, DatasetSchema({"a": "int"}))
+    assert os.path.isdir(cache.cache_dir)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = CleanedDatasetCache(str(tmp_path / "cache"), max_entries=2)
+    schema = DatasetSchema({"a": "int"})
+    for number, key in enumerate(["first", "second"]):
+        cache.put(key, pd.DataFrame({"a": [number]}), {}, schema)
+        os.utime(os.path.join(cache.cache_dir, key), (number, number))
+    cache.put("third", pd.DataFrame({"a": [3]}), {}, schema)
+    assert cache.get("first") is None
+    assert cache.get("second") is not None and cache.get("third") is not None
+
+
+def test_frames_arrow_cannot_store_are_not_cached(tmp_path):
+    cache = CleanedDatasetCache(str(tmp_path / "cache"))
+    df = pd.DataFrame({"mixed": pd.Series(["a", 1], dtype=object)})
+    assert not cache.put("key", df, {}, DatasetSchema({"mixed": "object"}))
+    assert cache.get("key") is None
+
+
+def test_pre_process_data_reuses_the_cleaned_dataset(tmp_path, monkeypatch, sample_csv):
+    monkeypatch.setattr(models, "cleaned_cache", CleanedDatasetCache(str(tmp_path / "cache")))
+    calls = []
+    run_pipeline = models.main
+    monkeypatch.setattr(models, "main", lambda *args, **kwargs: calls.append(1) or run_pipeline(*args, **kwargs))
+
+    first_dir, second_dir = tmp_path / "first", tmp_path / "second"
+    first_dir.mkdir()
+    second_dir.mkdir()
+    df, schema = models.pre_process_data(sample_csv, gen_syn_data=False, output_dir=str(first_dir), rules_path=None)
+    cached_df, cached_schema = models.pre_process_data(sample_csv, gen_syn_data=False, output_dir=str(second_dir),
+                                                       rules_path=None)
+
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(cached_df, df.reset_index(drop=True))
+    assert dict(cached_schema) == dict(schema)
+    with open(first_dir / "profiling_report.json") as f, open(second_dir / "profiling_report.json") as g:
+        assert json.load(f) == json.load(g)
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pre_processing.modules.rule_based_cleaning import RuleEngine, compile_rules
+
+
+@pytest.fixture
+def orders():
+    return pd.DataFrame({
+        "quantity": [1, 5, -2, 40, np.nan],
+        "status": ["open", "closed", "open", "void", "open"],
+        "code": ["A-1", "B-2", "bad", "C-3", "D-4"],
+        "start": [1, 2, 3, 4, 5],
+        "end": [2, 1, 4, 5, 6],
+    })
+
+
+def test_column_rules_drop_violations_and_keep_nulls(orders):
+    engine = RuleEngine({
+        "quantity": {"min": 0, "max": 10},
+        "status": {"forbidden": ["void"]},
+        "code": {"pattern": r"^[A-Z]-\d$"},
+    })
+    kept = engine.apply(orders)
+    assert kept.index.tolist() == [0, 1, 4]
+    assert engine.report["rows_in"] == 5 and engine.report["rows_out"] == 3
+    assert engine.report["violations"] == {
+        "quantity: range": 2, "status: forbidden": 1, "code: pattern": 1,
+    }
+
+
+def test_null_policy_drop(orders):
+    kept = RuleEngine({"quantity": {"nulls": "drop"}}).apply(orders)
+    assert kept.index.tolist() == [0, 1, 2, 3]
+
+
+def test_form_values_compare_as_numbers_on_numeric_columns(orders):
+    kept = RuleEngine({"start": {"allowed": ["1", "2"]}}).apply(orders)
+    assert kept.index.tolist() == [0, 1]
+
+
+def test_expressions_compare_columns(orders):
+    engine = RuleEngine({"_expressions": ["start <= end"]})
+    assert engine.apply(orders).index.tolist() == [0, 2, 3, 4]
+
+
+def test_expressions_on_32_bit_columns_do_not_wrap():
+    df = pd.DataFrame({"a": np.array([2 ** 30, 1], dtype=np.int32)})
+    kept = RuleEngine({"_expressions": ["a * 4 > 0"]}).apply(df)
+    assert kept.index.tolist() == [0, 1]
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('true')",
+    "quantity.__class__",
+    "quantity[0] > 1",
+    "@quantity > 1",
+    "(lambda: 1)() == 1",
+    "[x for x in quantity]",
+])
+def test_expressions_outside_the_whitelist_are_rejected(expression):
+    with pytest.raises(ValueError):
+        compile_rules({"_expressions": [expression]})
+
+
+@pytest.mark.parametrize("rules", [
+    {"quantity": {"min": 5, "max": 1}},
+    {"quantity": {"min": 1, "max": "2024-01-01"}},
+    {"quantity": {"unknown": 1}},
+    {"quantity": {"allowed": "open"}},
+    {"quantity": {"pattern": "("}},
+    {"_nulls": "sometimes"},
+])
+def test_malformed_rules_are_rejected(rules):
+    with pytest.raises(ValueError):
+        compile_rules(rules)
+
+
+def test_rules_on_missing_columns_are_skipped(orders):
+    engine = RuleEngine({"missing": {"min": 0}, "_expressions": ["missing > 0"]})
+    assert len(engine.apply(orders)) == len(orders)
+    assert set(engine.report["skipped"]) == {"missing: range", "expression: missing > 0"}
+
+
+def test_report_accumulates_across_chunks(orders):
+    engine = RuleEngine({"quantity": {"min": 0}})
+    kept = pd.concat([engine.apply(orders.iloc[:2]), engine.apply(orders.iloc[2:])])
+    assert kept.index.tolist() == [0, 1, 3, 4]
+    assert engine.report["violations"]["quantity: range"] == 1
+    assert engine.report["rows_in"] == 5
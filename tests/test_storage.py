@@ -0,0 +1,83 @@
+import os
+
+import pandas as pd
+import pytest
+
+from utils.dataset_cache import DatasetCache
+from utils.storage import convert_upload, export_csv, iter_dataset_batches, read_dataset, write_dataset, write_output
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({"a": range(10), "b": [f"v{i}" for i in range(10)], "c": [i / 4 for i in range(10)]})
+
+
+@pytest.mark.parametrize("extension", [".feather", ".parquet", ".csv"])
+def test_round_trip(frame, tmp_path, extension):
+    path = write_dataset(frame, str(tmp_path / f"data{extension}"))
+    pd.testing.assert_frame_equal(read_dataset(path), frame)
+    pd.testing.assert_frame_equal(read_dataset(path, columns=["a"]), frame[["a"]])
+
+
+def test_unsupported_format(frame, tmp_path):
+    with pytest.raises(ValueError):
+        write_dataset(frame, str(tmp_path / "data.txt"))
+    with pytest.raises(ValueError):
+        read_dataset(str(tmp_path / "data.txt"))
+
+
+def test_write_output_falls_back_to_csv_for_mixed_columns(frame, tmp_path):
+    assert write_output(frame, str(tmp_path / "clean.csv")).endswith(".parquet")
+    mixed = pd.DataFrame({"a": [1, "x", 2.5]})
+    assert write_output(mixed, str(tmp_path / "mixed.csv")).endswith(".csv")
+
+
+def test_convert_upload_replaces_the_source(frame, tmp_path):
+    source = str(tmp_path / "upload.csv")
+    frame.to_csv(source, index=False)
+    target = convert_upload(source, str(tmp_path / "upload.feather"))
+    assert target.endswith(".feather")
+    assert not os.path.exists(source)
+    pd.testing.assert_frame_equal(read_dataset(target), frame)
+    assert read_dataset(export_csv(target, str(tmp_path / "export.csv"))).equals(frame)
+
+
+@pytest.mark.parametrize("extension", [".feather", ".csv"])
+def test_batches_carry_a_running_index(frame, tmp_path, extension):
+    path = write_dataset(frame, str(tmp_path / f"data{extension}"))
+    batches = list(iter_dataset_batches(path, chunksize=4))
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    pd.testing.assert_frame_equal(pd.concat(batches), frame)
+
+
+def test_dataset_cache_parses_each_version_once(frame, tmp_path):
+    path = write_dataset(frame, str(tmp_path / "data.feather"))
+    cache = DatasetCache()
+    calls = []
+
+    def derive(df):
+        calls.append(1)
+        return df["a"].sum()
+
+    assert cache.get(path) is not cache.get(path)
+    assert len(cache._entries) == 1
+    assert cache.derive(path, "total", derive) == cache.derive(path, "total", derive) == 45
+    assert len(calls) == 1
+
+    write_dataset(frame.head(3), path)
+    assert cache.derive(path, "total", derive) == 3
+    assert len(calls) == 2
+    # The rewritten file replaces the stale entry
+    assert len(cache._entries) == 1
+
+
+def test_dataset_cache_evicts_least_recently_used(frame, tmp_path):
+    paths = [write_dataset(frame, str(tmp_path / f"data{i}.feather")) for i in range(3)]
+    size = int(frame.memory_usage(index=True, deep=True).sum())
+    cache = DatasetCache(max_bytes=2 * size)
+    for path in paths[:2]:
+        cache.get(path)
+    cache.get(paths[0])
+    cache.get(paths[2])
+    assert [key[0] for key in cache._entries] == [os.path.abspath(paths[0]), os.path.abspath(paths[2])]
+    assert cache.total_bytes <= cache.max_bytes
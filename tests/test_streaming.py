@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from pre_processing.main import main
+from pre_processing.modules.data_imputer import DataImputer
+from pre_processing.streaming import IndexLog, main_streaming, sample_dataset
+
+
+def test_index_log_round_trip(tmp_path):
+    log = IndexLog(str(tmp_path / "indices.int64"))
+    log.extend([])
+    assert log.reported_path() is None
+    log.extend([3, 1])
+    log.extend(np.array([7]))
+    assert log.count == 3
+    assert np.fromfile(log.reported_path(), dtype=np.int64).tolist() == [3, 1, 7]
+
+
+def test_sample_is_uniform_and_bounded(table_csv):
+    sample, total_rows = sample_dataset(table_csv, chunksize=500, sample_size=1_000)
+    assert total_rows == 3_000
+    assert len(sample) == 1_000
+    assert sample.index.is_unique
+    # Every chunk is represented, not just the first ones
+    assert sample.index.max() > 2_500
+
+
+def test_streaming_report_matches_in_memory(table_csv, tmp_path):
+    memory_dir, stream_dir = tmp_path / "memory", tmp_path / "stream"
+    memory_dir.mkdir()
+    stream_dir.mkdir()
+    df, memory_report, memory_schema = main(table_csv, str(memory_dir))
+    path, stream_report, stream_schema = main_streaming(table_csv, str(stream_dir), chunksize=700,
+                                                        sample_size=10_000)
+
+    assert isinstance(df, pd.DataFrame)
+    assert dict(stream_schema) == dict(memory_schema)
+    assert len(pd.read_csv(path)) == len(df)
+    assert stream_report["duplicates"]["duplicate_count"] == memory_report["duplicates"]["duplicate_count"]
+    duplicates = np.fromfile(stream_report["duplicates"]["duplicate_indices_file"], dtype=np.int64)
+    assert sorted(duplicates.tolist()) == sorted(memory_report["duplicates"]["duplicate_indices"])
+    assert stream_report["missing_values"].keys() == memory_report["missing_values"].keys()
+    for column, info in stream_report["type_validation"].items():
+        assert info["invalid_entries_count"] == memory_report["type_validation"][column]["invalid_entries_count"]
+    assert (stream_report["outlier_detection"]["outliers_removed"]
+            == memory_report["outlier_detection"]["outliers_removed"])
+
+
+def test_synthesis_is_skipped_when_no_sample_row_survives(sample_csv, tmp_path, monkeypatch):
+    monkeypatch.setattr(DataImputer, "predict_outliers", lambda self, df: np.ones(len(df), dtype=bool))
+    _, report, _ = main_streaming(sample_csv, str(tmp_path), chunksize=50, gen_syn_data=True)
+    assert "synthesis" not in [stage["stage"] for stage in report["performance"]["stages"]]
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pre_processing.modules.synthesizer_store import SynthesizerStore, plateau_epoch
+from pre_processing.modules.synthesizers import (
+    CTGANBackend, create_synthesizer, is_imbalanced, select_synthesizer_backend
+)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=500)
+    return pd.DataFrame({
+        "x": x,
+        "y": 2 * x + rng.normal(scale=0.1, size=500),
+        "when": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 365, 500), unit="D"),
+        "label": np.where(np.arange(500) < 450, "common", "rare"),
+    })
+
+
+@pytest.mark.parametrize("backend", ["gaussian_copula", "bootstrap", "smote"])
+def test_fast_backends_keep_columns_and_structure(frame, backend):
+    synthesizer = create_synthesizer(backend).fit(frame, ["label"], target="label")
+    synthetic = synthesizer.sample(400)
+    assert len(synthetic) == 400
+    assert list(synthetic.columns) == list(frame.columns)
+    assert pd.api.types.is_datetime64_any_dtype(synthetic["when"])
+    assert set(synthetic["label"]) <= {"common", "rare"}
+    assert np.corrcoef(synthetic["x"], synthetic["y"])[0, 1] > 0.9
+
+
+def test_smote_rebalances_the_target(frame):
+    synthetic = create_synthesizer("smote").fit(frame, ["label"], target="label").sample(400)
+    assert synthetic["label"].value_counts()["rare"] == 400
+
+
+def test_backend_selection():
+    assert select_synthesizer_backend(1_000, 10, imbalanced_target=True) == "smote"
+    assert select_synthesizer_backend(1_000, 10, time_budget=60) == "ctgan"
+    assert select_synthesizer_backend(10 ** 6, 50, time_budget=60) in ("gaussian_copula", "bootstrap")
+    assert select_synthesizer_backend(10 ** 9, 500, time_budget=1) == "bootstrap"
+    assert is_imbalanced(pd.Series(["a"] * 10 + ["b"]))
+    with pytest.raises(ValueError):
+        create_synthesizer("nope")
+
+
+def test_ctgan_epochs_follow_the_plateau_and_budget():
+    backend = CTGANBackend(epochs=300, time_budget=10)
+    assert backend.plan_epochs(1_000, {}) == 50
+    assert backend.plan_epochs(1_000, {"plateau_epoch": 20, "seconds_per_row_epoch": 1e-6}) == 35
+    assert CTGANBackend(epochs=300).plan_epochs(10 ** 9, {}) == 300
+
+
+def test_plateau_epoch():
+    epochs = np.arange(200)
+    losses = pd.Series(np.where(epochs < 60, 10 - epochs / 6, 0.0))
+    assert 55 <= plateau_epoch(losses) <= 70
+    assert plateau_epoch(pd.Series(np.linspace(10, 0, 200))) is None
+    assert plateau_epoch(pd.Series([1.0, 2.0])) is None
+
+
+def test_store_keys_and_stats(tmp_path):
+    store = SynthesizerStore(str(tmp_path / "store"))
+    key = store.key("data", "metadata", {"epochs": 10})
+    assert key == store.key("data", "metadata", {"epochs": 10})
+    assert key != store.key("data", "metadata", {"epochs": 20})
+    assert store.load(key) is None
+    store.save_stats("metadata", {"plateau_epoch": 12})
+    assert store.load_stats("metadata") == {"plateau_epoch": 12}
+    assert store.load_stats("other") == {}
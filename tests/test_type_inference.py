@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from pre_processing.modules.data_cleaner import DataCleaner
+from pre_processing.modules.dtype_optimization import optimize_dtypes
+from pre_processing.modules.pre_processing_utils import coerce_column, infer_column_type
+
+
+def test_dirty_numeric_strings_become_numbers():
+    series = pd.Series([f" ${value} " if value % 7 == 0 else str(value) for value in range(100)])
+    converted, column_type = infer_column_type(series)
+    assert column_type == "int"
+    assert converted.iloc[:8].tolist() == [0, 1, 2, 3, 4, 5, 6, 7]
+
+    converted, column_type = infer_column_type(pd.concat([series, pd.Series(["n/a"])], ignore_index=True))
+    assert column_type == "float"
+    assert converted.isna().tolist() == [False] * 100 + [True]
+
+
+def test_floats_booleans_datetimes_and_text():
+    assert infer_column_type(pd.Series(np.linspace(0, 1, 50)))[1] == "float"
+    assert infer_column_type(pd.Series(["true", "false", "True"] * 5))[1] == "boolean"
+    assert infer_column_type(pd.Series(pd.date_range("2024-01-01", periods=20).astype(str)))[1] == "datetime"
+    converted, column_type = infer_column_type(pd.Series(["red", "green", "blue"] * 10))
+    assert column_type == "object"
+    assert converted.iloc[0] == "red"
+
+
+def test_low_cardinality_numbers_are_categorical():
+    assert infer_column_type(pd.Series([1, 2, 3] * 50))[1] == "object"
+
+
+def test_sampled_inference_matches_full_inference():
+    series = pd.Series([str(value) for value in range(5_000)])
+    full, full_type = infer_column_type(series)
+    sampled, sampled_type = infer_column_type(series, sample_size=500)
+    assert sampled_type == full_type == "int"
+    pd.testing.assert_series_equal(sampled, full)
+
+
+def test_sampled_inference_falls_back_when_the_sample_misleads():
+    series = pd.Series([str(value) for value in range(1_000)] + ["not a number"] * 1_000)
+    _, column_type = infer_column_type(series, sample_size=10, random_state=0)
+    assert column_type == infer_column_type(series)[1]
+
+
+def test_validation_reports_values_that_do_not_parse():
+    df = pd.DataFrame({"amount": [str(value) for value in range(30)] + ["oops"]})
+    cleaner = DataCleaner()
+    typed, schema = cleaner.infer_and_validate_column_types(df)
+    assert schema["amount"] == "float"
+    report = cleaner.type_validation_report["amount"]
+    assert report["invalid_entries_count"] == 1
+    assert report["invalid_entry_indices"] == [30]
+
+
+def test_coerce_column_applies_a_fitted_type():
+    coerced = coerce_column(pd.Series(["1", "2", "x"]), "int")
+    assert coerced.isna().tolist() == [False, False, True]
+
+
+def test_optimize_dtypes_keeps_integers_at_32_bits_or_wider():
+    df = pd.DataFrame({
+        "small": np.arange(100, dtype=np.int64) % 3,
+        "large": np.arange(100, dtype=np.int64) * 10 ** 10,
+        "ratio": np.arange(100) / 4,
+        "colour": ["red", "blue"] * 50,
+        "mixed": pd.Series(["a", 1] * 50, dtype=object),
+    })
+    compacted, _ = optimize_dtypes(df)
+    assert compacted["small"].dtype == np.int32
+    assert compacted["large"].dtype == np.int64
+    assert compacted["ratio"].dtype == np.float32
+    assert isinstance(compacted["colour"].dtype, pd.CategoricalDtype)
+    assert compacted["mixed"].dtype == object
+    pd.testing.assert_frame_equal(compacted.astype(object), df.astype(object), check_dtype=False)
+
+
+def test_lossy_floats_are_not_downcast():
+    df = pd.DataFrame({"precise": [0.1, 0.2, 1 / 3]})
+    assert optimize_dtypes(df)[0]["precise"].dtype == np.float64
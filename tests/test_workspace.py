@@ -0,0 +1,96 @@
+import os
+from unittest import mock
+
+import pytest
+import requests
+
+from app.workspace import Workspace, WorkspaceManager, WorkspaceQuotaExceeded
+
+
+class FakeResponse:
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        yield from self.chunks
+        if self.error is not None:
+            raise self.error
+
+
+def test_workspaces_are_isolated(tmp_path):
+    manager = WorkspaceManager(str(tmp_path))
+    first, second = manager.create(), manager.create()
+    assert first.id != second.id
+    assert first.upload_path != second.upload_path
+    first.set_state("checkbox", True)
+    assert first.get_state("checkbox") is True
+    assert second.get_state("checkbox") is None
+
+
+def test_invalid_ids_are_rejected(tmp_path):
+    manager = WorkspaceManager(str(tmp_path))
+    assert manager.get("../etc") is None
+    assert manager.get(None) is None
+
+
+def test_quota_counts_the_replaced_file(tmp_path):
+    workspace = Workspace("a" * 32, str(tmp_path / "a"), quota_bytes=1_000)
+    with open(workspace.upload_path, "wb") as f:
+        f.write(b"x" * 800)
+    workspace.check_quota(incoming_bytes=900, replacing=workspace.upload_path)
+    with pytest.raises(WorkspaceQuotaExceeded):
+        workspace.check_quota(incoming_bytes=900)
+
+
+def test_cleanup_removes_expired_workspaces_without_running_jobs(tmp_path):
+    busy = set()
+    manager = WorkspaceManager(str(tmp_path), ttl_seconds=60, in_use=lambda: busy)
+    expired, active, fresh = manager.create(), manager.create(), manager.create()
+    for workspace in (expired, active):
+        os.utime(workspace.root, (0, 0))
+    busy.add(active.id)
+
+    manager.cleanup()
+    assert sorted(os.listdir(tmp_path)) == sorted([active.id, fresh.id])
+
+
+@pytest.fixture
+def client():
+    from app.app import app
+    return app.test_client()
+
+
+def fetch(client, workspace_id, response):
+    with mock.patch("requests.get", return_value=response):
+        return client.post("/fetch-dataset", json={"url": "http://example.com/data.csv"},
+                           headers={"X-Workspace-ID": workspace_id})
+
+
+def test_fetch_dataset_stores_the_download(client):
+    from app.app import workspace_manager
+    workspace = workspace_manager.create()
+    result = fetch(client, workspace.id, FakeResponse([b"a,b\n", b"1,2\n"]))
+    assert result.status_code == 200
+    assert os.path.exists(workspace.dataset_path)
+    assert not any(name.endswith(".part") for name in os.listdir(workspace.uploads_dir))
+
+
+def test_failed_fetch_leaves_no_partial_file(client):
+    from app.app import workspace_manager
+    workspace = workspace_manager.create()
+    broken = FakeResponse([b"a,b\n"], error=requests.exceptions.ChunkedEncodingError("connection reset"))
+    assert fetch(client, workspace.id, broken).status_code == 500
+    assert os.listdir(workspace.uploads_dir) == []
+
+
+def test_fetch_over_quota_is_rejected_after_the_last_chunk(client, monkeypatch):
+    from app.app import workspace_manager
+    monkeypatch.setattr(workspace_manager, "quota_bytes", 1_000)
+    workspace = workspace_manager.create()
+    # Smaller than the once-per-MB check inside the download loop
+    assert fetch(client, workspace.id, FakeResponse([b"x" * 5_000])).status_code == 413
+    assert os.listdir(workspace.uploads_dir) == []
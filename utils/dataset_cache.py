@@ -0,0 +1,101 @@
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils.storage import read_dataset
+
+DEFAULT_MAX_BYTES = int(os.environ.get("DATADOME_DATASET_CACHE_MB", 512)) * 1024 ** 2
+
+
+class DatasetCache:
+    """
+    In-process LRU of parsed datasets, so the routes and the pipeline that
+    read the same upload parse it once per process.
+
+    Entries are keyed by absolute path, modification time and size, so a
+    re-upload (or any rewrite) is a new entry and stale ones age out. Each
+    entry also memoises values derived from the frame with derive(), such
+    as the type-inferred frame and its schema (see
+    data_loader.infer_dataset_types). Entries are evicted least recently
+    used first once their combined in-memory size, derived frames
+    included, exceeds max_bytes.
+
+    Frames are handed out as shallow copies: callers may add, drop or
+    replace columns, but must not write into a column's values in place.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path):
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+    def _entry(self, path):
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        df = read_dataset(path)
+        entry = {'df': df, 'bytes': int(df.memory_usage(index=True, deep=True).sum()), 'derived': {}}
+        if entry['bytes'] > self.max_bytes:
+            return entry
+
+        with self._lock:
+            # Drop older versions of the same file straight away
+            for stale in [k for k in self._entries if k[0] == key[0] and k != key]:
+                self.total_bytes -= self._entries.pop(stale)['bytes']
+            if key not in self._entries:
+                self._entries[key] = entry
+                self.total_bytes += entry['bytes']
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted['bytes']
+            return self._entries.get(key, entry)
+
+    def get(self, path):
+        """
+        Return the parsed dataset at path, as a shallow copy.
+        """
+        return self._entry(path)['df'].copy(deep=False)
+
+    def derive(self, path, name, func):
+        """
+        Return func(df) for the dataset at path, computed once per version of
+        the file. func receives a shallow copy of the frame; DataFrames in the
+        result (itself or a tuple of values) count towards the cache size.
+        Callers get the memoised value itself and must copy frames before
+        changing them.
+        """
+        entry = self._entry(path)
+        if name not in entry['derived']:
+            value = func(entry['df'].copy(deep=False))
+            parts = value if isinstance(value, tuple) else (value,)
+            size = sum(int(part.memory_usage(index=True, deep=True).sum())
+                       for part in parts if isinstance(part, pd.DataFrame))
+            with self._lock:
+                entry['derived'][name] = value
+                entry['bytes'] += size
+                if self._entries.get(self._key(path)) is entry:
+                    self.total_bytes += size
+                    while self.total_bytes > self.max_bytes:
+                        _, evicted = self._entries.popitem(last=False)
+                        self.total_bytes -= evicted['bytes']
+        return entry['derived'][name]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+dataset_cache = DatasetCache()
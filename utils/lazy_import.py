@@ -0,0 +1,48 @@
+import importlib
+import importlib.util
+import threading
+
+
+class LazyModule:
+    """
+    Stands in for a module and imports it on first attribute access, so
+    heavy dependencies (torch via sdv, ydata_profiling, matplotlib) are only
+    loaded by the processes and features that use them.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule '{self._name}' ({state})>"
+
+
+def import_object(path):
+    """
+    Import 'package.module.Name' and return Name.
+    """
+    module_name, _, attr = path.rpartition('.')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def module_available(name):
+    """
+    Whether a module can be imported, without importing it.
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
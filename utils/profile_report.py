@@ -1,17 +1,177 @@
 import os
+import json
+import html
+import shutil
+import hashlib
+import tempfile
+
+import numpy as np
 import pandas as pd
-from ydata_profiling import ProfileReport
 
-def profile_report(input_file_path):
+from utils.dataset_cache import dataset_cache
+from utils.lazy_import import LazyModule
+from pre_processing.modules.result_cache import file_digest
+
+ydata_profiling = LazyModule('ydata_profiling')
+
+PROFILE_MODES = ('full', 'summary')
+# Rows profiled by the full report; 0 profiles every row
+DEFAULT_SAMPLE_ROWS = int(os.environ.get("DATADOME_PROFILE_SAMPLE_ROWS", 100_000))
+DEFAULT_CACHE_DIR = os.path.join('output', 'profiles')
+DEFAULT_MAX_ENTRIES = 32
+
+
+def sample_rows(df, sample_size, stratify=None, random_state=42):
+    """
+    Random sample of sample_size rows. With stratify naming a column, each of
+    its values (missing included) keeps its share of rows, and at least one.
+    """
+    if not sample_size or len(df) <= sample_size:
+        return df
+    if stratify is None or stratify not in df.columns:
+        return df.sample(n=sample_size, random_state=random_state).sort_index().copy()
+
+    fraction = sample_size / len(df)
+    rng = np.random.default_rng(random_state)
+    groups = df.groupby(stratify, dropna=False, observed=True).indices
+    positions = np.concatenate([
+        rng.choice(group, max(1, round(len(group) * fraction)), replace=False) for group in groups.values()
+    ])
+    return df.iloc[np.sort(positions)].copy()
+
+
+def dataset_summary(df):
+    """
+    One row per column: type, missing and distinct counts, numeric
+    statistics and the most frequent value, from vectorized aggregations.
+    """
+    summary = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'non_null': df.count(),
+        'missing': df.isna().sum(),
+        'distinct': df.nunique(dropna=True),
+    })
+    summary['missing_%'] = (summary['missing'] / max(len(df), 1) * 100).round(2)
+
+    numeric = df.select_dtypes(include=[np.number])
+    if not numeric.empty:
+        stats = numeric.describe(percentiles=[0.25, 0.5, 0.75]).T.drop(columns='count')
+        summary = summary.join(stats)
+
+    others = [column for column in df.columns if column not in numeric.columns]
+    top = {}
+    for column in others:
+        counts = df[column].value_counts(dropna=True)
+        if not counts.empty:
+            top[column] = (counts.index[0], counts.iloc[0])
+    summary['top'] = pd.Series({column: value for column, (value, _) in top.items()}, dtype=object)
+    summary['top_freq'] = pd.Series({column: freq for column, (_, freq) in top.items()}, dtype=float)
+    return summary
+
+
+def render_summary(df, title="Dataset Summary"):
+    summary = dataset_summary(df)
+    table = summary.to_html(float_format=lambda value: f"{value:,.4g}", na_rep="", border=0)
+    duplicates = int(df.duplicated().sum())
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+        "th,td{padding:4px 10px;border-bottom:1px solid #ddd;text-align:right}</style></head><body>"
+        f"<h1>{html.escape(title)}</h1>"
+        f"<p>{len(df):,} rows, {df.shape[1]} columns, {duplicates:,} duplicate rows, "
+        f"{df.memory_usage(deep=True).sum() / 1024 ** 2:,.1f} MB in memory</p>"
+        f"{table}</body></html>"
+    )
+
+
+class ProfileCache:
+    """
+    Rendered profile reports on disk, keyed by the dataset's content hash and
+    the profiling options, so re-posting /generate for the same upload is a
+    file copy. Least recently used reports are dropped beyond max_entries.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def key(self, file_path, options):
+        payload = json.dumps({'data': file_digest(file_path), 'options': options}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.html")
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        os.utime(path)
+        return path
+
+    def put(self, key, source_path):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.tmp-')
+        os.close(fd)
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self):
+        entries = sorted(
+            (entry.stat().st_mtime, entry.path) for entry in os.scandir(self.cache_dir)
+            if entry.name.endswith('.html')
+        )
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            os.remove(path)
+
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+profile_cache = ProfileCache()
+
+
+def profile_report(input_file_path, output_path=r"output\profile_report.html", mode='full',
+                   sample_size=DEFAULT_SAMPLE_ROWS, stratify=None, cache=profile_cache):
+    """
+    Render a profile of the dataset to output_path and return the path.
+
+    mode 'full' runs ydata-profiling on a sample of sample_size rows
+    (stratified on the column named by stratify, if any); 'summary' renders
+    a table of per-column statistics over all rows, in seconds even for
+    large files. Rendered reports are cached by dataset contents and options.
+    """
     # Check if file exists and is not empty
     if not input_file_path or not os.path.exists(input_file_path) or os.path.getsize(input_file_path) == 0:
         raise ValueError("Uploaded file is empty or invalid.")
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}'. Choose from: {', '.join(PROFILE_MODES)}")
+
+    options = {'mode': mode, 'sample_size': sample_size if mode == 'full' else None, 'stratify': stratify}
+    key = cache.key(input_file_path, options) if cache is not None else None
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        shutil.copyfile(cached, output_path)
+        return output_path
 
-    df = pd.read_csv(input_file_path)
+    df = dataset_cache.get(input_file_path)
 
     if df.empty:
         raise ValueError("Uploaded CSV has no data.")
 
-    profile = ProfileReport(df, title="Pandas Profiling Report", minimal=True)
-    profile.to_file(r"output\profile_report.html")
+    if mode == 'summary':
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(render_summary(df))
+    else:
+        sample = sample_rows(df, sample_size, stratify)
+        title = "Pandas Profiling Report"
+        if len(sample) < len(df):
+            title += f" (sample of {len(sample):,} of {len(df):,} rows)"
+        profile = ydata_profiling.ProfileReport(sample, title=title, minimal=True)
+        profile.to_file(output_path)
 
+    if cache is not None:
+        cache.put(key, output_path)
+    return output_path
@@ -0,0 +1,107 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Working copies are uncompressed Arrow IPC so readers can memory-map them
+# without decoding; derived outputs are compressed Parquet.
+WORKING_FORMAT = '.feather'
+OUTPUT_FORMAT = '.parquet'
+PARQUET_COMPRESSION = 'zstd'
+
+def read_dataset(path, columns=None):
+    """
+    Read a dataset by extension. Feather/Arrow files are memory-mapped, so
+    repeated reads share the page cache instead of re-parsing text.
+    """
+    if path.endswith(('.feather', '.arrow')):
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=columns)
+    if path.endswith('.csv'):
+        return pd.read_csv(path, usecols=columns)
+    if path.endswith(('.xls', '.xlsx')):
+        return pd.read_excel(path, usecols=columns)
+    raise ValueError(f"Unsupported file format: {os.path.basename(path)}")
+
+
+def iter_dataset_batches(path, chunksize):
+    """
+    Yield a dataset in DataFrames of chunksize rows with a running index.
+    Arrow files are sliced from the memory map, so only one chunk is
+    materialised at a time.
+    """
+    if path.endswith('.csv'):
+        with pd.read_csv(path, chunksize=chunksize) as reader:
+            yield from reader
+        return
+    if not path.endswith(('.feather', '.arrow')):
+        raise ValueError("Streaming mode supports CSV and Arrow files only.")
+    table = feather.read_table(path, memory_map=True)
+    for offset in range(0, table.num_rows, chunksize):
+        chunk = table.slice(offset, chunksize).to_pandas()
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        yield chunk
+
+
+def write_dataset(df, path, index=False):
+    """
+    Write a DataFrame by extension; the index is only kept when asked for.
+    """
+    df = df if index else df.reset_index(drop=True)
+    if path.endswith(('.feather', '.arrow')):
+        df.to_feather(path, compression='uncompressed')
+    elif path.endswith('.parquet'):
+        df.to_parquet(path, index=index, compression=PARQUET_COMPRESSION)
+    elif path.endswith('.csv'):
+        df.to_csv(path, index=index)
+    else:
+        raise ValueError(f"Unsupported file format: {os.path.basename(path)}")
+    return path
+
+
+def write_output(df, path):
+    """
+    Write a derived dataset as Parquet, falling back to CSV when a column
+    cannot be stored in Arrow (e.g. strings mixed with numbers). path may
+    carry any extension; the written path is returned.
+    """
+    stem = os.path.splitext(path)[0]
+    try:
+        return write_dataset(df, stem + OUTPUT_FORMAT)
+    except (pa.ArrowException, TypeError, ValueError):
+        return write_dataset(df, stem + '.csv')
+
+
+def convert_upload(source_path, target_path):
+    """
+    Convert an uploaded CSV/Excel file to the columnar working copy once,
+    with the dtypes pandas parsed. The source is removed on success. Returns
+    the path readers should use: the working copy, or the source if the data
+    cannot be represented in Arrow.
+    """
+    if os.path.exists(target_path):
+        os.remove(target_path)
+    df = read_dataset(source_path)
+    stem, extension = os.path.splitext(target_path)
+    tmp_path = f"{stem}.tmp{extension}"
+    try:
+        write_dataset(df, tmp_path)
+    except (pa.ArrowException, TypeError, ValueError):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return source_path
+    os.replace(tmp_path, target_path)
+    os.remove(source_path)
+    return target_path
+
+
+def export_csv(path, csv_path):
+    """
+    Write any stored dataset out as CSV, e.g. for a download.
+    """
+    if path.endswith('.csv'):
+        return path
+    read_dataset(path).to_csv(csv_path, index=False)
+    return csv_path